@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark of Polylines.add_all merging the edge soup of a floor plan.
+
+The walls of a grid of rooms are split into many short, overlapping 
+segments in random order, which add_all merges back into the grid lines.
+
+Usage: python benchmarks/bench_add_all.py [number_of_segments]
+
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crossproduct import Point, Polyline, Polylines
+
+
+def floor_plan(n,rooms=50):
+    ""
+    rng=np.random.default_rng(0)
+    line=rng.integers(0,rooms+1,n)
+    start=rng.uniform(0,rooms-1,n)
+    length=rng.uniform(0.5,1.5,n)
+    horizontal=rng.random(n)<0.5
+    a=np.where(horizontal[:,np.newaxis],
+               np.column_stack((start,line)),
+               np.column_stack((line,start)))
+    b=a+np.where(horizontal[:,np.newaxis],
+                 np.column_stack((length,np.zeros(n))),
+                 np.column_stack((np.zeros(n),length)))
+    return Polylines(*(Polyline(Point(*p),Point(*q)) for p,q in zip(a,b)))
+
+
+if __name__=='__main__':
+    
+    n=int(sys.argv[1]) if len(sys.argv)>1 else 100000
+    pls=floor_plan(n)
+    t=time.perf_counter()
+    result=pls.add_all()
+    t=time.perf_counter()-t
+    print('add_all: %s segments merged into %s in %.2f s' % (n,len(result),t))
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark of Polyhedrons.find_adjacent_faces on the zones of a building.
+
+The zones are boxes on a grid of floors, with the zones of each floor offset
+so that the walls and floors of neighbouring zones partially overlap.
+
+Usage: python benchmarks/bench_adjacent_faces.py [number_of_zones] [max_workers]
+
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crossproduct import Point, Vector, Polygon, Polyhedrons
+from crossproduct import polyhedron_from_base_polygon_and_extrud_vector
+
+
+def zones(n):
+    ""
+    side=max(1,int(round((n/4)**0.5)))
+    rng=np.random.default_rng(0)
+    result=[]
+    for floor in range(4):
+        shift=rng.uniform(0,5)
+        for x in range(side):
+            for y in range(side):
+                x0=x*10+(shift if y%2 else 0)
+                base=Polygon(Point(x0,y*8,floor*3),Point(x0+10,y*8,floor*3),
+                             Point(x0+10,y*8+8,floor*3),Point(x0,y*8+8,floor*3))
+                result.append(polyhedron_from_base_polygon_and_extrud_vector(base,
+                                                                             Vector(0,0,3)))
+    return Polyhedrons(*result)
+
+
+if __name__=='__main__':
+
+    n=int(sys.argv[1]) if len(sys.argv)>1 else 5000
+    max_workers=int(sys.argv[2]) if len(sys.argv)>2 else None
+    zs=zones(n)
+    t=time.perf_counter()
+    records=list(zs.find_adjacent_faces(max_workers=max_workers))
+    print('%s zones, %s faces: %s adjacent face pairs in %.2f s'
+          % (len(zs),sum(len(z.polygons) for z in zs),len(records),
+             time.perf_counter()-t))
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark of convex polygon clipping without shapely.
+
+Pairs of random overlapping triangles and quads are intersected and 
+subtracted using Polygon.intersection and Polygon.difference, which convert
+the polygons to shapely objects and back, using Polygon.intersection_convex 
+and Polygon.difference_convex, and using the batch methods 
+Polygons.intersection_convex and Polygons.difference_convex.
+
+Usage: python benchmarks/bench_convex_clipping.py [number_of_pairs]
+
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crossproduct import Point, Polygon, Polygons
+
+
+def polygons(n,rng):
+    ""
+    result=[]
+    for i in range(n):
+        centre=rng.uniform(0,1,2)
+        if i%2:
+            a=np.sort(rng.uniform(0,2*np.pi,3))
+        else:
+            a=np.arange(4)*np.pi/2+rng.uniform(0,np.pi/2)
+        x=centre+np.column_stack((np.cos(a),np.sin(a)))*rng.uniform(0.2,0.5)
+        result.append(Polygon(*(Point(*p) for p in x.tolist())))
+    return Polygons(*result)
+
+
+def run(label,f,n):
+    ""
+    t=time.perf_counter()
+    f()
+    t=time.perf_counter()-t
+    print('%s: %.3f s (%.0f pairs/s)' % (label,t,n/t))
+
+
+if __name__=='__main__':
+
+    n=int(sys.argv[1]) if len(sys.argv)>1 else 10000
+    rng=np.random.default_rng(0)
+    pgs=polygons(n,rng)
+    pgs1=polygons(n,rng)
+    for pg in list(pgs)+list(pgs1):
+        pg._convex
+    print('%s pairs of triangles and quads' % n)
+    
+    run('intersection (shapely)',
+        lambda: [pg.intersection(pg1) for pg,pg1 in zip(pgs,pgs1)],n)
+    run('intersection_convex',
+        lambda: [pg.intersection_convex(pg1) for pg,pg1 in zip(pgs,pgs1)],n)
+    run('Polygons.intersection_convex',
+        lambda: pgs.intersection_convex(pgs1),n)
+    
+    run('difference (shapely)',
+        lambda: [pg.difference(pg1) for pg,pg1 in zip(pgs,pgs1)],n)
+    run('difference_convex',
+        lambda: [pg.difference_convex(pg1) for pg,pg1 in zip(pgs,pgs1)],n)
+    run('Polygons.difference_convex',
+        lambda: pgs.difference_convex(pgs1),n)
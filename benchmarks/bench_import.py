@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark of the time taken to import crossproduct.
+
+Each import is timed in a fresh Python process. The plotting, rendering and
+external geometry packages should not be imported until they are first used.
+
+Usage: python benchmarks/bench_import.py [number_of_runs]
+
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+
+
+HEAVY_MODULES=('matplotlib','mpl_toolkits','shapely','triangle','vpython')
+
+CODE='''
+import sys, time
+t=time.perf_counter()
+import crossproduct
+t=time.perf_counter()-t
+print(t)
+print(','.join(m for m in %r if m in sys.modules))
+''' % (HEAVY_MODULES,)
+
+
+def time_import():
+    ""
+    root=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out=subprocess.run([sys.executable,'-c',CODE],
+                       cwd=root,
+                       capture_output=True,
+                       text=True,
+                       check=True).stdout.split('\n')
+    return float(out[0]), out[1]
+
+
+if __name__=='__main__':
+    
+    n=int(sys.argv[1]) if len(sys.argv)>1 else 10
+    results=[time_import() for _ in range(n)]
+    times=[x[0] for x in results]
+    print('import crossproduct: median %.1f ms, min %.1f ms (%s runs)' 
+          % (statistics.median(times)*1000,min(times)*1000,n))
+    print('heavy modules imported: %s' % (results[0][1] or 'none'))
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark of Polygons.intersection_pairs against a nested loop.
+
+Two layers of coplanar 3D polygons are intersected: a grid of floor plates
+and a grid of offset zones. The nested loop calls Polygon.intersection for 
+every pair of polygons.
+
+Usage: python benchmarks/bench_intersection_pairs.py [grid_size] [max_workers]
+
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crossproduct import Point, Polygon, Polygons
+
+
+def grid(n,offset):
+    ""
+    return Polygons(*(Polygon(Point(x+offset,y+offset,0),
+                              Point(x+offset+1,y+offset,0),
+                              Point(x+offset+1,y+offset+1,0),
+                              Point(x+offset,y+offset+1,0))
+                      for x in range(n) for y in range(n)))
+
+
+if __name__=='__main__':
+    
+    n=int(sys.argv[1]) if len(sys.argv)>1 else 10
+    max_workers=int(sys.argv[2]) if len(sys.argv)>2 else None
+    
+    t=time.perf_counter()
+    result=[]
+    for i,pg in enumerate(grid(n,0)):
+        for j,pg1 in enumerate(grid(n,0.5)):
+            x=pg.intersection(pg1)
+            if len(x)>0:
+                result.append((i,j,x))
+    t_loop=time.perf_counter()-t
+    
+    t=time.perf_counter()
+    result1=list(grid(n,0).intersection_pairs(grid(n,0.5),max_workers=max_workers))
+    t_pairs=time.perf_counter()-t
+    
+    print('%s x %s polygons' % (n*n,n*n))
+    print('nested loop: %.2f s, %s intersections' % (t_loop,len(result)))
+    print('intersection_pairs: %.2f s, %s intersections' % (t_pairs,len(result1)))
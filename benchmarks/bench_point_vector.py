@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+"""Micro-benchmark of the Point and Vector constructors, arithmetic and
+comparisons.
+
+Each operation is timed on 3D objects and reported in nanoseconds per call.
+
+Usage: python benchmarks/bench_point_vector.py [number_of_calls]
+
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crossproduct import Point, Vector
+
+
+if __name__=='__main__':
+
+    n=int(sys.argv[1]) if len(sys.argv)>1 else 200000
+    p=Point(1.0,2.0,3.0)
+    q=Point(1.0,2.0,3.00000001)
+    v=Vector(0.5,-1.0,2.0)
+    w=Vector(3.0,1.0,-2.0)
+    v2=Vector(0.5,-1.0)
+    w2=Vector(3.0,1.0)
+    cases=[('Point(x,y,z)',lambda: Point(1.0,2.0,3.0)),
+           ('Point + Vector',lambda: p+v),
+           ('Point - Point',lambda: p-q),
+           ('Point == Point',lambda: p==q),
+           ('Point.equals',lambda: p.equals(q)),
+           ('Point.x',lambda: p.x),
+           ('tuple(Point)',lambda: tuple(p)),
+           ('Vector + Vector',lambda: v+w),
+           ('Vector * scalar',lambda: v*2.0),
+           ('Vector.dot',lambda: v.dot(w)),
+           ('Vector.cross_product',lambda: v.cross_product(w)),
+           ('Vector.length',lambda: v.length),
+           ('Vector.perp_product (2D)',lambda: v2.perp_product(w2)),
+           ('Vector.is_collinear (2D)',lambda: v2.is_collinear(w2)),
+           ]
+    for name,f in cases:
+        t=min(timeit.repeat(f,number=n,repeat=5))
+        print('%s: %.0f ns' % (name,t/n*1e9))
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark of BVH ray casting on the faces of the zones of a building.
+
+The scene is the zones of benchmarks/bench_adjacent_faces.py. Rays are cast
+from random points on the ground towards random directions in the sky, as in
+a sky view or solar obstruction study.
+
+Usage: python benchmarks/bench_ray_casting.py [number_of_zones] [number_of_rays]
+
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crossproduct import Polygons
+
+from bench_adjacent_faces import zones
+
+
+if __name__=='__main__':
+
+    n=int(sys.argv[1]) if len(sys.argv)>1 else 1000
+    n_rays=int(sys.argv[2]) if len(sys.argv)>2 else 1000000
+    zs=zones(n)
+    pgs=Polygons(*(pg for z in zs for pg in z.polygons))
+
+    t=time.perf_counter()
+    bvh=pgs.bvh
+    print('%s faces, %s triangles: BVH built in %.2f s'
+          % (len(pgs),len(bvh),time.perf_counter()-t))
+
+    rng=np.random.default_rng(0)
+    minx,miny,minz,maxx,maxy,maxz=pgs.bounds
+    origins=np.column_stack((rng.uniform(minx,maxx,n_rays),
+                             rng.uniform(miny,maxy,n_rays),
+                             np.full(n_rays,-0.5)))
+    directions=rng.normal(size=(n_rays,3))
+    directions[:,2]=np.abs(directions[:,2])+0.1
+
+    t=time.perf_counter()
+    distances,face_ids=bvh.cast(origins,directions)
+    t1=time.perf_counter()-t
+    t=time.perf_counter()
+    hits=bvh.cast(origins,directions,max_distance=10,any_hit=True)
+    t2=time.perf_counter()-t
+    print('%s rays: first hits in %.2f s (%.0f rays/s), %s hit'
+          % (n_rays,t1,n_rays/t1,(face_ids>=0).sum()))
+    print('%s rays: any hits within 10 in %.2f s (%.0f rays/s), %s hit'
+          % (n_rays,t2,n_rays/t2,hits.sum()))
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark of Polyhedron.slice_parallel on a faceted sphere.
+
+The sphere is sliced by a stack of horizontal planes, and the time is
+compared with intersecting each face with each plane in turn, which does
+not include chaining the resulting segments into polygons.
+
+Usage: python benchmarks/bench_slice.py [number_of_faces_around] [number_of_planes]
+
+"""
+
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crossproduct import Point, Vector, Plane, Polygon, Polyhedron
+
+
+def sphere(n):
+    ""
+    m=n//2
+    def point(i,j):
+        theta=math.pi*i/m
+        phi=2*math.pi*j/n
+        return Point(math.sin(theta)*math.cos(phi),
+                     math.sin(theta)*math.sin(phi),
+                     math.cos(theta))
+    faces=[]
+    for i in range(m):
+        for j in range(n):
+            pts=[point(i,j),point(i+1,j),point(i+1,j+1),point(i,j+1)]
+            if i==0:
+                pts=pts[:3]
+            elif i==m-1:
+                pts=[pts[0],pts[1],pts[3]]
+            faces.append(Polygon(*pts))
+    return Polyhedron(*faces)
+
+
+if __name__=='__main__':
+
+    n=int(sys.argv[1]) if len(sys.argv)>1 else 64
+    n_planes=int(sys.argv[2]) if len(sys.argv)>2 else 200
+    ph=sphere(n)
+    offsets=np.linspace(-1,1,n_planes+2)[1:-1]
+    ph.mesh
+
+    t=time.perf_counter()
+    sections=ph.slice_parallel(Vector(0,0,1),offsets)
+    t1=time.perf_counter()-t
+    print('%s faces, %s planes: slice_parallel in %.3f s, %s polygons'
+          % (len(ph.polygons),n_planes,t1,sum(len(x) for x in sections)))
+
+    for pg in ph.polygons:
+        pg.plane
+    t=time.perf_counter()
+    for z in offsets:
+        plane=Plane(Point(0,0,z),Vector(0,0,1))
+        for pg in ph.polygons:
+            pg.intersection(plane)
+    t2=time.perf_counter()-t
+    print('%s faces, %s planes: each face and plane in %.3f s'
+          % (len(ph.polygons),n_planes,t2))
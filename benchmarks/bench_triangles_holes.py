@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark of Polygon.triangles for walls with windows.
+
+The single pass triangulation of the wall and its window holes is compared
+with the previous method, which split the wall into polygons without holes
+using shapely and then triangulated each of these.
+
+Usage: python benchmarks/bench_triangles_holes.py [number_of_windows]
+
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crossproduct import Point, Polygon, Polygons
+
+
+def wall(n):
+    ""
+    windows=[Polygon(Point(0,x*4+1,1),Point(0,x*4+3,1),Point(0,x*4+3,2),Point(0,x*4+1,2))
+             for x in range(n)]
+    return Polygon(Point(0,0,0),Point(0,n*4,0),Point(0,n*4,3),Point(0,0,3),
+                   holes=windows)
+
+
+if __name__=='__main__':
+    
+    for n in [int(sys.argv[1])] if len(sys.argv)>1 else [1,10,30]:
+        
+        pg=wall(n)
+        t=time.perf_counter()
+        result=Polygons(*(tri for x in pg.polygons for tri in x.triangles))
+        t_split=time.perf_counter()-t
+        
+        pg=wall(n)
+        t=time.perf_counter()
+        result1=pg.triangles
+        t_single=time.perf_counter()-t
+        
+        print('%s windows: split and triangulate %.1f ms (%s triangles), single pass %.1f ms (%s triangles)' 
+              % (n,t_split*1000,len(result),t_single*1000,len(result1)))
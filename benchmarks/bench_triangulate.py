@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark of triangulate_polygon against the triangle package.
+
+The polygon is a 500 vertex comb shaped façade outline, and a wall with 
+a grid of 125 windows as holes.
+
+Usage: python benchmarks/bench_triangulate.py [number_of_runs]
+
+"""
+
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crossproduct import triangulate_polygon
+
+
+def comb(n):
+    ""
+    return np.array([(0,0),(n,0)]+[(x,5 if k%2==0 else 1) 
+                                    for k,x in enumerate(np.arange(n,0,-0.5))]+[(0,5)],
+                    dtype=float)
+
+
+def windows():
+    ""
+    exterior=np.array([(0,0),(100,0),(100,20),(0,20)],dtype=float)
+    holes=[np.array([(x+1,y+1),(x+1,y+3),(x+3,y+3),(x+3,y+1)],dtype=float)
+           for x in range(0,100,4) for y in range(0,20,4)]
+    return exterior,holes
+
+
+def triangle_triangulate(exterior,holes=()):
+    ""
+    import triangle
+    vertices=[exterior]
+    segments=[]
+    seeds=[]
+    n=0
+    for ring in [exterior]+list(holes):
+        m=len(ring)
+        segments.extend([n+k,n+(k+1)%m] for k in range(m))
+        n+=m
+    for hole in holes:
+        vertices.append(hole)
+        seeds.append(hole.mean(axis=0))
+    A=dict(vertices=np.concatenate(vertices),segments=segments)
+    if seeds:
+        A['holes']=seeds
+    return triangle.triangulate(A,'p')['triangles']
+
+
+if __name__=='__main__':
+    
+    n=int(sys.argv[1]) if len(sys.argv)>1 else 10
+    cases=[('comb (%s vertices)' % len(comb(250)),(comb(250),())),
+           ('windows (125 holes)',windows())]
+    for name,args in cases:
+        t=min(timeit.repeat(lambda: triangulate_polygon(*args),number=1,repeat=n))
+        print('%s: triangulate_polygon %.1f ms' % (name,t*1000))
+        try:
+            t=min(timeit.repeat(lambda: triangle_triangulate(*args),number=1,repeat=n))
+            print('%s: triangle %.1f ms' % (name,t*1000))
+        except ImportError:
+            print('%s: triangle is not installed' % name)
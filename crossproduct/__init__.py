@@ -16,17 +16,27 @@
 from .crossproduct import GeometryObjects
 from .crossproduct import Point
 from .crossproduct import Vector
+from .crossproduct import Vectors
 from .crossproduct import Points
+from .crossproduct import PointArray
 from .crossproduct import Line
 from .crossproduct import Polyline
 from .crossproduct import Polylines
 from .crossproduct import Plane
 from .crossproduct import Polygon
 from .crossproduct import Polygons
+from .crossproduct import STRtree
+from .crossproduct import BVH
+from .crossproduct import HalfEdgeMesh
 from .crossproduct import Polyhedron
 from .crossproduct import Polyhedrons
+from .crossproduct import ConvexRegion
 from .crossproduct import tetrahedron_from_points
 from .crossproduct import tetrahedrons_from_extruded_triangle
 from .crossproduct import polyhedron_from_base_polygon_and_extrud_vector
+from .crossproduct import triangulate_polygon
+from .crossproduct import orient2d
+from .crossproduct import orient3d
+from .crossproduct import incircle
 
 
@@ -1,30 +1,221 @@
 # -*- coding: utf-8 -*-
 
 # general
+import collections
 import collections.abc
+import concurrent.futures
+import functools
+import heapq
+import importlib
 import itertools
 import math
+import weakref
+
+# for array storage
+import numpy as np
+
+
+class _LazyModule():
+    """A placeholder for a module which is only imported when first used.
+    
+    The plotting, rendering and external geometry packages are slow to import,
+    so these are imported on the first attribute access rather than 
+    when crossproduct is imported. Accessed attributes are then stored on the
+    placeholder so later lookups do not go through __getattr__.
+    
+    :param name: The name of the module to import.
+    :param submodules: The names of any submodules which must also be imported.
+    
+    """
+    
+    def __init__(self,name,*submodules):
+        ""
+        self._name=name
+        self._submodules=submodules
+        self._available=None
+        
+        
+    def is_available(self):
+        """Returns True if the module can be imported.
+        
+        The import is only tried on the first call, so an optional package 
+        which is not installed can be tested for on every call of a 
+        frequently used function.
+        
+        """
+        if self._available is None:
+            try:
+                importlib.import_module(self._name)
+            except ImportError:
+                self._available=False
+            else:
+                self._available=True
+        return self._available
+        
+        
+    def __getattr__(self,attr):
+        ""
+        if attr.startswith('__'):
+            raise AttributeError(attr)
+        for submodule in self._submodules:
+            importlib.import_module(submodule)
+        value=getattr(importlib.import_module(self._name),attr)
+        setattr(self,attr,value)
+        return value
+        
 
 # for plotting
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
-from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+plt=_LazyModule('matplotlib.pyplot','mpl_toolkits.mplot3d')
+art3d=_LazyModule('mpl_toolkits.mplot3d.art3d')
 
 # for external geometric calculations
-import shapely.geometry
-import shapely.ops
-import triangle as tr
+shapely=_LazyModule('shapely','shapely.geometry','shapely.ops','shapely.prepared')
+tr=_LazyModule('triangle')
 
 # for rendering
-import vpython
+vpython=_LazyModule('vpython')
 
 
 ABS_TOL = 1e-7 # default value for math.isclose
 
+USE_CACHE = True # cache the derived properties of immutable objects
+
+SHAPELY_CACHE_SIZE = 1024 # maximum number of cached shapely geometries
+
+
+def _cached(method):
+    """Decorator which caches the result of a method on the object instance.
+    
+    Results are stored in the `_cache` dictionary of the instance, keyed by 
+    the method name and any arguments. Caching is skipped if the module
+    level USE_CACHE is set to False.
+    
+    """
+    name=method.__name__
+    
+    @functools.wraps(method)
+    def wrapper(self,*args):
+        if not USE_CACHE:
+            return method(self,*args)
+        key=(name,)+args
+        try:
+            return self._cache[key]
+        except AttributeError:
+            self._cache={}
+        except KeyError:
+            pass
+        result=method(self,*args)
+        self._cache[key]=result
+        return result
+    
+    return wrapper
+
+
+_SHAPELY_CACHE=collections.OrderedDict()
+
+
+def _cached_shapely(method):
+    """Decorator which caches the shapely geometry of an immutable object.
+    
+    Each entry of the module level `_SHAPELY_CACHE` is keyed by the id of the
+    object and holds a weak reference to the object, along with the geometry, 
+    any prepared geometry and a count of predicate queries (see 
+    `_prepared_shapely`). The cache does not keep the object or its cached 
+    properties alive, and the entry is removed by the weak reference callback
+    when the object is deleted, before its id can be reused. The entries are 
+    kept in order of use, and the least recently used entry is discarded 
+    once there are more than SHAPELY_CACHE_SIZE entries. Caching is skipped
+    if the module level USE_CACHE is set to False.
+    
+    """
+    
+    @functools.wraps(method)
+    def wrapper(self):
+        if not USE_CACHE:
+            return method(self)
+        key=id(self)
+        try:
+            entry=_SHAPELY_CACHE[key]
+        except KeyError:
+            entry=[weakref.ref(self,functools.partial(_discard_shapely,key)),
+                   method(self),None,0]
+            _SHAPELY_CACHE[key]=entry
+            while len(_SHAPELY_CACHE)>SHAPELY_CACHE_SIZE:
+                _SHAPELY_CACHE.popitem(last=False)
+        else:
+            _SHAPELY_CACHE.move_to_end(key)
+        return entry[1]
+    
+    return wrapper
+
+
+def _discard_shapely(key,ref):
+    """Removes the cached shapely geometry of an object which has been deleted.
+    """
+    entry=_SHAPELY_CACHE.get(key)
+    if entry is not None and entry[0] is ref:
+        del _SHAPELY_CACHE[key]
+
+
+def _prepared_shapely(obj):
+    """Returns the shapely geometry of an object for use in predicates.
+    
+    A prepared geometry is built on the second predicate query of an object 
+    whose geometry is cached, and is then returned for all later queries. 
+    Testing one object against many others then uses the spatial index of 
+    the prepared geometry, while a single query is not slowed down by 
+    preparing a geometry which is never used again.
+    
+    """
+    geom=obj._shapely
+    entry=_SHAPELY_CACHE.get(id(obj))
+    if entry is None:
+        return geom
+    if entry[2] is None:
+        entry[3]+=1
+        if entry[3]<2:
+            return geom
+        entry[2]=shapely.prepared.prep(geom)
+    return entry[2]
+
+
+def _coordinates(obj):
+    """Returns the coordinates of a point or vector, or any other sequence, 
+    as a tuple of floats.
+    """
+    try:
+        return obj._items
+    except AttributeError:
+        return tuple(map(float,obj))
+
+
+def _add(a,b):
+    """Returns the sum of two tuples of coordinates of the same length.
+    """
+    if len(a)==3:
+        return (a[0]+b[0],a[1]+b[1],a[2]+b[2])
+    elif len(a)==2:
+        return (a[0]+b[0],a[1]+b[1])
+    else:
+        return tuple(x+y for x,y in zip(a,b))
+
+
+def _sub(a,b):
+    """Returns the difference of two tuples of coordinates of the same length.
+    """
+    if len(a)==3:
+        return (a[0]-b[0],a[1]-b[1],a[2]-b[2])
+    elif len(a)==2:
+        return (a[0]-b[0],a[1]-b[1])
+    else:
+        return tuple(x-y for x,y in zip(a,b))
+
 
 class SequenceObject(collections.abc.Sequence):
     """
     """
+    __slots__=()
+    
     def __getitem__(self,index):
         ""
         if isinstance(index, slice):
@@ -58,6 +249,7 @@ class GeometricEntity():
     Includes all
     
     """
+    __slots__=()
     
     def __eq__(self,obj):
         """Test for equality between objects.
@@ -110,6 +302,8 @@ class GeometricObject(GeometricEntity):
     All except for Vector
     
     """
+    __slots__=()
+    
     @property
     def coordinates(self):
         """Returns a tuple representation of the object.
@@ -161,6 +355,9 @@ class GeometricObject(GeometricEntity):
             
             a=self._shapely
             b=obj._shapely
+            prepared=_prepared_shapely(self)
+            if prepared is not a and not prepared.intersects(b):
+                return GeometryObjects()
             result=a.intersection(b)
             return GeometryObjects(*self._shapely_to_objs(result))
                 
@@ -183,7 +380,7 @@ class GeometricObject(GeometricEntity):
         """
         if self.nD==2:
             
-            a=self._shapely
+            a=_prepared_shapely(self)
             b=obj._shapely
             return a.intersects(b)
                 
@@ -240,7 +437,7 @@ class FiniteGeometricObject(GeometricObject, SequenceObject):
     Tetrahedron, ExtrudedPolyhedron
     
     """
-    
+    __slots__=()
     
     
     @property
@@ -248,6 +445,14 @@ class FiniteGeometricObject(GeometricObject, SequenceObject):
         ""
         return [x._vpython_vector for x in self]
 
+
+    def clear_cache(self):
+        """Clears any cached derived properties of the object.
+        
+        """
+        getattr(self,'__dict__',{}).pop('_cache',None)
+        _SHAPELY_CACHE.pop(id(self),None)
+
     
     
     def _shapely_to_objs(self,shapely_obj):
@@ -274,7 +479,7 @@ class FiniteGeometricObject(GeometricObject, SequenceObject):
         
     def _shapely_linestring_to_polyloop(self,shapely_obj):
         ""
-        return Polyline(*(Point(*x) for x in shapely_obj.coords))
+        return Polyline._from_point_array(PointArray(shapely_obj.coords))
     
     
     def _shapely_point_to_point(self,shapely_obj):
@@ -286,10 +491,10 @@ class FiniteGeometricObject(GeometricObject, SequenceObject):
         ""
         holes=[]  # to do
         for x in shapely_obj.interiors:
-            hole_pg=Polygon(*(Point(*y) for y in x.coords[:-1]))
+            hole_pg=Polygon._from_point_array(PointArray(x.coords[:-1]))
             holes.append(hole_pg)
-        return Polygon(*(Point(*x) for x in shapely_obj.exterior.coords[:-1]),
-                       holes=holes)
+        return Polygon._from_point_array(PointArray(shapely_obj.exterior.coords[:-1]),
+                                         holes=holes)
     
     
     def _shapely_to_pts_pls_pgns(self,shapely_obj):
@@ -317,14 +522,8 @@ class FiniteGeometricObject(GeometricObject, SequenceObject):
     def bounds(self):
         """
         """
-        if self.nD==2:
-            return self._shapely.bounds
-        elif self.nD==3:
-            result=[]
-            a=list(zip(*self.points.coordinates))
-            result.extend([min(b) for b in a])
-            result.extend([max(b) for b in a])
-            return tuple(result)
+        if self.nD==2 or self.nD==3:
+            return self.points.bounds
         else:
             raise ValueError
             
@@ -389,6 +588,7 @@ class Point(FiniteGeometricObject):
         are converted to floats.
 
     """
+    __slots__=('_items',)
     
     def __add__(self,vector):
         """The addition of this point and a vector.
@@ -399,19 +599,43 @@ class Point(FiniteGeometricObject):
         :rtype: Point
         
         """
-        zipped=itertools.zip_longest(self,vector) # missing values filled with None
-        try:
-            coordinates=[a+b for a,b in zipped]
-        except TypeError: # occurs if, say, a or b is None
+        a=self._items
+        b=_coordinates(vector)
+        if len(a)!=len(b):
             raise ValueError('Point and vector to add must be of the same length.')
-        return Point(*coordinates)
+        return Point._from_coordinates(_add(a,b))
+    
+    
+    def __eq__(self,obj):
+        """Test for equality between objects.
+        
+        :param obj: A geometric object.
+        
+        :returns: True if obj is a point with the same coordinates;
+            otherwise False.
+        :rtype: bool
+        
+        """
+        return isinstance(obj,Point) and self._items==obj._items
     
     
     def __init__(self,*coordinates):
         ""
-        self._items=tuple(map(float,coordinates))
+        if len(coordinates)==3:
+            x,y,z=coordinates
+            self._items=(float(x),float(y),float(z))
+        elif len(coordinates)==2:
+            x,y=coordinates
+            self._items=(float(x),float(y))
+        else:
+            self._items=tuple(map(float,coordinates))
         
         
+    def __iter__(self):
+        ""
+        return iter(self._items)
+    
+    
     def __sub__(self,point_or_vector):
         """Subtraction of supplied object from this point.
         
@@ -423,15 +647,23 @@ class Point(FiniteGeometricObject):
         :rtype: Point or Vector
         
         """
-        zipped=itertools.zip_longest(self,point_or_vector) # missing values filled with None
-        try:
-            coordinates=[a-b for a,b in zipped]
-        except TypeError: # occurs if, say, a or b is None
+        a=self._items
+        b=_coordinates(point_or_vector)
+        if len(a)!=len(b):
             raise ValueError(r'Point and point/vector to subtract must be of the same length.')
         if isinstance(point_or_vector,Point):
-            return Vector(*coordinates)
+            return Vector._from_coordinates(_sub(a,b))
         else:
-            return Point(*coordinates)
+            return Point._from_coordinates(_sub(a,b))
+        
+        
+    @classmethod
+    def _from_coordinates(cls,coordinates):
+        """Creates a new instance directly from a tuple of floats.
+        """
+        result=cls.__new__(cls)
+        result._items=coordinates
+        return result
         
     
     @property
@@ -449,6 +681,16 @@ class Point(FiniteGeometricObject):
             raise ValueError  # only 2d for shapely objects
     
     
+    @property
+    def bounds(self):
+        """The minimum and maximum coordinates of the point.
+        
+        :rtype: tuple
+        
+        """
+        return self.coordinates*2
+    
+    
     @property
     def centroid(self):
         """The centroid of the point (i.e. self).
@@ -487,12 +729,15 @@ class Point(FiniteGeometricObject):
         :rtype: bool
         
         """
-        zipped=itertools.zip_longest(self,point) # missing values filled with None
-        try:
-            result=[math.isclose(a, b, abs_tol=ABS_TOL) for a,b in zipped]
-        except TypeError: # occurs if, say, a or b is None
+        a=self._items
+        b=_coordinates(point)
+        if len(a)!=len(b):
             raise ValueError('Points to compare must be of the same length.')
-        return all(result)
+        for x,y in zip(a,b):
+            # the absolute difference is checked first as the common case
+            if not (abs(x-y)<=ABS_TOL or math.isclose(x, y, abs_tol=ABS_TOL)):
+                return False
+        return True
 
 
     @property
@@ -503,7 +748,7 @@ class Point(FiniteGeometricObject):
         :rtype: int
             
         """
-        return len(self)
+        return len(self._items)
     
     
     def plot(self, ax=None, **kwargs):
@@ -590,7 +835,7 @@ class Point(FiniteGeometricObject):
     def render(self,
            scene=None,
            radius=5,
-           color=vpython.color.red,
+           color=None,
            ):
         """Renders the object using vpython.
         
@@ -598,7 +843,7 @@ class Point(FiniteGeometricObject):
         :type scene: vpython.vpython.canvas
         :param radius: The radius f the point.
         :type radius: float
-        :param color: The color of the point.
+        :param color: The color of the point. Defaults to red.
         :type color: vpython.cyvector.vector
 
         :returns: The scene
@@ -609,6 +854,9 @@ class Point(FiniteGeometricObject):
         if scene is None:
             scene=get_render_scene()
         
+        if color is None:
+            color=vpython.color.red
+        
         vpython.points(pos=[self._vpython_vector],
                        color=color,
                        radius=radius)
@@ -625,7 +873,7 @@ class Point(FiniteGeometricObject):
         :rtype: float
         
         """
-        return self[0]
+        return self._items[0]
     
     
     @property
@@ -635,7 +883,7 @@ class Point(FiniteGeometricObject):
         :rtype: float
         
         """
-        return self[1]
+        return self._items[1]
     
     
     @property
@@ -647,465 +895,1315 @@ class Point(FiniteGeometricObject):
         :rtype: float
         
         """
-        return self[2]
+        return self._items[2]
     
 
 
 
-class Points(FiniteGeometricObject):
-    """A collection of 2D or 3D points.    
+class _PointIndex():
+    """A tolerance-aware spatial hash of point coordinates.
     
-    In *crossproduct* a `Points` object is a immutable sequence. 
-    Iterating over a `Points` will provide its Point objects.
+    Coordinates are snapped to a grid of cubic cells. The cell size is a 
+    multiple of the largest tolerance used by `Point.equals` for the 
+    coordinates (i.e. the ABS_TOL absolute tolerance or the math.isclose 
+    relative tolerance, whichever is larger). A lookup only tests the points 
+    in the cells overlapped by the tolerance box around the point, which is
+    usually a single cell.
     
-    :param points: An argument list of Point instances. 
+    :param array: The (N,2) or (N,3) array of coordinates which will be added
+        to the index. This sets the grid cell size.
+    :type array: numpy.ndarray
     
     """
     
-    def __init__(self,*points):
+    def __init__(self,array):
         ""
-        self._items=tuple(points)
+        max_abs=float(np.abs(array).max()) if array.size>0 else 0.0
+        self._tol=max(ABS_TOL,1e-9*max_abs)*(1+1e-6)
+        self._cell_size=16*self._tol
+        self._cells={}  # key -> list of (index, coordinates)
+        
+        
+    def add(self,coordinates,index,key=None):
+        """Adds a point to the index.
+        
+        :param coordinates: The point coordinates.
+        :type coordinates: tuple
+        :param index: The index to be returned by `find` for this point.
+        :type index: int
+        :param key: The grid key of the point, if already calculated.
+        
+        """
+        if key is None:
+            key=tuple(math.floor(c/self._cell_size) for c in coordinates)
+        self._cells.setdefault(key,[]).append((index,coordinates))
+        
+        
+    def find(self,coordinates,search_keys=None):
+        """Returns the lowest index of the points in the index which are equal
+        to the supplied coordinates within tolerance.
+        
+        :param coordinates: The point coordinates.
+        :type coordinates: tuple
+        :param search_keys: The grid keys of the cells to search, if already 
+            calculated.
+        
+        :returns: The index, or None if no equal point is found.
+        :rtype: int or None
+        
+        """
+        if search_keys is None:
+            tol=max(self._tol,2e-9*max(map(abs,coordinates)))
+            search_keys=itertools.product(
+                *(range(math.floor((c-tol)/self._cell_size),
+                        math.floor((c+tol)/self._cell_size)+1) 
+                  for c in coordinates)
+                )
+        result=None
+        cells=self._cells
+        for key in search_keys:
+            cell=cells.get(key)
+            if cell is None:
+                continue
+            for index,c in cell:
+                if ((result is None or index<result)
+                    and all(math.isclose(a,b,abs_tol=ABS_TOL) 
+                            for a,b in zip(coordinates,c))):
+                    result=index
+        return result
+        
+    
+    def keys(self,array):
+        """Returns the grid keys and search keys for an array of coordinates.
+        
+        :param array: An (N,2) or (N,3) array of coordinates with magnitudes
+            no larger than those used to create the index.
+        
+        :returns: A tuple of (keys, search_keys) where keys[i] is the grid key of 
+            point i and search_keys[i] is a list of the grid keys of the cells 
+            to be searched for points equal to point i.
+        :rtype: tuple
+        
+        """
+        keys=list(map(tuple,np.floor(array/self._cell_size).astype(np.int64).tolist()))
+        lo=np.floor((array-self._tol)/self._cell_size).astype(np.int64)
+        hi=np.floor((array+self._tol)/self._cell_size).astype(np.int64)
+        single=(lo==hi).all(axis=1).tolist()
+        search_keys=[]
+        for i,(key,x) in enumerate(zip(keys,single)):
+            if x:
+                search_keys.append((key,))
+            else:
+                search_keys.append(list(itertools.product(
+                    *(range(a,b+1) for a,b in zip(lo[i].tolist(),hi[i].tolist()))
+                    )))
+        return keys, search_keys
+        
+        
     
+class PointArray(collections.abc.Sequence):
+    """A contiguous array of 2D or 3D point coordinates.
     
-    @property
-    def _shapely(self):
-        ""
-        if len(self)==0 or self.nD==2:
-            x=[pt._shapely for pt in self]
-            return shapely.geometry.MultiPoint(x)
-        else:
-            raise Exception  # only 2d for shapely objects
+    This is the storage layer used by the Points, Polyline and Polygon classes.
+    The coordinates are held in a single numpy float64 array of shape (N,2) 
+    or (N,3). Point instances are only created when the array is indexed 
+    or iterated over.
     
+    :param coordinates: A numpy array of shape (N,2) or (N,3), or a sequence 
+        of xy or xyz coordinate tuples.
+        
+    :raises ValueError: If the coordinates are not all 2D or all 3D.
     
-    @property
-    def centroid(self):
-        """The centroid of the points.
+    """
+    
+    def __eq__(self,point_array):
+        """Tests if this point array and the supplied point array are equal.
         
-        :rtype: Point
+        :param point_array: A point array.
+        :type point_array: PointArray
+        
+        :returns: True if the two point arrays have the same coordinates;
+            otherwise False.
+        :rtype: bool
         
         """
-        if self.nD==2:
-            return self._shapely_point_to_point(self._shapely.centroid)
-        elif self.nD==3:
-            return Point(*(sum(c)/len(c) for c in zip(*self.coordinates)))
+        if isinstance(point_array,PointArray):
+            return (self._array.shape==point_array._array.shape 
+                    and bool((self._array==point_array._array).all()))
         else:
-            raise ValueError
-    
-            
-
-            
-    def plot(self, ax=None, **kwargs):
-        """Plots the points on the supplied axes.
+            return False
         
-        :param ax: An 2D or 3D Axes instance.
-        :type ax:  matplotlib.axes._subplots.AxesSubplot, matplotlib.axes._subplots.Axes3DSubplot
-        :param kwargs: keyword arguments to be passed to the Axes.plot call.
-                   
-        :returns: The matplotlib axes.
-        :rtype: matplotlib.axes._subplots.AxesSubplot or 
-        matplotlib.axes._subplots.Axes3DSubplot
-    
-        """
-        if ax is None:
-            fig,ax=get_matplotlib_fig_ax(self.nD)
         
-        if not 'marker' in kwargs:
-            kwargs['marker']='o'
+    def __getitem__(self,index):
+        ""
+        if isinstance(index, slice):
+            return PointArray(self._array[index])
+        else:
+            return Point._from_coordinates(tuple(self._array[index].tolist()))
         
-        ax.scatter(*zip(*self.coordinates), **kwargs)
-        return ax
-    
-    
-    def render(self,
-           scene=None,
-           radius=5,
-           color=vpython.color.red,
-           ):
+        
+    def __init__(self,coordinates=()):
         ""
+        try:
+            array=np.array(coordinates,dtype=float)
+        except ValueError:
+            raise ValueError('Points must all have the same number of dimensions.')
+        if array.size==0:
+            array=array.reshape(0,array.shape[-1] if array.ndim==2 else 0)
+        elif array.ndim!=2 or not array.shape[1] in (2,3):
+            raise ValueError('Points must all be 2D or all be 3D.')
+        self._array=array
         
-        if scene is None:
-            scene=get_render_scene()
         
-        vpython.points(pos=self._vpython_vector,
-                       color=color,
-                       radius=radius)
-    
-        return scene
+    def __iter__(self):
+        ""
+        for c in self._array.tolist():
+            yield Point._from_coordinates(tuple(c))
             
-
-class Vector(GeometricEntity, SequenceObject):
-    """A 2D or 3D vector, as described by xy or xyz coordinates.
+        
+    def __len__(self):
+        ""
+        return len(self._array)
     
-    In *crossproduct* a Vector object is a immutable sequence. 
-    Iterating over a Vector will provide its coordinates.
-    Indexing a vector will return the coordinate for that index (0=x, 1=y, 2=z).
     
-    :param coordinates: Argument list of two (xy) or three (xyz) coordinates. 
-        Coordinates should be of type int, float or similar numeric. These values
-        are converted to floats.
+    def __repr__(self):
+        ""
+        return 'PointArray(%s)' % (self.coordinates,)
     
-    """
-
-    def __add__(self,vector):
-        """Addition of this vector and a supplied vector.
-        
-        :param vector: A vector.
-        :type vector: Vector
-        
-        :rtype: Vector
-        
-        """
-        zipped=itertools.zip_longest(self,vector) # missing values filled with None
-        try:
-            coordinates=[a+b for a,b in zipped]
-        except TypeError: # occurs if, say, a or b is None
-            raise ValueError('Vectors to add must be of the same length.')
-        return Vector(*coordinates)
     
-
-    def __init__(self,*coordinates):
-        ""
-        self._items=tuple(map(float,coordinates))
-
-
-    def __mul__(self,scalar):
-        """Multiplication of this vector and a supplied scalar value.
-        
-        :param scalar: A numerical scalar value.
-        :type scalar: float
+    @property
+    def array(self):
+        """The numpy array of the point coordinates.
         
-        :rtype: Vector
+        :rtype: numpy.ndarray
         
         """
-        return Vector(*(c*scalar for c in self))            
+        return self._array
     
     
-    def __sub__(self,vector):
-        """Subtraction of this vector and a supplied vector.
-        
-        :param vector: A vector.
-        :type vector: Vector
+    @property
+    def bounds(self):
+        """The minimum and maximum coordinates of the points.
         
-        :rtype: Vector
+        :returns: (minx,miny,maxx,maxy) for 2D points or 
+            (minx,miny,minz,maxx,maxy,maxz) for 3D points.
+        :rtype: tuple
         
         """
-        zipped=itertools.zip_longest(self,vector) # missing values filled with None
-        try:
-            coordinates=[a-b for a,b in zipped]
-        except TypeError: # occurs if, say, a or b is None
-            raise ValueError(r'Vectors to subtract must be of the same length.')
-        return Vector(*coordinates)
-
-
-    def angle(self,vector):
-        """Returns the angle between this vector and the supplied vector.
-        
-        :param vector: A 2D or 3D vector.
-        :type vector: Vector
+        return tuple(self._array.min(axis=0).tolist()
+                     +self._array.max(axis=0).tolist())
+    
+    
+    @property
+    def centroid(self):
+        """The mean of the points.
         
-        :return: The angle in radians.
-        :rtype: float
+        :rtype: Point
         
         """
-        return math.acos(self.dot(vector)/self.length/vector.length)
-    
+        return Point(*self._array.mean(axis=0).tolist())
     
-    @property
-    def _vpython_vector(self):
-        ""
-        return vpython.vector(*self.coordinates)
-
     
     @property
     def coordinates(self):
-        """Returns a tuple representation of the vector.
+        """Returns a tuple representation of the points.
         
-        :returns: The coordinates as a tuple. 
-            For a vector, this can also be achieved by creating a 
-            tuple of the vector itself (i.e. :code:`tuple(v)`).
         :rtype: tuple
         
         """
-        return self._items
+        return tuple(map(tuple,self._array.tolist()))
     
-
-    def cross_product(self,vector):
-        """Returns the 3D cross product of this vector and the supplied vector.
+    
+    @classmethod
+    def from_points(cls,points):
+        """Creates a point array from a sequence of points.
         
-        :param vector: A 3D vector.
-        :type vector: Vector
-        
-        :raises ValueError: If the vector is not a 3D vector.
-        
-        :return: The 3D cross product of the two vectors. 
-            This returns a new vector which is perpendicular to 
-            this vector (self) and the supplied vector. 
-            The returned vector has direction according to the right hand rule. 
-            If this vector (self) and the supplied vector are collinear,
-            then the returned vector is (0,0,0)
-        
-        :rtype: Vector
-        
-        """
-        if self.nD==3:
-            (v1,v2,v3),(w1,w2,w3)=list(self),list(vector)
-            return Vector(v2*w3-v3*w2,
-                          v3*w1-v1*w3,
-                          v1*w2-v2*w1)
-        else:
-            raise ValueError('"cross_product" method can only be used for a 3D vector.')
-            
-
-    def dot(self,vector):
-        """Return the dot product of this vector and the supplied vector.
-        
-        :param vector: A vector.
-        :type vector: Vector
+        :param points: A sequence of Point instances, or another PointArray.
         
-        :returns: The dot product of the two vectors: 
-            returns 0 if self and vector are perpendicular; 
-            returns >0 if the angle between self and vector is an acute angle (i.e. <90deg); 
-            returns <0 if the angle between self and vector is an obtuse angle (i.e. >90deg).
-        :rtype: float
+        :rtype: PointArray
         
         """
-        zipped=itertools.zip_longest(self,vector) # missing values filled with None
-        try:
-            return sum(a*b for a,b in zipped)
-        except TypeError: # occurs if, say, a or b is None
-            raise ValueError(r'Vectors to subtract must be of the same length.')
-        
-
+        if isinstance(points,PointArray):
+            return points
+        return cls([pt.coordinates for pt in points])
+    
+    
     @property
-    def index_largest_absolute_coordinate(self):
-        """Returns the index of the largest absolute coordinate of the vector.
+    def nD(self):
+        """The number of dimensions of the points.
         
-        :return: 1 if the x-coordinate has the largest absolute value, 
-            2 if the y-coordinate has the largest absolute value, or
-            (for 3D vectors) 3 if the z-coordinate has the largest
-            absolute value.
+        :returns: 2 or 3 (or 0 for an empty array)
         :rtype: int
         
         """
-        absolute_coords=[abs(c) for c in self]
-        return absolute_coords.index(max(absolute_coords)) 
+        return self._array.shape[1]
     
     
-    def is_codirectional(self,vector):
-        """Tests if this vector and the supplied vector are codirectional.
+    def project_2D(self,coordinate_index):
+        """Projection of 3D points as 2D points.
         
-        :param vector: A vector.
-        :type vector: Vector
+        :param coordinate_index: The index of the coordinate to ignore.
+            Use coordinate_index=0 to ignore the x-coordinate, coordinate_index=1 
+            for the y-coordinate and coordinate_index=2 for the z-coordinate.
+        :type coordinate_index: int
         
-        :return: True if the vectors point in the exact same direction; 
-            otherwise False.
-        :rtype: bool
-            
-        """
-        return self.is_collinear(vector) and self.dot(vector)>0
+        :raises ValueError: If coordinate_index is not between 0 and 2.
         
-
-    def is_collinear(self,vector):
-        """Tests if this vector and the supplied vector are collinear.
+        :rtype: PointArray
         
-        :param vector: A vector.
-        :type vector: Vector
+        """
+        if coordinate_index==0:
+            return PointArray(self._array[:,[1,2]])
+        elif coordinate_index==1:
+            return PointArray(self._array[:,[2,0]])
+        elif coordinate_index==2:
+            return PointArray(self._array[:,[0,1]])
+        else:
+            raise ValueError('coordinate_index must be between 0 and 2')
+            
+            
+    def project_3D(self,plane,coordinate_index):
+        """Projection of 2D points on a 3D plane.
         
-        :raise ValueError: If the vector is not 2D or 3D.
+        :param plane: The plane for the projection
+        :type plane: Plane
+        :param coordinate_index: The index of the coordinate which was ignored 
+            to create the 2D projection.
+        :type coordinate_index: int
         
-        :return: True if the vectors lie on the same line; 
-            otherwise False.
-        :rtype: bool
+        :raises ValueError: If coordinate_index is not between 0 and 2, or
+            if the points cannot be projected onto the plane.
+        
+        :rtype: PointArray
         
         """
-        if self.nD==2:
-            return math.isclose(self.perp_product(vector), 0, abs_tol=ABS_TOL)
-        elif self.nD==3:
-            return math.isclose(self.cross_product(vector).length, 0, abs_tol=ABS_TOL)
+        a,b=self._array[:,0],self._array[:,1]
+        (P0x,P0y,P0z),(Nx,Ny,Nz)=plane.P0.coordinates,plane.N.coordinates
+        if coordinate_index==0:
+            if Nx==0:
+                raise ValueError('yz points must exist on the plane.')
+            x=P0x-(Ny*(a-P0y)+Nz*(b-P0z))/Nx
+            return PointArray(np.column_stack((x,a,b)))
+        elif coordinate_index==1:
+            if Ny==0:
+                raise ValueError('zx points must exist on the plane.')
+            y=P0y-(Nz*(a-P0z)+Nx*(b-P0x))/Ny
+            return PointArray(np.column_stack((b,y,a)))
+        elif coordinate_index==2:
+            if Nz==0:
+                raise ValueError('xy points must exist on the plane.')
+            z=P0z-(Nx*(a-P0x)+Ny*(b-P0y))/Nz
+            return PointArray(np.column_stack((a,b,z)))
         else:
-            raise ValueError('"is_collinear" method requires a 2D or 3D vector.')
-              
+            raise ValueError('coordinate_index must be between 0 and 2')
             
-    def is_opposite(self,vector):
-        """Test if this vector and the supplied vector are opposites.
-        
-        :param vector: A vector.
-        :type vector: Vector
+            
+    @property
+    def reverse(self):
+        """Returns the points in reverse order.
         
-        :return: True if the vectors point in exact opposite directions; 
-            otherwise False.
-        :rtype: bool
+        :rtype: PointArray
         
         """
-        return self.is_collinear(vector) and self.dot(vector)<0
-            
+        return PointArray(self._array[::-1])
     
-    def is_perpendicular(self,vector):
-        """Test if this vector and the supplied vector are perpendicular.
+    
+    
+class PointSequenceObject(FiniteGeometricObject):
+    """
+    
+    Points, Polyline
+    
+    Objects which store their points in a PointArray.
+    
+    """
+    
+    def __getitem__(self,index):
+        ""
+        if isinstance(index, slice):
+            return self._from_point_array(self._items[index])
+        else:
+            return self._items[index]
         
-        :param vector: A vector.
-        :type vector: Vector
+    
+    def __init__(self,*points):
+        ""
+        self._items=PointArray.from_points(points)
         
-        :return: True if the vectors are perpendicular; 
-            otherwise False.
-        :rtype: bool
         
+    @classmethod
+    def _from_point_array(cls,point_array):
+        """Creates a new instance directly from a PointArray.
         """
-        return math.isclose(self.dot(vector), 0, abs_tol=ABS_TOL)
-        
+        result=cls.__new__(cls)
+        result._items=point_array
+        return result
+    
     
     @property
-    def length(self):
-        """Returns the length of the vector.
+    def bounds(self):
+        """The minimum and maximum coordinates of the points.
         
-        :rtype: float
+        :rtype: tuple
         
         """
-        return sum(c**2 for c in self)**0.5
+        return self._items.bounds
     
     
     @property
-    def nD(self):
-        """The number of dimensions of the vector.
-        
-        :returns: 2 or 3
-        :rtype: int
+    def coordinates(self):
+        """Returns a tuple representation of the object.
         
+        :returns: The coordinates as a tuple. 
+        :rtype: tuple
+    
         """
-        return len(self)
+        return self._items.coordinates
     
     
     @property
-    def normalise(self):
-        """Returns the normalised vector of this vector.
+    def nD(self):
+        """The number of dimensions of the object.
         
-        :returns: A codirectional vector of length 1.
-        :rtype: Vector
+        :returns: 2 or 3
+        :rtype: int
         
         """
-        l=self.length
-        return Vector(*(c/l for c in self))
+        return self._items.nD
     
     
-    @property
-    def opposite(self):
-        """Returns the opposite vector of this vector
-        
-        :return: A collinear vector which points in the opposite direction.
-        :rtype: Vector
+    def project_2D(self,coordinate_index):
+        """Projects the object on a 2D plane.
         
         """
-        return self*-1
-
+        return self._from_point_array(self._items.project_2D(coordinate_index))
     
-    def perp_product(self,vector):
-        """Returns the perp product of this vector and the supplied vector.
+    
+    def project_3D(self,plane,coordinate_index):
+        """Projects the object on a 3D plane.
         
-        :param vector: A 2D vector.
-        :type vector: Vector
-
-        :raises ValueError: If this vector is not a 2D vector.
-       
-        :return: The perp product of the two vectors. 
-            The perp product is the dot product of 
-            the perp_vector of this vector and the supplied vector. 
-            If supplied vector is collinear with self, returns 0. 
-            If supplied vector is on the left of self, returns >0 (i.e. counterclockwise). 
-            If supplied vector is on the right of self, returns <0 (i.e. clockwise).
-        :rtype: float
-            
         """
-        if self.nD==2:
-            return self.perp_vector.dot(vector)
-        else:
-            raise ValueError('"perp_product" method only applicable for a 2D vector.')
+        return self._from_point_array(self._items.project_3D(plane,
+                                                             coordinate_index))
+    
 
 
+class Points(PointSequenceObject):
+    """A collection of 2D or 3D points.    
+    
+    In *crossproduct* a `Points` object is a immutable sequence. 
+    Iterating over a `Points` will provide its Point objects.
+    
+    The point coordinates are stored in a PointArray.
+    
+    :param points: An argument list of Point instances. 
+    
+    """
+    
     @property
-    def perp_vector(self):
-        """Returns the perp vector of this 2D vector.
-        
-        :raises ValueError: If this vector is not a 2D vector.
+    @_cached_shapely
+    def _shapely(self):
+        ""
+        if len(self)==0 or self.nD==2:
+            return shapely.geometry.MultiPoint(self.coordinates)
+        else:
+            raise Exception  # only 2d for shapely objects
+    
+    
+    @property
+    def centroid(self):
+        """The centroid of the points.
         
-        :return: The perp vector, i.e. the normal vector on the left 
-            (counterclockwise) side of self.
-        :rtype: Vector
+        :rtype: Point
         
         """
-        if self.nD==2:
-            return Vector(-self.y,self.x)
+        if self.nD in (2,3):
+            return self._items.centroid
         else:
-            raise ValueError('"perp_vector" method only applicable for a 2D vector.')
-
-
-    def render(self,
-           scene=None,
-           color=vpython.color.blue,
-           **kwargs
-           ):
-        ""
-        
-        if scene is None:
-            scene=get_render_scene()
+            raise ValueError
+    
+    
+    @property
+    @_cached
+    def _point_index(self):
+        """A spatial hash of all the points, used by `index_of`.
+        """
+        array=self._items.array
+        index=_PointIndex(array)
+        keys,_=index.keys(array)
+        for i,(c,key) in enumerate(zip(map(tuple,array.tolist()),keys)):
+            index.add(c,i,key)
+        return index
+    
+    
+    def _unique_inverse(self):
+        """Returns the indices of the unique points and the inverse mapping.
         
-        vpython.arrow(pos=Point(0,0,0)._vpython_vector,
-                      axis=self._vpython_vector,
-                      color=color,
-                      **kwargs
-                      )
+        :returns: A tuple of (unique_indices, inverse) where unique_indices 
+            are the indices of the first occurrence of each unique point and 
+            inverse[i] is the position in unique_indices of the point which
+            is equal to point i.
+        :rtype: tuple
         
-        return scene
+        """
+        array=self._items.array
+        index=_PointIndex(array)
+        keys,search_keys=index.keys(array)
+        unique_indices=[]
+        inverse=[]
+        for i,(c,key,search_key) in enumerate(zip(map(tuple,array.tolist()),
+                                                  keys,
+                                                  search_keys)):
+            j=index.find(c,search_key)
+            if j is None:
+                j=len(unique_indices)
+                index.add(c,j,key)
+                unique_indices.append(i)
+            inverse.append(j)
+        return unique_indices, inverse
     
-
-
-    def triple_product(self,vector1,vector2):
-        """Returns the triple product of this vector and 2 supplied vectors.
+    
+    def index_of(self,point):
+        """Returns the index of the first point which equals the supplied point.
         
-        :param vector1: A 3D vector.
-        :type vector1: Vector
-        :param vector2: A 3D vector.
-        :type vector2: Vector
+        A tolerance value is used as in `Point.equals`. 
+        The points are held in a spatial hash, which is built on the first 
+        call, so each lookup takes constant time on average.
         
-        :return: The triple product of the three vectors. 
+        :param point: A point.
+        :type point: Point
+        
+        :raises ValueError: If no point equals the supplied point.
+        
+        :rtype: int
+        
+        """
+        if len(point)!=self.nD:
+            raise ValueError('Points to compare must be of the same length.')
+        result=self._point_index.find(point.coordinates)
+        if result is None:
+            raise ValueError('%s is not in points' % point)
+        return result
+    
+    
+    def unique(self):
+        """Returns the unique points.
+        
+        Points are considered equal using the tolerance of `Point.equals`. 
+        The first occurrence of each point is kept and the order of the 
+        points is maintained. This uses a spatial hash so takes O(n) time.
+        
+        :rtype: Points
+        
+        """
+        unique_indices,_=self._unique_inverse()
+        return Points._from_point_array(PointArray(self._items.array[unique_indices]))
+    
+            
+
+            
+    def plot(self, ax=None, **kwargs):
+        """Plots the points on the supplied axes.
+        
+        :param ax: An 2D or 3D Axes instance.
+        :type ax:  matplotlib.axes._subplots.AxesSubplot, matplotlib.axes._subplots.Axes3DSubplot
+        :param kwargs: keyword arguments to be passed to the Axes.plot call.
+                   
+        :returns: The matplotlib axes.
+        :rtype: matplotlib.axes._subplots.AxesSubplot or 
+        matplotlib.axes._subplots.Axes3DSubplot
+    
+        """
+        if ax is None:
+            fig,ax=get_matplotlib_fig_ax(self.nD)
+        
+        if not 'marker' in kwargs:
+            kwargs['marker']='o'
+        
+        ax.scatter(*zip(*self.coordinates), **kwargs)
+        return ax
+    
+    
+    def render(self,
+           scene=None,
+           radius=5,
+           color=None,
+           ):
+        ""
+        
+        if scene is None:
+            scene=get_render_scene()
+        
+        if color is None:
+            color=vpython.color.red
+        
+        vpython.points(pos=self._vpython_vector,
+                       color=color,
+                       radius=radius)
+    
+        return scene
+            
+
+class Vector(GeometricEntity, SequenceObject):
+    """A 2D or 3D vector, as described by xy or xyz coordinates.
+    
+    In *crossproduct* a Vector object is a immutable sequence. 
+    Iterating over a Vector will provide its coordinates.
+    Indexing a vector will return the coordinate for that index (0=x, 1=y, 2=z).
+    
+    :param coordinates: Argument list of two (xy) or three (xyz) coordinates. 
+        Coordinates should be of type int, float or similar numeric. These values
+        are converted to floats.
+    
+    """
+    __slots__=('_items',)
+
+    def __add__(self,vector):
+        """Addition of this vector and a supplied vector.
+        
+        :param vector: A vector.
+        :type vector: Vector
+        
+        :rtype: Vector
+        
+        """
+        a=self._items
+        b=_coordinates(vector)
+        if len(a)!=len(b):
+            raise ValueError('Vectors to add must be of the same length.')
+        return Vector._from_coordinates(_add(a,b))
+    
+    
+    def __eq__(self,obj):
+        """Test for equality between objects.
+        
+        :param obj: A geometric object.
+        
+        :returns: True if obj is a vector with the same coordinates;
+            otherwise False.
+        :rtype: bool
+        
+        """
+        return isinstance(obj,Vector) and self._items==obj._items
+    
+
+    def __init__(self,*coordinates):
+        ""
+        if len(coordinates)==3:
+            x,y,z=coordinates
+            self._items=(float(x),float(y),float(z))
+        elif len(coordinates)==2:
+            x,y=coordinates
+            self._items=(float(x),float(y))
+        else:
+            self._items=tuple(map(float,coordinates))
+        
+        
+    def __iter__(self):
+        ""
+        return iter(self._items)
+
+
+    def __mul__(self,scalar):
+        """Multiplication of this vector and a supplied scalar value.
+        
+        :param scalar: A numerical scalar value.
+        :type scalar: float
+        
+        :rtype: Vector
+        
+        """
+        a=self._items
+        k=float(scalar)
+        if len(a)==3:
+            return Vector._from_coordinates((a[0]*k,a[1]*k,a[2]*k))
+        elif len(a)==2:
+            return Vector._from_coordinates((a[0]*k,a[1]*k))
+        else:
+            return Vector._from_coordinates(tuple(c*k for c in a))
+    
+    
+    def __sub__(self,vector):
+        """Subtraction of this vector and a supplied vector.
+        
+        :param vector: A vector.
+        :type vector: Vector
+        
+        :rtype: Vector
+        
+        """
+        a=self._items
+        b=_coordinates(vector)
+        if len(a)!=len(b):
+            raise ValueError(r'Vectors to subtract must be of the same length.')
+        return Vector._from_coordinates(_sub(a,b))
+    
+    
+    @classmethod
+    def _from_coordinates(cls,coordinates):
+        """Creates a new instance directly from a tuple of floats.
+        """
+        result=cls.__new__(cls)
+        result._items=coordinates
+        return result
+
+
+    def angle(self,vector):
+        """Returns the angle between this vector and the supplied vector.
+        
+        :param vector: A 2D or 3D vector.
+        :type vector: Vector
+        
+        :return: The angle in radians.
+        :rtype: float
+        
+        """
+        return math.acos(self.dot(vector)/self.length/vector.length)
+    
+    
+    @property
+    def _vpython_vector(self):
+        ""
+        return vpython.vector(*self.coordinates)
+
+    
+    @property
+    def coordinates(self):
+        """Returns a tuple representation of the vector.
+        
+        :returns: The coordinates as a tuple. 
+            For a vector, this can also be achieved by creating a 
+            tuple of the vector itself (i.e. :code:`tuple(v)`).
+        :rtype: tuple
+        
+        """
+        return self._items
+    
+
+    def cross_product(self,vector):
+        """Returns the 3D cross product of this vector and the supplied vector.
+        
+        :param vector: A 3D vector.
+        :type vector: Vector
+        
+        :raises ValueError: If the vector is not a 3D vector.
+        
+        :return: The 3D cross product of the two vectors. 
+            This returns a new vector which is perpendicular to 
+            this vector (self) and the supplied vector. 
+            The returned vector has direction according to the right hand rule. 
+            If this vector (self) and the supplied vector are collinear,
+            then the returned vector is (0,0,0)
+        
+        :rtype: Vector
+        
+        """
+        if len(self._items)==3:
+            (v1,v2,v3),(w1,w2,w3)=self._items,_coordinates(vector)
+            return Vector._from_coordinates((v2*w3-v3*w2,
+                                             v3*w1-v1*w3,
+                                             v1*w2-v2*w1))
+        else:
+            raise ValueError('"cross_product" method can only be used for a 3D vector.')
+            
+
+    def dot(self,vector):
+        """Return the dot product of this vector and the supplied vector.
+        
+        :param vector: A vector.
+        :type vector: Vector
+        
+        :returns: The dot product of the two vectors: 
+            returns 0 if self and vector are perpendicular; 
+            returns >0 if the angle between self and vector is an acute angle (i.e. <90deg); 
+            returns <0 if the angle between self and vector is an obtuse angle (i.e. >90deg).
+        :rtype: float
+        
+        """
+        a=self._items
+        b=_coordinates(vector)
+        if len(a)!=len(b):
+            raise ValueError(r'Vectors for the dot product must be of the same length.')
+        if len(a)==3:
+            return a[0]*b[0]+a[1]*b[1]+a[2]*b[2]
+        elif len(a)==2:
+            return a[0]*b[0]+a[1]*b[1]
+        else:
+            return sum(x*y for x,y in zip(a,b))
+        
+
+    @property
+    def index_largest_absolute_coordinate(self):
+        """Returns the index of the largest absolute coordinate of the vector.
+        
+        :return: 1 if the x-coordinate has the largest absolute value, 
+            2 if the y-coordinate has the largest absolute value, or
+            (for 3D vectors) 3 if the z-coordinate has the largest
+            absolute value.
+        :rtype: int
+        
+        """
+        absolute_coords=[abs(c) for c in self]
+        return absolute_coords.index(max(absolute_coords)) 
+    
+    
+    def is_codirectional(self,vector):
+        """Tests if this vector and the supplied vector are codirectional.
+        
+        :param vector: A vector.
+        :type vector: Vector
+        
+        :return: True if the vectors point in the exact same direction; 
+            otherwise False.
+        :rtype: bool
+            
+        """
+        return self.is_collinear(vector) and self.dot(vector)>0
+        
+
+    def is_collinear(self,vector):
+        """Tests if this vector and the supplied vector are collinear.
+        
+        :param vector: A vector.
+        :type vector: Vector
+        
+        :raise ValueError: If the vector is not 2D or 3D.
+        
+        :return: True if the vectors lie on the same line; 
+            otherwise False.
+        :rtype: bool
+        
+        """
+        if self.nD==2:
+            return math.isclose(self.perp_product(vector), 0, abs_tol=ABS_TOL)
+        elif self.nD==3:
+            return math.isclose(self.cross_product(vector).length, 0, abs_tol=ABS_TOL)
+        else:
+            raise ValueError('"is_collinear" method requires a 2D or 3D vector.')
+              
+            
+    def is_opposite(self,vector):
+        """Test if this vector and the supplied vector are opposites.
+        
+        :param vector: A vector.
+        :type vector: Vector
+        
+        :return: True if the vectors point in exact opposite directions; 
+            otherwise False.
+        :rtype: bool
+        
+        """
+        return self.is_collinear(vector) and self.dot(vector)<0
+            
+    
+    def is_perpendicular(self,vector):
+        """Test if this vector and the supplied vector are perpendicular.
+        
+        :param vector: A vector.
+        :type vector: Vector
+        
+        :return: True if the vectors are perpendicular; 
+            otherwise False.
+        :rtype: bool
+        
+        """
+        return math.isclose(self.dot(vector), 0, abs_tol=ABS_TOL)
+        
+    
+    @property
+    def length(self):
+        """Returns the length of the vector.
+        
+        :rtype: float
+        
+        """
+        a=self._items
+        if len(a)==3:
+            return (a[0]**2+a[1]**2+a[2]**2)**0.5
+        elif len(a)==2:
+            return (a[0]**2+a[1]**2)**0.5
+        else:
+            return sum(c**2 for c in a)**0.5
+    
+    
+    @property
+    def nD(self):
+        """The number of dimensions of the vector.
+        
+        :returns: 2 or 3
+        :rtype: int
+        
+        """
+        return len(self)
+    
+    
+    @property
+    def normalise(self):
+        """Returns the normalised vector of this vector.
+        
+        :returns: A codirectional vector of length 1.
+        :rtype: Vector
+        
+        """
+        l=self.length
+        return Vector(*(c/l for c in self))
+    
+    
+    @property
+    def opposite(self):
+        """Returns the opposite vector of this vector
+        
+        :return: A collinear vector which points in the opposite direction.
+        :rtype: Vector
+        
+        """
+        return self*-1
+
+    
+    def perp_product(self,vector):
+        """Returns the perp product of this vector and the supplied vector.
+        
+        :param vector: A 2D vector.
+        :type vector: Vector
+
+        :raises ValueError: If this vector is not a 2D vector.
+       
+        :return: The perp product of the two vectors. 
+            The perp product is the dot product of 
+            the perp_vector of this vector and the supplied vector. 
+            If supplied vector is collinear with self, returns 0. 
+            If supplied vector is on the left of self, returns >0 (i.e. counterclockwise). 
+            If supplied vector is on the right of self, returns <0 (i.e. clockwise).
+        :rtype: float
+            
+        """
+        if len(self._items)==2:
+            (v1,v2),(w1,w2)=self._items,_coordinates(vector)
+            return v1*w2-v2*w1
+        else:
+            raise ValueError('"perp_product" method only applicable for a 2D vector.')
+
+
+    @property
+    def perp_vector(self):
+        """Returns the perp vector of this 2D vector.
+        
+        :raises ValueError: If this vector is not a 2D vector.
+        
+        :return: The perp vector, i.e. the normal vector on the left 
+            (counterclockwise) side of self.
+        :rtype: Vector
+        
+        """
+        if len(self._items)==2:
+            return Vector._from_coordinates((-self._items[1],self._items[0]))
+        else:
+            raise ValueError('"perp_vector" method only applicable for a 2D vector.')
+
+
+    def render(self,
+           scene=None,
+           color=None,
+           **kwargs
+           ):
+        ""
+        
+        if scene is None:
+            scene=get_render_scene()
+        
+        if color is None:
+            color=vpython.color.blue
+        
+        vpython.arrow(pos=Point(0,0,0)._vpython_vector,
+                      axis=self._vpython_vector,
+                      color=color,
+                      **kwargs
+                      )
+        
+        return scene
+    
+
+
+    def triple_product(self,vector1,vector2):
+        """Returns the triple product of this vector and 2 supplied vectors.
+        
+        :param vector1: A 3D vector.
+        :type vector1: Vector
+        :param vector2: A 3D vector.
+        :type vector2: Vector
+        
+        :return: The triple product of the three vectors. 
             The result is equal to the volume of the parallelepiped (3D equivalent of a parallelogram). 
             The result is equal to six times the volume of the tetrahedron (3D shape with 4 vertices). 
             
-        :rtype: float
+        :rtype: float
+        
+        """
+        return self.dot(vector1.cross_product(vector2))
+
+
+    @property
+    def x(self):
+        """The x coordinate of the vector.
+        
+        :rtype: float
+        
+        """
+        return self._items[0]
+    
+    
+    @property
+    def y(self):
+        """The y coordinate of the vector.
+        
+        :rtype: float
+        
+        """
+        return self._items[1]
+    
+    
+    @property
+    def z(self):
+        """The z coordinate of the vector.
+        
+        :raises IndexError: If vector is a 2D vector.
+        
+        :rtype: float
+        
+        """
+        return self._items[2]
+    
+
+class Vectors(GeometricEntity, collections.abc.Sequence):
+    """A collection of 2D or 3D vectors for batched vector algebra.
+    
+    The vector coordinates are stored in a single numpy float64 array 
+    of shape (N,2) or (N,3). The methods mirror those of the Vector class 
+    but operate on all vectors at once, using the same ABS_TOL tolerance
+    for the tests of collinearity and perpendicularity.
+    
+    Where a method takes a vector argument this can either be a Vectors 
+    instance of the same length (the operation is carried out element-wise)
+    or a single Vector (the operation is carried out against every vector).
+    
+    Scalar results are returned as numpy arrays of length N.
+    
+    In *crossproduct* a Vectors object is a immutable sequence. 
+    Iterating over a Vectors object will provide its Vector instances.
+    
+    :param vectors: An argument list of Vector instances. 
+    
+    .. rubric:: Code Example
+    
+    .. code-block:: python
+       
+       >>> from crossproduct import Vector, Vectors
+       >>> vs = Vectors(Vector(1,0,0), Vector(0,1,0))
+       >>> result = vs.cross_product(Vector(0,0,1))
+       >>> print(result)
+       Vectors(Vector(0.0, -1.0, 0.0), Vector(1.0, 0.0, 0.0))
+    
+    """
+    
+    def __add__(self,vector):
+        """Addition of these vectors and the supplied vector(s).
+        
+        :rtype: Vectors
+        
+        """
+        return Vectors.from_array(self._array+self._other_array(vector))
+    
+    
+    def __getitem__(self,index):
+        ""
+        if isinstance(index, slice):
+            return Vectors.from_array(self._array[index])
+        else:
+            return Vector(*self._array[index].tolist())
+        
+        
+    def __init__(self,*vectors):
+        ""
+        self._array=self._to_array([v.coordinates for v in vectors])
+        
+        
+    def __len__(self):
+        ""
+        return len(self._array)
+    
+    
+    def __mul__(self,scalar):
+        """Multiplication of these vectors and a scalar value.
+        
+        :param scalar: A numerical scalar value, or an array of N values.
+        
+        :rtype: Vectors
+        
+        """
+        scalar=np.asarray(scalar,dtype=float)
+        if scalar.ndim==1:
+            scalar=scalar[:,np.newaxis]
+        return Vectors.from_array(self._array*scalar)
+    
+    
+    def __repr__(self):
+        ""
+        return '%s(%s)' % (self.__class__.__name__,
+                           ', '.join([str(c) for c in self]))
+    
+    
+    def __sub__(self,vector):
+        """Subtraction of the supplied vector(s) from these vectors.
+        
+        :rtype: Vectors
+        
+        """
+        return Vectors.from_array(self._array-self._other_array(vector))
+    
+    
+    @staticmethod
+    def _to_array(coordinates):
+        """Returns an (N,2) or (N,3) float array of vector coordinates.
+        """
+        try:
+            array=np.array(coordinates,dtype=float)
+        except ValueError:
+            raise ValueError('Vectors must all have the same number of dimensions.')
+        if array.size==0:
+            return array.reshape(0,array.shape[-1] if array.ndim==2 else 0)
+        elif array.ndim!=2 or not array.shape[1] in (2,3):
+            raise ValueError('Vectors must all be 2D or all be 3D.')
+        return array
+    
+    
+    def _other_array(self,vector):
+        """Returns the coordinates array of a Vector or Vectors argument.
+        """
+        if isinstance(vector,Vectors):
+            other=vector._array
+        else:
+            other=np.array(vector.coordinates,dtype=float)
+        if other.shape[-1]!=self._array.shape[1]:
+            raise ValueError('Vectors must be of the same length.')
+        return other
+    
+    
+    def angle(self,vector):
+        """Returns the angles between these vectors and the supplied vector(s).
+        
+        The cosine of the angle is clipped to [-1,1] to guard against 
+        rounding errors.
+        
+        :return: The angles in radians.
+        :rtype: numpy.ndarray
+        
+        """
+        other=self._other_array(vector)
+        c=self.dot(vector)/self.length/np.sqrt((other**2).sum(axis=-1))
+        return np.arccos(np.clip(c,-1.0,1.0))
+    
+    
+    @property
+    def array(self):
+        """The numpy array of the vector coordinates.
+        
+        :rtype: numpy.ndarray
+        
+        """
+        return self._array
+    
+    
+    @property
+    def coordinates(self):
+        """Returns a tuple representation of the vectors.
+        
+        :rtype: tuple
+        
+        """
+        return tuple(map(tuple,self._array.tolist()))
+    
+    
+    def cross_product(self,vector):
+        """Returns the 3D cross products of these vectors and the supplied vector(s).
+        
+        :raises ValueError: If the vectors are not 3D vectors.
+        
+        :rtype: Vectors
+        
+        """
+        if self.nD==3:
+            return Vectors.from_array(np.cross(self._array,
+                                               self._other_array(vector)))
+        else:
+            raise ValueError('"cross_product" method can only be used for 3D vectors.')
+            
+            
+    def dot(self,vector):
+        """Returns the dot products of these vectors and the supplied vector(s).
+        
+        :rtype: numpy.ndarray
         
         """
-        return self.dot(vector1.cross_product(vector2))
-
-
+        return (self._array*self._other_array(vector)).sum(axis=1)
+    
+    
+    @classmethod
+    def from_array(cls,array):
+        """Creates a Vectors instance from an array of coordinates.
+        
+        :param array: An array of shape (N,2) or (N,3).
+        :type array: numpy.ndarray
+        
+        :rtype: Vectors
+        
+        """
+        result=cls.__new__(cls)
+        result._array=cls._to_array(array)
+        return result
+    
+    
     @property
-    def x(self):
-        """The x coordinate of the vector.
+    def index_largest_absolute_coordinate(self):
+        """Returns the index of the largest absolute coordinate of each vector.
         
-        :rtype: float
+        :rtype: numpy.ndarray
+        
+        """
+        return np.abs(self._array).argmax(axis=1)
+    
+    
+    def is_codirectional(self,vector):
+        """Tests if these vectors and the supplied vector(s) are codirectional.
+        
+        :rtype: numpy.ndarray
+        
+        """
+        return self.is_collinear(vector) & (self.dot(vector)>0)
+    
+    
+    def is_collinear(self,vector):
+        """Tests if these vectors and the supplied vector(s) are collinear.
+        
+        :raise ValueError: If the vectors are not 2D or 3D.
+        
+        :rtype: numpy.ndarray
+        
+        """
+        if self.nD==2:
+            return np.abs(self.perp_product(vector))<=ABS_TOL
+        elif self.nD==3:
+            return self.cross_product(vector).length<=ABS_TOL
+        else:
+            raise ValueError('"is_collinear" method requires 2D or 3D vectors.')
+    
+    
+    def is_opposite(self,vector):
+        """Tests if these vectors and the supplied vector(s) are opposites.
+        
+        :rtype: numpy.ndarray
+        
+        """
+        return self.is_collinear(vector) & (self.dot(vector)<0)
+    
+    
+    def is_perpendicular(self,vector):
+        """Tests if these vectors and the supplied vector(s) are perpendicular.
+        
+        :rtype: numpy.ndarray
         
         """
-        return self[0]
+        return np.abs(self.dot(vector))<=ABS_TOL
     
     
     @property
-    def y(self):
-        """The y coordinate of the vector.
+    def length(self):
+        """Returns the lengths of the vectors.
         
-        :rtype: float
+        :rtype: numpy.ndarray
         
         """
-        return self[1]
+        return np.sqrt((self._array**2).sum(axis=1))
     
     
     @property
-    def z(self):
-        """The z coordinate of the vector.
+    def nD(self):
+        """The number of dimensions of the vectors.
         
-        :raises IndexError: If vector is a 2D vector.
+        :returns: 2 or 3
+        :rtype: int
         
-        :rtype: float
+        """
+        return self._array.shape[1]
+    
+    
+    @property
+    def normalise(self):
+        """Returns the normalised vectors.
+        
+        :raises ZeroDivisionError: If any of the vectors has zero length.
+        
+        :rtype: Vectors
+        
+        """
+        l=self.length
+        if (l==0).any():
+            raise ZeroDivisionError('Vectors of zero length cannot be normalised.')
+        return Vectors.from_array(self._array/l[:,np.newaxis])
+    
+    
+    @property
+    def opposite(self):
+        """Returns the opposite vectors.
+        
+        :rtype: Vectors
+        
+        """
+        return self*-1
+    
+    
+    def perp_product(self,vector):
+        """Returns the perp products of these vectors and the supplied vector(s).
+        
+        :raises ValueError: If these vectors are not 2D vectors.
+        
+        :rtype: numpy.ndarray
+        
+        """
+        if self.nD==2:
+            other=self._other_array(vector)
+            return self._array[:,0]*other[...,1]-self._array[:,1]*other[...,0]
+        else:
+            raise ValueError('"perp_product" method only applicable for 2D vectors.')
+            
+            
+    @property
+    def perp_vector(self):
+        """Returns the perp vectors of these 2D vectors.
+        
+        :raises ValueError: If these vectors are not 2D vectors.
+        
+        :rtype: Vectors
+        
+        """
+        if self.nD==2:
+            return Vectors.from_array(np.column_stack((-self._array[:,1],
+                                                       self._array[:,0])))
+        else:
+            raise ValueError('"perp_vector" method only applicable for 2D vectors.')
+    
+    
+    def triple_product(self,vector1,vector2):
+        """Returns the triple products of these vectors and 2 supplied vector(s).
+        
+        :rtype: numpy.ndarray
         
         """
-        return self[2]
+        if self.nD==3:
+            c=np.cross(self._other_array(vector1),self._other_array(vector2))
+            return (self._array*c).sum(axis=1)
+        else:
+            raise ValueError('"triple_product" method can only be used for 3D vectors.')
+            
     
 
 class Line(InfiniteGeometricObject):
@@ -1507,7 +2605,7 @@ class Line(InfiniteGeometricObject):
             
     
 
-class Polyline(FiniteGeometricObject):
+class Polyline(PointSequenceObject):
     """A 2D or 3D collection of adjoining segments, as described by a sequence of points.
     
     A polyline is a series of joined segments which are defined as a series of points.
@@ -1529,6 +2627,7 @@ class Polyline(FiniteGeometricObject):
     """
     
     @property
+    @_cached_shapely
     def _shapely(self):
         ""
         if self.nD==2:
@@ -1564,20 +2663,11 @@ class Polyline(FiniteGeometricObject):
         
     def _intersection_polyline_3D(self,polyline):
         ""
-        result=[]
-        for pl1 in self.polylines:
-            l1=pl1.lines[0]
-            plane=l1.plane
-            for pl2 in polyline.polylines:
-                l2=pl2.lines[0]
-                if l1.equals(l2):
-                    i=plane.N.index_largest_absolute_coordinate
-                    pl1_2D=pl1.project_2D(i)
-                    pl2_2D=pl2.project_2D(i)
-                    x=pl1_2D.intersection(pl2_2D)
-                    result.extend([y.project_3D(plane,i) for y in x])
-                    
-        return tuple(result)
+        a,b=self._items.array[:-1],self._items.array[1:]
+        c,d=polyline._items.array[:-1],polyline._items.array[1:]
+        n=len(a)
+        records=_segment_intersections(np.concatenate((a,c)),np.concatenate((b,d)))
+        return tuple(x for i,j,x in records if i<n and j>=n)
                 
 
     def equals(self,polyline):
@@ -1673,8 +2763,11 @@ class Polyline(FiniteGeometricObject):
     @property
     def points(self):
         """Returns the polyline points.
+        
+        :rtype: Points
+        
         """
-        return self._items
+        return Points._from_point_array(self._items)
     
 
     @property
@@ -1682,12 +2775,13 @@ class Polyline(FiniteGeometricObject):
         """Returns a Polylines of the individual line segments
         """
         n=len(self)
-        return Polylines(*[Polyline(self[i],self[i+1]) for i in range(n-1)])
+        return Polylines(*[Polyline._from_point_array(self._items[i:i+2]) 
+                           for i in range(n-1)])
 
 
     def render(self,
            scene=None,
-           color=vpython.color.blue,
+           color=None,
            **kwargs
            ):
         ""
@@ -1695,6 +2789,9 @@ class Polyline(FiniteGeometricObject):
         if scene is None:
             scene=get_render_scene()
         
+        if color is None:
+            color=vpython.color.blue
+        
         vpython.curve(pos=self._vpython_vector,
                       color=color,
                       **kwargs
@@ -1721,7 +2818,7 @@ class Polyline(FiniteGeometricObject):
            Polyline(Point(1.0,1.0),Point(1.0,0.0),Point(0.0,0.0))
         
         """
-        return Polyline(*self[::-1])
+        return Polyline._from_point_array(self._items.reverse)
 
 
 
@@ -1742,6 +2839,22 @@ class Polylines(FiniteGeometricObject):
     
     
     @property
+    def _segment_arrays(self):
+        """The start and end points of the segments of all the polylines.
+        
+        :returns: A tuple of two (M,nD) arrays.
+        
+        """
+        arrays=[x for x in (pl._items.array for pl in self._items) if len(x)>1]
+        if len(arrays)==0:
+            nD=self.nD if len(self)>0 else 2
+            return np.zeros((0,nD)),np.zeros((0,nD))
+        return (np.concatenate([x[:-1] for x in arrays]),
+                np.concatenate([x[1:] for x in arrays]))
+    
+    
+    @property
+    @_cached_shapely
     def _shapely(self):
         ""
         if len(self)==0 or self.nD==2:
@@ -1751,6 +2864,146 @@ class Polylines(FiniteGeometricObject):
             raise Exception  # only 2d for shapely objects
 
 
+    def all_intersections(self):
+        """Returns all the intersections between the segments of the polylines.
+        
+        The segments are numbered in turn through the segments of each polyline.
+        Candidate pairs of segments are found with a sweep along the x axis 
+        over the sorted segment bounding boxes, and the intersections of the 
+        candidate pairs are then found together as numpy array operations. 
+        This works in the same way for 2D and 3D segments.
+        
+        Adjacent segments in a polyline which only meet at their shared 
+        vertex are not included.
+        
+        :returns: A list of (i,j,obj) records in order of i and j, where i<j 
+            are segment indices and obj is the intersection Point, or a 
+            Polyline of two points for segments which overlap.
+        :rtype: list
+        
+        .. rubric:: Code Example
+    
+        .. code-block:: python
+           
+           >>> from crossproduct import Point, Polyline, Polylines
+           >>> pls = Polylines(Polyline(Point(0,0), Point(2,0), Point(2,2), Point(1,-1)))
+           >>> print(pls.all_intersections())
+           [(0, 2, Point(1.3333333333333333, 0.0))]
+        
+        """
+        a,b=self._segment_arrays
+        
+        # pairs of adjacent segments which share a vertex
+        adjacent=set()
+        n=0
+        for pl in self._items:
+            m=len(pl._items)-1
+            if m<1:
+                continue
+            adjacent.update((k,k+1) for k in range(n,n+m-1))
+            if m>2 and np.array_equal(pl._items.array[0],pl._items.array[-1]):
+                adjacent.add((n,n+m-1))
+            n+=m
+        
+        result=[]
+        for i,j,x in _segment_intersections(a,b):
+            if (i,j) in adjacent and isinstance(x,Point):
+                shared=b[i] if j==i+1 else a[i]
+                if np.abs(np.array(x.coordinates)-shared).max()<=ABS_TOL:
+                    continue
+            result.append((i,j,x))
+        return result
+    
+    
+    def add_all(self):
+        """Adds together the segments of the polylines which are collinear and 
+        overlap or touch.
+        
+        The polylines are split into segments and each segment is given a key
+        of its line: the unit direction vector, pointing in the positive direction
+        of its first coordinate which is larger than ABS_TOL, and the point on 
+        the line closest to the origin, both rounded to ABS_TOL. Keys which 
+        differ by no more than one in each value, or which have opposite 
+        directions, are grouped as for plane keys. The segments are sorted by 
+        group and by the start of their interval along the line, and the 
+        intervals of each line are merged in a single sweep. This takes 
+        O(n log n) time.
+        
+        :returns: The merged segments, as polylines with two points, in the 
+            order of the first segment of each.
+        :rtype: Polylines
+        
+        .. rubric:: Code Example
+    
+        .. code-block:: python
+           
+           >>> from crossproduct import Point, Polyline, Polylines
+           >>> pls = Polylines(Polyline(Point(0,0), Point(1,0), Point(1,1)),
+                               Polyline(Point(2,0), Point(1,0)))
+           >>> print(pls.add_all())
+           Polylines(Polyline(Point(0.0, 0.0), Point(2.0, 0.0)), Polyline(Point(1.0, 0.0), Point(1.0, 1.0)))
+        
+        """
+        a,b=self._segment_arrays
+        lengths=np.linalg.norm(b-a,axis=1)
+        keep=lengths>ABS_TOL
+        a,b,lengths=a[keep],b[keep],lengths[keep]
+        if len(a)==0:
+            return Polylines()
+        
+        # the line key of each segment
+        d=(b-a)/lengths[:,np.newaxis]
+        d*=_direction_signs(d)
+        ta=(a*d).sum(axis=1)
+        tb=(b*d).sum(axis=1)
+        closest=a-ta[:,np.newaxis]*d
+        keys=np.round(np.hstack((d,closest))/ABS_TOL).astype(np.int64)
+        unique_keys,inverse=np.unique(keys,axis=0,return_inverse=True)
+        unique_groups=np.array(_group_plane_keys(list(map(tuple,unique_keys.tolist())),
+                                                 signed=d.shape[1]),
+                               dtype=np.int64)
+        groups=unique_groups[inverse.reshape(-1)]
+        
+        # the intervals of each line are measured along the direction of 
+        # its first segment, where the keys of a group have opposite directions
+        first=np.full(groups.max()+1,len(groups))
+        np.minimum.at(first,groups,np.arange(len(groups)))
+        flip=(d*d[first[groups]]).sum(axis=1)<0
+        ta[flip]*=-1
+        tb[flip]*=-1
+        
+        # the start and end of each interval along its line
+        forward=ta<=tb
+        start=np.where(forward,ta,tb)
+        end=np.where(forward,tb,ta)
+        start_points=np.where(forward[:,np.newaxis],a,b)
+        end_points=np.where(forward[:,np.newaxis],b,a)
+        
+        # sweep the sorted intervals of each line
+        order=np.lexsort((start,groups))
+        runs=[]  # (first segment index, start segment, end segment)
+        previous_group=-1
+        for i,g,s0,e0 in zip(order.tolist(),
+                             groups[order].tolist(),
+                             start[order].tolist(),
+                             end[order].tolist()):
+            if g==previous_group and s0<=run_end+ABS_TOL:
+                run[0]=min(run[0],i)
+                if e0>run_end:
+                    run[2]=i
+                    run_end=e0
+            else:
+                run=[i,i,i]
+                runs.append(run)
+                run_end=e0
+                previous_group=g
+        runs.sort()
+        
+        return Polylines(*(Polyline._from_point_array(PointArray(np.array([start_points[i],
+                                                                           end_points[j]])))
+                           for _,i,j in runs))
+    
+    
     def plot(self, ax=None, **kwargs):
         """Plots the polylines on the supplied axes.
         
@@ -1775,15 +3028,16 @@ class Polylines(FiniteGeometricObject):
     @property
     def points(self):
         ""
-        result=[]
-        for pl in self:
-            result.extend(pl)
-        return Points(*result)
+        if len(self)==0:
+            return Points()
+        return Points._from_point_array(
+            PointArray(np.concatenate([pl._items.array for pl in self]))
+            )
 
 
     def render(self,
            scene=None,
-           color=vpython.color.blue,
+           color=None,
            **kwargs
            ):
         ""
@@ -1791,6 +3045,9 @@ class Polylines(FiniteGeometricObject):
         if scene is None:
             scene=get_render_scene()
         
+        if color is None:
+            color=vpython.color.blue
+        
         for pl in self:
             pl.render(scene=scene,
                       color=color,
@@ -1915,7 +3172,7 @@ class Plane(InfiniteGeometricObject):
         elif self.N.is_perpendicular(line.vL): # plane and line are parallel 
             return GeometryObjects()
         else:
-            return self._intersect_line_skew(line)
+            return self._intersection_line_skew(line)
     
     
     def _intersection_line_skew(self,skew_line):
@@ -2099,9 +3356,114 @@ class Plane(InfiniteGeometricObject):
             return self._intersection_plane(obj)
         elif isinstance(obj,Line):
             return self._intersection_line(obj)
+        elif isinstance(obj,Polygon):
+            return GeometryObjects(*obj._intersection_plane_3D(self))
         else:
             raise Exception  # not implemented yet
     
+    
+    def intersection_lines(self,P0,vL):
+        """Returns the intersections of the plane and a batch of lines.
+        
+        The lines are given as arrays and are classified together as numpy
+        array operations. A line is parallel to the plane if the component of
+        its unit vector along the unit normal of the plane is within ABS_TOL 
+        of zero, and lies on the plane if its start point is also within 
+        ABS_TOL of the plane.
+        
+        :param P0: An (M,3) array of the start points of the lines.
+        :type P0: numpy.ndarray
+        :param vL: An (M,3) array of the line vectors.
+        :type vL: numpy.ndarray
+        
+        :returns: A tuple of (t, points, kinds). `t` is an (M,) array of the 
+            line parameters of the intersection points and `points` is an 
+            (M,3) array of the intersection points, which are nan for lines 
+            which do not cross the plane at a single point. `kinds` is an (M,) int8 array of 
+            1 for a line which crosses the plane at a point, 0 for a line 
+            which lies on the plane and -1 for a line which is parallel to 
+            the plane and does not intersect it.
+        :rtype: tuple
+        
+        .. rubric:: Code Example
+    
+        .. code-block:: python
+           
+           >>> from crossproduct import Point, Vector, Plane
+           >>> pn = Plane(Point(0,0,1), Vector(0,0,1))
+           >>> t, points, kinds = pn.intersection_lines([(0,0,0),(0,0,0)],
+                                                        [(1,0,2),(1,0,0)])
+           >>> print(t, points.tolist(), kinds)
+           [0.5 nan] [[0.5, 0.0, 1.0], [nan, nan, nan]] [ 1 -1]
+        
+        """
+        P0=np.asarray(P0,dtype=float).reshape(-1,3)
+        vL=np.asarray(vL,dtype=float).reshape(-1,3)
+        n=np.array(self.N.coordinates)
+        n=n/np.sqrt(n@n)
+        d0=self.signed_distances(P0)
+        dv=vL@n
+        lengths=np.sqrt((vL**2).sum(axis=1))
+        parallel=np.abs(dv)<=ABS_TOL*lengths
+        kinds=np.where(parallel,np.where(np.abs(d0)<=ABS_TOL,0,-1),1).astype(np.int8)
+        with np.errstate(divide='ignore',invalid='ignore'):
+            t=np.where(parallel,np.nan,-d0/dv)
+        return t,P0+t[:,np.newaxis]*vL,kinds
+    
+    
+    def intersection_segments(self,a,b):
+        """Returns the intersections of the plane and a batch of segments.
+        
+        The segments are given as arrays of their start and end points, 
+        such as the edges of a polygon or the segments of
+        a polyline, and are classified together as numpy array operations
+        using the signed distances of their end points to the plane. End 
+        points within ABS_TOL of the plane are taken to be on the plane.
+        
+        :param a: An (M,3) array of the start points of the segments.
+        :type a: numpy.ndarray
+        :param b: An (M,3) array of the end points of the segments.
+        :type b: numpy.ndarray
+        
+        :returns: A tuple of (t, points, kinds). `t` is an (M,) array of 
+            the parameters between 0 (the start point) and 1 (the end point) 
+            of the intersection points and `points` is an (M,3) array of the
+            intersection points, which are nan for segments which do not 
+            meet the plane at a single point. `kinds` is an (M,) int8 array of 1 for a segment 
+            which crosses or touches the plane at a single point, 0 for a 
+            segment which lies on the plane and -1 for a segment which does
+            not intersect the plane.
+        :rtype: tuple
+        
+        .. rubric:: Code Example
+    
+        .. code-block:: python
+           
+           >>> from crossproduct import Point, Vector, Plane
+           >>> pn = Plane(Point(0,0,1), Vector(0,0,1))
+           >>> t, points, kinds = pn.intersection_segments([(0,0,0),(0,0,2)],
+                                                           [(2,0,4),(1,0,3)])
+           >>> print(t, points.tolist(), kinds)
+           [0.25  nan] [[0.5, 0.0, 1.0], [nan, nan, nan]] [ 1 -1]
+        
+        """
+        a=np.asarray(a,dtype=float).reshape(-1,3)
+        b=np.asarray(b,dtype=float).reshape(-1,3)
+        da=self.signed_distances(a)
+        db=self.signed_distances(b)
+        on_a=np.abs(da)<=ABS_TOL
+        on_b=np.abs(db)<=ABS_TOL
+        contained=on_a & on_b
+        crosses=(((da<0) & (db>0)) | ((da>0) & (db<0))) & ~on_a & ~on_b
+        kinds=np.full(len(a),-1,dtype=np.int8)
+        kinds[crosses | (on_a ^ on_b)]=1
+        kinds[contained]=0
+        t=np.full(len(a),np.nan)
+        t[crosses]=da[crosses]/(da[crosses]-db[crosses])
+        t[on_a & ~on_b]=0
+        t[on_b & ~on_a]=1
+        return t,a+t[:,np.newaxis]*(b-a),kinds
+    
 
     @property
     def N(self):
@@ -2273,6 +3635,21 @@ class Plane(InfiniteGeometricObject):
            
         """
         return self.N.dot(point-self.P0) / self.N.length
+    
+    
+    def signed_distances(self,points):
+        """Returns the signed distances to a batch of points.
+        
+        :param points: An (M,3) array of points.
+        :type points: numpy.ndarray
+        
+        :return: An (M,) array of the signed distances between the plane and
+            the points, as for :meth:`signed_distance_to_point`.
+        :rtype: numpy.ndarray
+        
+        """
+        n=np.array(self.N.coordinates)
+        return (np.asarray(points,dtype=float)-self.P0.coordinates)@n / np.sqrt(n@n)
 
 
     
@@ -2285,6 +3662,11 @@ class Polygon(FiniteGeometricObject):
     
     This polygon cannot be self-intersecting, and can be concave or convex.
     
+    As a polygon is immutable, derived properties such as `plane`, `area`, 
+    `centroid` and `triangles` are cached after they are first calculated. 
+    Use `clear_cache` to remove the cached values, or set 
+    `crossproduct.crossproduct.USE_CACHE` to False to turn caching off.
+    
     :param points: Argument list of the Point instances of the vertices 
         of the polygon, in order. The first point is not repeated at the end. 
     :param holes: A sequence of polygons representing holes in the polygon.
@@ -2340,13 +3722,26 @@ class Polygon(FiniteGeometricObject):
     def __init__(self,*points,holes=None):
         ""
         
-        self._items=Points(*points)
+        self._items=PointArray.from_points(points)
         if holes is None:
             self._holes=Polygons()
         else:
             self._holes=Polygons(*holes)
         
         
+    @classmethod
+    def _from_point_array(cls,point_array,holes=None):
+        """Creates a new polygon directly from a PointArray of the exterior points.
+        """
+        result=cls.__new__(cls)
+        result._items=point_array
+        if holes is None:
+            result._holes=Polygons()
+        else:
+            result._holes=Polygons(*holes)
+        return result
+        
+        
         
     def __repr__(self):
         ""
@@ -2357,6 +3752,7 @@ class Polygon(FiniteGeometricObject):
         
     
     @property
+    @_cached_shapely
     def _shapely(self):
         """
         
@@ -2371,6 +3767,7 @@ class Polygon(FiniteGeometricObject):
 
 
     @property
+    @_cached
     def area(self):
         """The area of the polygon.
         
@@ -2380,23 +3777,15 @@ class Polygon(FiniteGeometricObject):
         if self.nD==2:
             return abs(float(self._shapely.area))
         elif self.nD==3:
-            plane=self.plane
-            N=plane.N
-            i=plane.N.index_largest_absolute_coordinate
-            self_2D=self.project_2D(i)
-            if i==0:
-                return abs(self_2D.area*(N.length/(N.x)))
-            elif i==1:
-                return abs(self_2D.area*(N.length/(N.y)))
-            elif i==2:
-                return abs(self_2D.area*(N.length/(N.z)))
-            else:
-                raise Exception
+            # the lengths of the Newell normals are twice the ring areas
+            return (self.plane.N.length
+                    -sum(hole.plane.N.length for hole in self.holes))/2
         else:
             raise ValueError
 
 
     @property
+    @_cached
     def azimuth(self):
         """The azimuth angle of the polygon from the y axis.
         
@@ -2426,6 +3815,7 @@ class Polygon(FiniteGeometricObject):
 
 
     @property
+    @_cached
     def centroid(self):
         """The centroid of the polygon.
         
@@ -2460,28 +3850,173 @@ class Polygon(FiniteGeometricObject):
             (((0, 0), (1, 0), (1, 1), (0, 1)), ())
         
         """
-        return tuple(pt.coordinates for pt in self.points)
-
-
+        return self._items.coordinates
+
+
+    def clear_cache(self):
+        """Clears any cached derived properties of the polygon and its holes.
+        
+        """
+        FiniteGeometricObject.clear_cache(self)
+        self.holes.clear_cache()
+        
+        
+    def contains_points(self,points,tri_state=False,index=None):
+        """Classifies points as inside, on the boundary of or outside the polygon.
+        
+        The points are tested against all the edges of the exterior and 
+        the holes at once using numpy arrays, using the crossing number
+        (even-odd) rule so points in holes are outside the polygon. 
+        Points within ABS_TOL of an edge are on the boundary.
+        
+        For polygons with many edges a slab index can be used. The edges 
+        are sorted into horizontal slabs and each point is only tested against 
+        the edges of its slab. The index is built on first use and is cached.
+        
+        :param points: The points, as a Points or PointArray instance or an
+            (N,2) or (N,3) array-like of coordinates.
+        :param tri_state: If True, an integer array is returned with 1 for 
+            points inside the polygon, 0 for points on the boundary and -1 for
+            points outside the polygon.
+        :type tri_state: bool
+        :param index: If True the slab index is used, if False it is not. 
+            If None it is used for polygons with more than 32 edges.
+        :type index: bool
+        
+        :returns: A boolean array which is True for points inside or 
+            on the boundary of the polygon, or a tri-state integer array.
+            For 3D polygons, points which do not lie on the plane of the
+            polygon are outside.
+        :rtype: numpy.ndarray
+        
+        .. rubric:: Code Example
+    
+        .. code-block:: python
+           
+           >>> from crossproduct import Point, Polygon
+           >>> pg = Polygon(Point(0,0), Point(2,0), Point(2,2), Point(0,2))
+           >>> print(pg.contains_points([(1,1),(2,1),(3,1)]))
+           [ True  True False]
+           >>> print(pg.contains_points([(1,1),(2,1),(3,1)], tri_state=True))
+           [ 1  0 -1]
+        
+        """
+        if isinstance(points,(Points,PointArray)):
+            points=points.array if isinstance(points,PointArray) else points._items.array
+        points=np.asarray(points,dtype=float).reshape(-1,self.nD)
+        
+        result=np.full(len(points),-1,dtype=np.int8)
+        if self.nD==3:
+            plane=self.plane
+            N=np.array(plane.N.coordinates,dtype=float)
+            distances=(points-plane.P0.coordinates).dot(N)/np.linalg.norm(N)
+            on_plane=np.abs(distances)<=ABS_TOL
+            i=plane.N.index_largest_absolute_coordinate
+            points2D=points[on_plane][:,[(i+1)%3,(i+2)%3]]
+        else:
+            on_plane=slice(None)
+            points2D=points
+        
+        a,b=self._edges_2D
+        if index or (index is None and len(a)>32):
+            lo,height,slabs=self._slab_index
+            k=np.clip(((points2D[:,1]-lo)//height).astype(np.int64),0,len(slabs)-1)
+            k[(points2D[:,1]<lo-ABS_TOL) | (points2D[:,1]>lo+height*len(slabs)+ABS_TOL)]=-1
+            states=np.full(len(points2D),-1,dtype=np.int8)
+            for slab in np.unique(k[k>=0]):
+                selected=np.flatnonzero(k==slab)
+                edges=slabs[slab]
+                states[selected]=_classify_points(points2D[selected],a[edges],b[edges])
+        else:
+            states=_classify_points(points2D,a,b)
+        result[on_plane]=states
+        
+        if tri_state:
+            return result
+        else:
+            return result>=0
+        
+        
+    @property
+    @_cached
+    def _edges_2D(self):
+        """The start and end points of the edges of the exterior and holes. 
+        
+        3D polygons are projected onto 2D as for `triangle_indices`.
+        
+        :returns: A tuple of two (E,2) arrays.
+        
+        """
+        rings=[self._items]+[hole._items for hole in self.holes]
+        if self.nD==3:
+            i=self.plane.N.index_largest_absolute_coordinate
+            rings=[r.project_2D(i) for r in rings]
+        a=np.concatenate([r.array for r in rings])
+        b=np.concatenate([np.roll(r.array,-1,axis=0) for r in rings])
+        return a,b
+    
+    
+    @property
+    @_cached
+    def _slab_index(self):
+        """An index of the edges which overlap each of a number of horizontal slabs.
+        
+        :returns: A tuple of (lo,height,slabs) where lo is the lowest y coordinate, 
+            height is the slab height and slabs is a list of the edge indices of
+            each slab.
+        
+        """
+        a,b=self._edges_2D
+        ymin=np.minimum(a[:,1],b[:,1])
+        ymax=np.maximum(a[:,1],b[:,1])
+        lo=float(ymin.min())
+        n=max(1,int(np.sqrt(len(a))))
+        height=max(float(ymax.max())-lo,ABS_TOL)/n
+        first=np.clip(((ymin-ABS_TOL-lo)//height).astype(np.int64),0,n-1)
+        last=np.clip(((ymax+ABS_TOL-lo)//height).astype(np.int64),0,n-1)
+        slabs=[np.flatnonzero((first<=k) & (last>=k)) for k in range(n)]
+        return lo,height,slabs
+        
+        
+    def _distance_to_point(self,point):
+        """Returns the shortest distance from the polygon to a point.
+        
+        :rtype: float
+        
+        """
+        if self.nD==2:
+            return float(self._shapely.distance(shapely.geometry.Point(point.coordinates)))
+        plane=self.plane
+        N=np.array(plane.N.coordinates,dtype=float)
+        N=N/np.linalg.norm(N)
+        p=np.array(point.coordinates,dtype=float)
+        h=float(np.dot(p-np.array(plane.P0.coordinates,dtype=float),N))
+        i=plane.N.index_largest_absolute_coordinate
+        foot=(p-h*N)[[(i+1)%3,(i+2)%3]]
+        if self.project_2D(i)._shapely.distance(shapely.geometry.Point(foot))<=ABS_TOL:
+            return abs(h)
+        # distance to the nearest edge of the exterior or the holes
+        d=np.inf
+        for ring in [self]+list(self.holes):
+            a=ring._items.array
+            b=np.roll(a,-1,axis=0)
+            ab=b-a
+            t=np.clip(((p-a)*ab).sum(axis=1)/(ab*ab).sum(axis=1),0,1)
+            d=min(d,float(np.sqrt(((a+t[:,np.newaxis]*ab-p)**2).sum(axis=1)).min()))
+        return d
+    
+    
     def _difference_polygon_3D(self,polygon):
         ""
-        a=self.plane.intersection(polygon.plane) # returns () or (Line,) or (Plane,)
-        #print(a)
-        
-        if len(a)==0: # polygon planes do not intersect
-            return tuple([self])
-        
-        elif isinstance(a[0],Line): # the intersection of the two polygon planes as a line
-            return tuple([self])
-
-        elif isinstance(a[0],Plane): # polygons lie on the same plane
-            
-            plane=self.plane
-            i=plane.N.index_largest_absolute_coordinate
-            self_2D=self.project_2D(i)
-            polygon_2D=polygon.project_2D(i)
-            result=self_2D.difference(polygon_2D)
-            return tuple(x.project_3D(plane,i) for x in result)
+        if not _plane_keys_match(self.plane_key,polygon.plane_key):
+            return tuple([self]) # the polygons do not lie on the same plane
+        
+        plane=self.plane
+        i=plane.N.index_largest_absolute_coordinate
+        self_2D=self.project_2D(i)
+        polygon_2D=polygon.project_2D(i)
+        result=self_2D.difference(polygon_2D)
+        return tuple(x.project_3D(plane,i) for x in result)
            
         
     def _difference_polygons_3D(self,polygons):
@@ -2489,12 +4024,21 @@ class Polygon(FiniteGeometricObject):
         if len(polygons)==0:
             return GeometryObjects(self)
         else:
-            #raise Exception ## to do
-            x=Polygons(self)
-            for pg in self.polygons:
-                for pg1 in polygons:
-                    x=Polygons(*x.difference(pg))
-            return GeometryObjects(*x)
+            # only the coplanar polygons are subtracted, with each polygon 
+            # projected to 2D once
+            key=self.plane_key
+            coplanar=[i for i in polygons.tree.query_intersecting(self)
+                      if _plane_keys_match(key,polygons[i].plane_key)]
+            if len(coplanar)==0:
+                return GeometryObjects(self)
+            plane=self.plane
+            k=plane.N.index_largest_absolute_coordinate
+            x=Polygons(self.project_2D(k))
+            for i in coplanar:
+                x=Polygons(*x.difference(polygons[i].project_2D(k)))
+                if len(x)==0:
+                    break
+            return GeometryObjects(*(pg.project_3D(plane,k) for pg in x))
         
 
     def difference(self,obj):
@@ -2531,12 +4075,130 @@ class Polygon(FiniteGeometricObject):
             
         else:
             raise ValueError
+            
+            
+    def _convex_pair_2D(self,polygon):
+        """Returns the anticlockwise 2D vertices of this polygon and another 
+        polygon, for :meth:`intersection_convex` and :meth:`difference_convex`.
+        
+        :raises ValueError: If either polygon is not convex or has holes.
+        
+        :returns: None if the polygons do not overlap, otherwise a tuple of 
+            the vertex lists of the two polygons and a function which converts
+            a (K,2) array of anticlockwise vertices back to a polygon with 
+            the orientation and dimensions of this polygon.
+        
+        """
+        if not (self._convex and polygon._convex):
+            raise ValueError('The polygons must be convex and have no holes.')
+        bounds,bounds1=self.bounds,polygon.bounds
+        nD=len(bounds)//2
+        for i in range(nD):
+            if bounds[i]>bounds1[nD+i]+ABS_TOL or bounds1[i]>bounds[nD+i]+ABS_TOL:
+                return None
+        if nD==3:
+            if not _plane_keys_match(self.plane_key,polygon.plane_key):
+                return None
+            plane=self.plane
+            k=plane.N.index_largest_absolute_coordinate
+            P=self._items.project_2D(k).array
+            Q=polygon._items.project_2D(k).array
+        else:
+            P,Q=self._items.array,polygon._items.array
+        
+        def signed_area(x):
+            y=np.roll(x,-1,axis=0)
+            return (x[:,0]*y[:,1]-y[:,0]*x[:,1]).sum()
+        
+        clockwise=signed_area(P)<0
+        if clockwise:
+            P=P[::-1]
+        if signed_area(Q)<0:
+            Q=Q[::-1]
         
+        def to_polygon(x):
+            x=PointArray(np.asarray(x,dtype=float)[::-1 if clockwise else 1])
+            if nD==3:
+                x=x.project_3D(plane,k)
+            return Polygon._from_point_array(x)
+        
+        return P.tolist(),Q.tolist(),to_polygon
+        
+        
+    def difference_convex(self,polygon):
+        """The difference between this convex polygon and another convex polygon.
+        
+        The difference is found without converting the polygons to shapely
+        objects. The part of this polygon which is outside each edge of the 
+        other polygon is split off in turn (see :func:`_convex_difference_2D`), 
+        so the result is a set of convex pieces without holes which do not 
+        overlap. 3D polygons are only subtracted if they lie on the same plane.
+        
+        :param polygon: A convex polygon without holes.
+        :type polygon: Polygon
+        
+        :raises ValueError: If either polygon is not convex or has holes.
+        
+        :returns: The pieces, which have the same orientation as this polygon.
+            This is the polygon itself if the polygons do not overlap by a 
+            non-zero area.
+        :rtype: GeometryObjects
+        
+        .. rubric:: Code Example
+    
+        .. code-block:: python
+           
+           >>> from crossproduct import Point, Polygon
+           >>> pg = Polygon(Point(0,0),Point(2,0),Point(2,2),Point(0,2))
+           >>> pg1 = Polygon(Point(1,-1),Point(3,-1),Point(3,1),Point(1,1))
+           >>> print(pg.difference_convex(pg1))
+           GeometryObjects(Polygon(Point(0.0, 0.0),Point(1.0, 0.0),Point(1.0, 2.0),Point(0.0, 2.0)), Polygon(Point(2.0, 1.0),Point(2.0, 2.0),Point(1.0, 2.0),Point(1.0, 1.0)))
+        
+        """
+        pair=self._convex_pair_2D(polygon)
+        if pair is None:
+            return GeometryObjects(self)
+        P,Q,to_polygon=pair
+        pieces=_convex_difference_2D(P,Q)
+        if pieces is None:
+            return GeometryObjects(self)
+        return GeometryObjects(*(to_polygon(x) for x in pieces))
+        
+    
+    @property
+    def bounds(self):
+        """The minimum and maximum coordinates of the polygon exterior.
+        
+        :rtype: tuple
+        
+        """
+        return self._items.bounds
+    
+    
+    @property
+    @_cached
+    def _convex(self):
+        """True if the polygon is convex and has no holes.
+        
+        The turns at all the vertices of the exterior, in 2D or in the 
+        projection of a 3D polygon, must be in the same direction.
+        """
+        if len(self.holes)>0:
+            return False
+        x=self._items.array
+        if self.nD==3:
+            i=self.plane.N.index_largest_absolute_coordinate
+            x=x[:,[(i+1)%3,(i+2)%3]]
+        e=np.roll(x,-1,axis=0)-x
+        turns=e[:,0]*np.roll(e[:,1],-1)-e[:,1]*np.roll(e[:,0],-1)
+        return bool((turns>=-ABS_TOL).all() or (turns<=ABS_TOL).all())
+    
     
     @property
+    @_cached
     def exterior(self):
         ""
-        return Polygon(*self.points)
+        return Polygon._from_point_array(self._items)
     
 
     @property
@@ -2578,9 +4240,69 @@ class Polygon(FiniteGeometricObject):
             raise Exception
         
     
+    def _intersection_plane_3D(self,plane):
+        """Returns the intersection of the polygon and a plane.
+        
+        The edges of the exterior and holes are intersected with the plane
+        together using :meth:`Plane.intersection_segments`, and the crossing
+        points are sorted along the line where the planes meet. For a convex 
+        polygon without holes the intersection is the span of the crossing 
+        points. Otherwise the sorted crossing points are taken in pairs as the
+        start and end points of the segments inside the polygon. This is done 
+        twice, with the vertices which lie on the plane taken to be on 
+        one side of the plane and then on the other, and the two sets of 
+        segments are merged so that edges and vertices which touch the plane 
+        are included.
+        """
+        rings=[self._items.array]+[hole._items.array for hole in self.holes]
+        a=np.concatenate(rings)
+        ends=np.cumsum([len(ring) for ring in rings])
+        nxt=np.arange(1,len(a)+1)
+        nxt[ends-1]=np.concatenate(([0],ends[:-1]))
+        t,points,kinds=plane.intersection_segments(a,a[nxt])
+        if (kinds==-1).all():
+            return tuple()
+        elif (kinds==0).all():
+            return (self,)
+        
+        u=np.cross(plane.N.coordinates,self.plane.N.coordinates)
+        if self._convex:
+            points=np.concatenate((points[kinds==1],a[kinds==0],a[nxt][kinds==0]))
+            s=points@u
+            intervals=[(s.min(),s.max(),points[np.argmin(s)],points[np.argmax(s)])]
+        else:
+            d=plane.signed_distances(a)
+            on=np.abs(d)<=ABS_TOL
+            intervals=[]
+            for side in (1,-1):
+                sides=np.where(on,side,np.sign(d))
+                x=points[sides!=sides[nxt]]
+                s=x@u
+                order=np.argsort(s,kind='stable')
+                intervals.extend(zip(s[order][0::2],s[order][1::2],
+                                     x[order][0::2],x[order][1::2]))
+            intervals.sort(key=lambda x: x[0])
+        
+        # merge the overlapping intervals along the line
+        tol=ABS_TOL*np.sqrt(u@u)
+        merged=[]
+        for s0,s1,p0,p1 in intervals:
+            if merged and s0<=merged[-1][1]+tol:
+                if s1>merged[-1][1]:
+                    merged[-1][1]=s1
+                    merged[-1][3]=p1
+            else:
+                merged.append([s0,s1,p0,p1])
+        return tuple(Point(*p0) if s1-s0<=tol else Polyline(Point(*p0),Point(*p1))
+                     for s0,s1,p0,p1 in merged)
+        
+    
     def _intersection_polygon_3D(self,polygon):
         ""
-        a=self.plane.intersection(polygon.plane) # returns () or (Line,) or (Plane,)
+        if _plane_keys_match(self.plane_key,polygon.plane_key):
+            a=(self.plane,) # polygons lie on the same plane
+        else:
+            a=self.plane.intersection(polygon.plane) # returns () or (Line,) or (Plane,)
         #print(a)
         if len(a)==0: # polygon planes do not intersect
             return tuple()
@@ -2609,10 +4331,9 @@ class Polygon(FiniteGeometricObject):
         
     def _intersection_polygons_3D(self,polygons):
         ""
-        result=set()
-        for pg in polygons:
-            x=self.intersection(pg)
-            result.update(x)
+        result=[]
+        for i in polygons.tree.query_intersecting(self):
+            result.extend(self.intersection(polygons[i]))
         return tuple(result)
         
     
@@ -2643,6 +4364,8 @@ class Polygon(FiniteGeometricObject):
             
             if isinstance(obj,Line):
                 return self._intersection_line_3D(obj)
+            elif isinstance(obj,Plane):
+                return self._intersection_plane_3D(obj)
             elif isinstance(obj,Polygon):
                 return self._intersection_polygon_3D(obj)
             elif isinstance(obj,Polygons):
@@ -2654,6 +4377,46 @@ class Polygon(FiniteGeometricObject):
             raise ValueError
             
             
+    def intersection_convex(self,polygon):
+        """The intersection of this convex polygon and another convex polygon.
+        
+        The intersection is found in O(n+m) time by the algorithm of 
+        O'Rourke et al. (see :func:`_convex_intersection_2D`), without 
+        converting the polygons to shapely objects, so this is faster than 
+        :meth:`intersection` for small polygons such as triangles and quads.
+        3D polygons are only intersected if they lie on the same plane.
+        
+        :param polygon: A convex polygon without holes.
+        :type polygon: Polygon
+        
+        :raises ValueError: If either polygon is not convex or has holes.
+        
+        :returns: The intersection polygon, which has the same orientation 
+            as this polygon. Intersections with a zero area, where the 
+            polygons only touch, are not returned.
+        :rtype: GeometryObjects
+        
+        .. rubric:: Code Example
+    
+        .. code-block:: python
+           
+           >>> from crossproduct import Point, Polygon
+           >>> pg = Polygon(Point(0,0),Point(2,0),Point(2,2),Point(0,2))
+           >>> pg1 = Polygon(Point(1,1),Point(3,1),Point(3,3),Point(1,3))
+           >>> print(pg.intersection_convex(pg1))
+           GeometryObjects(Polygon(Point(2.0, 1.0),Point(2.0, 2.0),Point(1.0, 2.0),Point(1.0, 1.0)))
+        
+        """
+        pair=self._convex_pair_2D(polygon)
+        if pair is None:
+            return GeometryObjects()
+        P,Q,to_polygon=pair
+        x=_convex_intersection_2D(P,Q)
+        if len(x)==0:
+            return GeometryObjects()
+        return GeometryObjects(to_polygon(x))
+    
+    
     def intersects(self,obj):
         """Returns True if self intersects in any way with obj
         
@@ -2722,7 +4485,7 @@ class Polygon(FiniteGeometricObject):
             2
             
         """
-        return self.points[0].nD
+        return self._items.nD
             
     
     def next_index(self,i):
@@ -2746,7 +4509,7 @@ class Polygon(FiniteGeometricObject):
             1
         
         """
-        n=len(self.points)
+        n=len(self._items)
         if i==n-1:
             return 0
         else:
@@ -2756,24 +4519,71 @@ class Polygon(FiniteGeometricObject):
     
             
     @property
+    @_cached
     def plane(self):
         """Returns the plane of the 3D polygon
         
+        The plane normal is found using Newell's method, as the sum of the 
+        cross products of all consecutive exterior vertices. This is robust 
+        to collinear vertices and to the polygon not being convex, and the
+        normal points in the anticlockwise direction of the vertices 
+        with a length of twice the area of the exterior.
+        
+        :raises ValueError: If the polygon is 2D or has zero area.
+        
         :return plane: a 3D plane which contains all the polygon points
         :rtype: Plane3D
         
         """
         if self.nD==3:
-            for i in range(0,len(self)+1-3):
-                P0,P1,P2=self.points[i:i+3]
-                N=(P1-P0).cross_product(P2-P1)
-                if N.length>ABS_TOL:
-                    return Plane(P0,N)
+            # relative to the first vertex, which reduces rounding errors and 
+            # removes the two edges at the first vertex from the sum
+            a=self._items.array
+            a=a[1:]-a[0]
+            N=(a[:-1,[1,2,0]]*a[1:,[2,0,1]]-a[:-1,[2,0,1]]*a[1:,[1,2,0]]).sum(axis=0)
+            if np.linalg.norm(N)>ABS_TOL:
+                return Plane(self._items[0],Vector(*N.tolist()))
         else:
             raise ValueError
         raise ValueError('3D polygon has no plane')
             
             
+    @property
+    @_cached
+    def plane_key(self):
+        """A hashable key of the plane of a 3D polygon.
+        
+        The plane normal is made a unit vector pointing in the positive direction
+        of its first coordinate which is larger than ABS_TOL. The normal and the 
+        distance of the plane from the origin are then divided by ABS_TOL and 
+        rounded to integers. Polygons on the same plane have keys which are 
+        equal, or which differ by one in some of the values where the rounding 
+        falls either side of a boundary, or which are negated where the first
+        coordinate of the normal is close to ABS_TOL.
+        
+        :raises ValueError: If the polygon is 2D or has zero area.
+        
+        :returns: A tuple of four integers.
+        :rtype: tuple
+        
+        .. rubric:: Code Example
+    
+        .. code-block:: python
+           
+           >>> from crossproduct import Point, Polygon
+           >>> pg = Polygon(Point(0,0,1),Point(0,1,1),Point(1,1,1),Point(1,0,1))
+           >>> print(pg.plane_key)
+           (0, 0, 10000000, 10000000)
+        
+        """
+        plane=self.plane
+        N=np.array(plane.N.coordinates,dtype=float)
+        N=N/np.linalg.norm(N)
+        N*=_direction_signs(N[np.newaxis])[0]
+        d=np.dot(N,plane.P0.coordinates)
+        return tuple(int(x) for x in np.round(np.append(N,d)/ABS_TOL))
+    
+    
     def plot(self, ax=None, set_lims=False, **kwargs):
         """Plots the polygon on the supplied axes.
         
@@ -2797,7 +4607,7 @@ class Polygon(FiniteGeometricObject):
                 ax.fill(*zip(*tri.coordinates), **kwargs)
         elif self.nD==3:
             verts=[tri.coordinates for tri in self.polygons]
-            pc=Poly3DCollection(verts,**kwargs)
+            pc=art3d.Poly3DCollection(verts,**kwargs)
             ax.add_collection3d(pc)
                 
         if set_lims:
@@ -2818,8 +4628,11 @@ class Polygon(FiniteGeometricObject):
     @property
     def points(self):
         """Returns the exterior points.
+        
+        :rtype: Points
+        
         """
-        return self._items
+        return Points._from_point_array(self._items)
             
     @property
     def polyline(self):
@@ -2857,6 +4670,7 @@ class Polygon(FiniteGeometricObject):
 
 
     @property
+    @_cached
     def polygons(self):
         """An equivalent polygons collection representing the polygon and its holes.
         
@@ -2909,38 +4723,39 @@ class Polygon(FiniteGeometricObject):
             
     def _project_2D_exterior(self,coordinate_index):
         ""
-        return Polygon(*(x.project_2D(coordinate_index) 
-                         for x in self.points))
+        return Polygon._from_point_array(self._items.project_2D(coordinate_index))
             
             
+    @_cached
     def project_2D(self,coordinate_index):
         """Projects the object on a 2D plane.
         
         """
-        return Polygon(*self._project_2D_exterior(coordinate_index).points,
-                       holes=[hole._project_2D_exterior(coordinate_index)
-                              for hole in self.holes])
+        return Polygon._from_point_array(self._items.project_2D(coordinate_index),
+                                         holes=[hole._project_2D_exterior(coordinate_index)
+                                                for hole in self.holes])
     
     
     def _project_3D_exterior(self,plane,coordinate_index):
         ""
-        return Polygon(*(x.project_3D(plane,coordinate_index) 
-                         for x in self.points))
+        return Polygon._from_point_array(self._items.project_3D(plane,
+                                                                coordinate_index))
     
     
     def project_3D(self,plane,coordinate_index):
         """Projects the object on a 3D plane.
         
         """
-        return Polygon(*self._project_3D_exterior(plane,coordinate_index).points,
-                       holes=[hole._project_3D_exterior(plane,coordinate_index)
-                              for hole in self.holes])
+        return Polygon._from_point_array(self._items.project_3D(plane,
+                                                                coordinate_index),
+                                         holes=[hole._project_3D_exterior(plane,coordinate_index)
+                                                for hole in self.holes])
     
 
 
     def render(self,
            scene=None,
-           color=vpython.color.blue,
+           color=None,
            **kwargs
            ):
         ""
@@ -2948,6 +4763,9 @@ class Polygon(FiniteGeometricObject):
         if scene is None:
             scene=get_render_scene()
         
+        if color is None:
+            color=vpython.color.blue
+        
         for tri in self.triangles:
             vs=[]
             for pt in tri.points:
@@ -2985,9 +4803,8 @@ class Polygon(FiniteGeometricObject):
             Polygon(Point(1,1,0), Point(1,0,0), Point(0,0,0))
         
         """
-        points=[self.points[i] 
-                for i in range(len(self.points)-1,-1,-1)]
-        return self.__class__(*points, holes=self.holes)
+        return self.__class__._from_point_array(self._items.reverse,
+                                                holes=self.holes)
            
     
     
@@ -3044,6 +4861,7 @@ class Polygon(FiniteGeometricObject):
     
     
     @property
+    @_cached
     def tilt(self):
         """The tilt angle of the polygon from the horizontal.
         
@@ -3056,83 +4874,67 @@ class Polygon(FiniteGeometricObject):
     
     
     @property
-    def triangles(self):
-        """Returns a Polygons sequence of triangles which when combined have 
-            the same shape as the polygon.
-            
-        Triangles have no holes.
-        
-        2d only
-        
-        :rtype: Polygons
+    @_cached
+    def triangle_indices(self):
+        """The triangulation of the polygon as vertices and vertex indices.
+        
+        The exterior and any holes are triangulated in a single constrained 
+        pass. The `triangle` package is used if it is installed, otherwise 
+        the polygon is triangulated using :func:`triangulate_polygon`. 
+        3D polygons are triangulated in their 2D projection.
+        
+        :returns: A tuple of (vertices, indices). `vertices` is a PointArray 
+            which starts with the exterior vertices followed by the vertices of 
+            each hole. `indices` is an (M,3) integer array of the vertex indices
+            of each triangle.
+        :rtype: tuple
         
+        .. rubric:: Code Example
+    
+        .. code-block:: python
+           
+           >>> from crossproduct import Point, Polygon
+           >>> pg = Polygon(Point(0,0), Point(1,0), Point(1,1), Point(0,1))
+           >>> vertices, indices = pg.triangle_indices
+           >>> print(indices)
+           [[3 0 1]
+            [1 2 3]]
         
         """
+        rings=[self._items]+[hole._items for hole in self.holes]
         if self.nD==2:
-            
-            if len(self.holes)==0:
-                
-                vertices=self.coordinates
-                segments=[[x,x+1] for x in range(len(self.points))]
-                segments[-1][1]=0
-                A=dict(vertices=vertices,
-                       segments=segments)
-                B=tr.triangulate(A,'p')
-                tris=[]
-                if 'triangles' in B:
-                    for x in B['triangles']:
-                        tri=Polygon(*(Point(*B['vertices'][y]) for y in x))
-                        tris.append(tri)
-                return Polygons(*tris)
-            
-            else:
-                
-                pgs=self.polygons
-                result=[]
-                for pg in pgs:
-                    result.extend(pg.triangles)
-                return Polygons(*result)
-                
-                # exterior vertices and segments
-                vertices=list(self.coordinates)
-                segments=[[x,x+1] for x in range(len(self.points))]
-                segments[-1][1]=0
-                holes=[]
-                # holes vertices and segments
-                for hole in self.holes:
-                    vertices.extend(hole.coordinates)
-                    n=len(segments)
-                    segments.extend([[x,x+1] for x in range(n,n+len(self.points))])
-                    segments[-1][1]=n
-                    holes.append(hole.exterior.triangles[0].centroid.coordinates)
-                # get triangles
-                A=dict(vertices=vertices,
-                       segments=segments,
-                       holes=holes)
-                #print(A)
-                B=tr.triangulate(A,'p')
-                #print(B['triangles'])
-                #print(len(vertices))
-                #print(B)
-                #print(len(B['vertices']))
-                tris=[]
-                if 'triangles' in B:
-                    for x in B['triangles']:
-                        tri=Polygon(*(Point(*B['vertices'][y]) for y in x))
-                        tris.append(tri)
-                return Polygons(*tris)  #  each polygon is a triangle with no holes
-            
+            vertices,indices=_triangulate_2D([r.array for r in rings])
+            return PointArray(vertices),indices
         elif self.nD==3:
-            
             plane=self.plane
             i=plane.N.index_largest_absolute_coordinate
-            self_2D=self.project_2D(i)
-            result=self_2D.triangles
-            return Polygons(*(x.project_3D(plane,i) for x in result))
-           
+            vertices,indices=_triangulate_2D([r.project_2D(i).array for r in rings])
+            if len(vertices)==sum(len(r) for r in rings):
+                vertices=np.concatenate([r.array for r in rings])
+                return PointArray(vertices),indices
+            else: # vertices have been added by the triangulation
+                return PointArray(vertices).project_3D(plane,i),indices
         else:
-            
             raise ValueError
+    
+    
+    @property
+    @_cached
+    def triangles(self):
+        """Returns a Polygons sequence of triangles which when combined have 
+            the same shape as the polygon.
+            
+        Triangles have no holes. See :attr:`triangle_indices` for how the
+        polygon is triangulated.
+        
+        :rtype: Polygons
+        
+        
+        """
+        vertices,indices=self.triangle_indices
+        vertices=vertices.array
+        return Polygons(*(Polygon._from_point_array(PointArray(vertices[x]))
+                          for x in indices))
             
             
             
@@ -3192,46 +4994,462 @@ class Polygon(FiniteGeometricObject):
         else:
             raise Exception
     
-
-class Polygons(FiniteGeometricObject):
-    """A collection of 2D or 3D polygons.    
+
+class Polygons(FiniteGeometricObject):
+    """A collection of 2D or 3D polygons.    
+    
+    :param polygons: A sequence of Polygon instances. 
+        
+    .. rubric:: Code Example
+    
+    .. code-block:: python
+        
+        >>> pgs = Polygons(Polygon(Point(0,0), Point(1,0), Point(1,1)))                       
+        >>> print(pgs)
+        Polygons(Polygon(Point(0,0), Point(1,0), Point(1,1)))
+        
+        >>> print(pgs[0])
+        Polygon(Point(0,0), Point(1,0), Point(1,1))
+    """
+    
+    def __init__(self,*polygons):
+        ""
+        self._items=tuple(polygons)
+    
+    @property
+    @_cached_shapely
+    def _shapely(self):
+        ""
+        if len(self)==0 or self.nD==2:
+            x=[shapely.geometry.Polygon(pg1.coordinates) 
+               for pg in self
+               for pg1 in pg.polygons]
+            return shapely.geometry.MultiPolygon(x)
+        else:
+            raise Exception  # only 2d for shapely polygons
+
+
+    @property
+    @_cached
+    def tree(self):
+        """A spatial index of the bounding boxes of the polygons.
+        
+        The tree is built on first access and is cached.
+        
+        :rtype: STRtree
+        
+        """
+        return STRtree(self)
+    
+    
+    @property
+    @_cached
+    def bvh(self):
+        """A bounding volume hierarchy of the triangles of the polygons, for
+        ray casting.
+        
+        The hierarchy is built on first access and is cached.
+        
+        :rtype: BVH
+        
+        """
+        return BVH(self)
+    
+    
+    def clear_cache(self):
+        """Clears any cached derived properties of the polygons collection
+        and of each polygon.
+        
+        """
+        FiniteGeometricObject.clear_cache(self)
+        for pg in self:
+            pg.clear_cache()
+            
+
+    def _difference_polygon_3D(self,polygon):
+        ""
+        key=polygon.plane_key
+        candidates={i for i in self.tree.query_intersecting(polygon)
+                    if _plane_keys_match(self[i].plane_key,key)}
+        result=[]
+        for i,pg in enumerate(self):
+            if i in candidates:
+                result.extend(pg.difference(polygon))
+            else:
+                result.append(pg)
+        return GeometryObjects(*result)
+    
+    
+    def _clip_convex(self,polygons):
+        """Returns the arrays for clipping the convex polygons in self by the 
+        convex polygons in the same positions in another collection, for 
+        :meth:`intersection_convex` and :meth:`difference_convex`.
+        
+        Each polygon in `polygons` is described by the half-planes inside its 
+        edges, as the outward unit normals of the edges in the plane of the 
+        polygon. The pairs whose bounding boxes overlap, and for 3D polygons 
+        which lie on the same plane, are clipped by one edge of each pair 
+        in turn as array operations on all the pairs (see :func:`_clip_rings`).
+        
+        :raises ValueError: If the collections have different lengths, or if
+            any of the polygons are not convex or have holes.
+        
+        :returns: A tuple of the (R,) array of the indices of the pairs 
+            which are clipped, the (K,nD) array of the vertices of their 
+            polygons in self, the (K,) array of the position in the pairs of
+            each vertex, and a list of the (R,nD) arrays of a point and the 
+            unit normal of one edge of each of the other polygons, for each
+            edge. Polygons with fewer edges have a zero normal for the 
+            remaining edges, which leaves them unchanged.
+        
+        """
+        if len(self)!=len(polygons):
+            raise ValueError('The polygon collections must have the same length.')
+        if not all(pg._convex for pg in self) or not all(pg._convex for pg in polygons):
+            raise ValueError('The polygons must be convex and have no holes.')
+        if len(self)==0:
+            return np.zeros(0,dtype=np.int64),np.zeros((0,2)),np.zeros(0,dtype=np.int64),[]
+        
+        bounds=np.array([pg.bounds for pg in self],dtype=float)
+        bounds1=np.array([pg.bounds for pg in polygons],dtype=float)
+        nD=bounds.shape[1]//2
+        pairs=((bounds[:,:nD]<=bounds1[:,nD:]+ABS_TOL)
+               &(bounds1[:,:nD]<=bounds[:,nD:]+ABS_TOL)).all(axis=1)
+        if nD==3:
+            pairs&=np.array([_plane_keys_match(pg.plane_key,pg1.plane_key) 
+                             for pg,pg1 in zip(self,polygons)])
+        pairs=np.flatnonzero(pairs)
+        
+        arrays=[self[i]._items.array for i in pairs.tolist()]
+        arrays1=[polygons[i]._items.array for i in pairs.tolist()]
+        m=max((len(x) for x in arrays1),default=0)
+        points=np.zeros((len(pairs),m,nD))
+        normals=np.zeros((len(pairs),m,nD))
+        for k,x in enumerate(arrays1):
+            e=np.roll(x,-1,axis=0)-x
+            if nD==2:
+                y=np.roll(x,-1,axis=0)
+                n=np.column_stack((e[:,1],-e[:,0]))
+                if (x[:,0]*y[:,1]-y[:,0]*x[:,1]).sum()<0:
+                    n=-n
+            else:
+                n=np.cross(e,polygons[pairs[k]].plane.N.coordinates)
+            lengths=np.sqrt((n**2).sum(axis=1))
+            points[k,:len(x)]=x
+            normals[k,:len(x)]=n/np.where(lengths>0,lengths,1)[:,np.newaxis]
+        
+        if arrays:
+            vertices=np.concatenate(arrays)
+        else:
+            vertices=np.zeros((0,nD))
+        ring_ids=np.repeat(np.arange(len(arrays)),[len(x) for x in arrays])
+        half_planes=[(points[:,j],normals[:,j]) for j in range(m)]
+        return pairs,vertices,ring_ids,half_planes
+    
+    
+    @staticmethod
+    def _intersect_half_planes(vertices,ring_ids,half_planes):
+        """Clips the rings of :meth:`_clip_convex` by all the half-planes.
+        
+        :returns: A tuple of the vertices and ring ids of the clipped rings 
+            which have a non-zero area.
+        
+        """
+        for points,normals in half_planes:
+            if len(vertices)==0:
+                break
+            d=((vertices-points[ring_ids])*normals[ring_ids]).sum(axis=1)
+            vertices,ring_ids=_clip_rings(vertices,ring_ids,d)
+        return _remove_degenerate_rings(vertices,ring_ids)
+    
+    
+    def _from_rings(self,vertices,ring_ids):
+        """Returns the polygons of a batch of rings.
+        """
+        if len(vertices)==0:
+            return []
+        starts=np.flatnonzero(np.diff(ring_ids,prepend=-1))
+        return [Polygon._from_point_array(PointArray(x)) 
+                for x in np.split(vertices,starts[1:])]
+    
+    
+    def difference_convex(self,polygons):
+        """The differences between the convex polygons in self and the convex
+        polygons in the same positions in another collection.
+        
+        This is a batch version of :meth:`Polygon.difference_convex`. The 
+        overlapping pairs are found as for :meth:`intersection_convex`, and the
+        part of each polygon which is outside each edge of the other polygon 
+        is then split off, for one edge of all the pairs at a time, as array
+        operations.
+        
+        :param polygons: A collection of convex polygons without holes, with 
+            the same length as self.
+        :type polygons: Polygons
+        
+        :raises ValueError: If the collections have different lengths, or if
+            any of the polygons are not convex or have holes.
+        
+        :returns: A tuple of the Polygons of the convex pieces, and an (K,) 
+            array of the index of the pair of each piece. The pieces are in 
+            the order of the pairs and have the same orientation as the 
+            polygons in self. The polygons which do not overlap the other 
+            polygon by a non-zero area are returned unchanged.
+        :rtype: tuple
+        
+        """
+        pairs,vertices,ring_ids,half_planes=self._clip_convex(polygons)
+        
+        # the overlapping pairs, and the polygons covered by the other polygon
+        x,y=self._intersect_half_planes(vertices,ring_ids,half_planes)
+        areas=np.zeros(len(pairs))
+        if len(x)>0:
+            starts,_,x_areas=_ring_areas(x,y)
+            areas[y[starts]]=x_areas
+        overlap=areas>0
+        if len(vertices)>0:
+            covered=areas>=_ring_areas(vertices,ring_ids)[2]-ABS_TOL
+        else:
+            covered=overlap
+        
+        split=overlap&~covered
+        keep=split[ring_ids]
+        vertices,ring_ids=vertices[keep],ring_ids[keep]
+        pieces=[]
+        for j,(points,normals) in enumerate(half_planes):
+            if len(vertices)==0:
+                break
+            d=((vertices-points[ring_ids])*normals[ring_ids]).sum(axis=1)
+            # the polygons with fewer edges have no piece outside the padding edges
+            outside=np.where(normals[ring_ids].any(axis=1),-d,1.0)
+            x,y=_remove_degenerate_rings(*_clip_rings(vertices,ring_ids,outside))
+            pieces.append((x,y*len(half_planes)+j))
+            vertices,ring_ids=_remove_degenerate_rings(*_clip_rings(vertices,ring_ids,d))
+        if pieces:
+            vertices=np.concatenate([x for x,_ in pieces])
+            keys=np.concatenate([y for _,y in pieces])
+            order=np.argsort(keys,kind='stable')
+            vertices,keys=vertices[order],keys[order]
+        else:
+            vertices,keys=np.zeros((0,2)),np.zeros(0,dtype=np.int64)
+        starts=np.flatnonzero(np.diff(keys,prepend=-1))
+        split_ids=pairs[keys[starts]//max(len(half_planes),1)]
+        
+        overlapping=np.zeros(len(self),dtype=bool)
+        overlapping[pairs[overlap]]=True
+        result=[[pg] if not overlapping[i] else [] for i,pg in enumerate(self)]
+        for i,pg in zip(split_ids.tolist(),self._from_rings(vertices,keys)):
+            result[i].append(pg)
+        index=np.repeat(np.arange(len(result)),[len(x) for x in result])
+        return Polygons(*(pg for x in result for pg in x)),index
+    
+    
+    def difference_each(self,polygons,max_workers=None,chunksize=100):
+        """The geometric difference of each polygon in self and each polygon 
+        in another collection which it may overlap.
+        
+        See :meth:`intersection_pairs` for how the pairs are found and
+        the work is distributed.
+        
+        :param polygons: The polygons to subtract.
+        :type polygons: Polygons
+        :param max_workers: The number of worker processes. If None, the 
+            number of processors on the machine is used. If 1, the work is 
+            done in the current process.
+        :type max_workers: int
+        :param chunksize: The number of polygon pairs sent to a worker 
+            process in each task.
+        :type chunksize: int
+        
+        :returns: A generator of (i,j,result) records where `result` is the 
+            difference self[i]-polygons[j]. A record is returned for every pair
+            whose bounding boxes intersect.
+        :rtype: generator
+        
+        """
+        return self._pairs('difference',polygons,max_workers,chunksize)
+    
+    
+    @property
+    @_cached
+    def _plane_groups(self):
+        """The cached groups of :meth:`group_by_plane`, which must not be 
+        changed.
+        
+        """
+        keys=[pg.plane_key for pg in self]
+        groups={}
+        first={}
+        for i,n in enumerate(_group_plane_keys(keys)):
+            if not n in first:
+                first[n]=keys[i]
+                groups[keys[i]]=[]
+            groups[first[n]].append(i)
+        return {key:tuple(indices) for key,indices in groups.items()}
+    
+    
+    def group_by_plane(self):
+        """Groups the 3D polygons which lie on the same plane.
+        
+        Polygons are grouped by their :attr:`Polygon.plane_key`, where a 
+        polygon also joins a group if its key differs by no more than one in 
+        each value from the key of the group. The groups are cached, and each
+        call returns a new copy of the dict.
+        
+        :returns: A dict of the plane key of the first polygon in each group
+            to a tuple of the indices of the polygons in the group. The groups 
+            are in order of their first polygon.
+        :rtype: dict
+        
+        .. rubric:: Code Example
+    
+        .. code-block:: python
+           
+           >>> from crossproduct import Point, Polygon, Polygons
+           >>> pgs = Polygons(Polygon(Point(0,0,0),Point(1,0,0),Point(1,1,0)),
+                              Polygon(Point(0,0,0),Point(1,0,0),Point(1,0,1)),
+                              Polygon(Point(2,2,0),Point(3,2,0),Point(3,3,0)))
+           >>> print(list(pgs.group_by_plane().values()))
+           [(0, 2), (1,)]
+        
+        """
+        return dict(self._plane_groups)
+    
     
-    :param polygons: A sequence of Polygon instances. 
+    def intersection_convex(self,polygons):
+        """The intersections between the convex polygons in self and the 
+        convex polygons in the same positions in another collection.
         
-    .. rubric:: Code Example
+        This is a batch version of :meth:`Polygon.intersection_convex`, for 
+        many pairs of small polygons. Each polygon in self is clipped by the 
+        edges of the other polygon with the Sutherland–Hodgman algorithm, 
+        with one edge of all the pairs clipped at a time as array operations
+        (see :func:`_clip_rings`). 3D polygons are only intersected if they 
+        lie on the same plane.
+        
+        :param polygons: A collection of convex polygons without holes, with 
+            the same length as self.
+        :type polygons: Polygons
+        
+        :raises ValueError: If the collections have different lengths, or if
+            any of the polygons are not convex or have holes.
+        
+        :returns: A tuple of the Polygons of the intersections, and an (K,) 
+            array of the index of the pair of each intersection. The 
+            intersections have the same orientation as the polygons in self,
+            and intersections with a zero area are not returned.
+        :rtype: tuple
+        
+        .. rubric:: Code Example
     
-    .. code-block:: python
+        .. code-block:: python
+           
+           >>> from crossproduct import Point, Polygon, Polygons
+           >>> pgs = Polygons(Polygon(Point(0,0),Point(2,0),Point(2,2),Point(0,2)),
+                              Polygon(Point(0,0),Point(1,0),Point(0,1)))
+           >>> pgs1 = Polygons(Polygon(Point(1,1),Point(3,1),Point(3,3),Point(1,3)),
+                               Polygon(Point(5,5),Point(6,5),Point(6,6)))
+           >>> print(pgs.intersection_convex(pgs1))
+           (Polygons(Polygon(Point(2.0, 1.0),Point(2.0, 2.0),Point(1.0, 2.0),Point(1.0, 1.0))), array([0]))
+        
+        """
+        pairs,vertices,ring_ids,half_planes=self._clip_convex(polygons)
+        vertices,ring_ids=self._intersect_half_planes(vertices,ring_ids,half_planes)
+        starts=np.flatnonzero(np.diff(ring_ids,prepend=-1))
+        return (Polygons(*self._from_rings(vertices,ring_ids)),
+                pairs[ring_ids[starts]])
+    
+    
+    def intersection_pairs(self,polygons,max_workers=None,chunksize=100):
+        """The geometric intersections between the polygons in self and the 
+        polygons in another collection.
+        
+        The candidate pairs are found by querying the :attr:`tree` of `polygons` 
+        with the bounding box of each polygon in self. For 3D polygons the 
+        pairs which lie on the same plane are grouped together, so these can be
+        intersected in 2D using a single projection of each polygon. 
+        The pairs are then split into tasks of `chunksize` pairs which are 
+        run in a `concurrent.futures.ProcessPoolExecutor`.
+        
+        :param polygons: The polygons to intersect with.
+        :type polygons: Polygons
+        :param max_workers: The number of worker processes. If None, the 
+            number of processors on the machine is used. If 1, the work is 
+            done in the current process.
+        :type max_workers: int
+        :param chunksize: The number of polygon pairs sent to a worker 
+            process in each task.
+        :type chunksize: int
+        
+        :returns: A generator of (i,j,result) records where `result` is the 
+            GeometryObjects intersection of self[i] and polygons[j]. Only the 
+            pairs which intersect are returned. Records are returned as each task 
+            is completed, in the order of the tasks.
+        :rtype: generator
         
-        >>> pgs = Polygons(Polygon(Point(0,0), Point(1,0), Point(1,1)))                       
-        >>> print(pgs)
-        Polygons(Polygon(Point(0,0), Point(1,0), Point(1,1)))
+        .. rubric:: Code Example
+    
+        .. code-block:: python
+           
+           >>> from crossproduct import Point, Polygon, Polygons
+           >>> pgs = Polygons(Polygon(Point(0,0),Point(2,0),Point(2,2),Point(0,2)))
+           >>> pgs1 = Polygons(Polygon(Point(1,1),Point(3,1),Point(3,3),Point(1,3)),
+                               Polygon(Point(5,5),Point(6,5),Point(6,6)))
+           >>> print(list(pgs.intersection_pairs(pgs1, max_workers=1)))
+           [(0, 0, GeometryObjects(Polygon(Point(2.0, 2.0),Point(2.0, 1.0),Point(1.0, 1.0),Point(1.0, 2.0))))]
         
-        >>> print(pgs[0])
-        Polygon(Point(0,0), Point(1,0), Point(1,1))
-    """
+        """
+        for record in self._pairs('intersection',polygons,max_workers,chunksize):
+            if len(record[2])>0:
+                yield record
     
-    def __init__(self,*polygons):
-        ""
-        self._items=tuple(polygons)
     
-    @property
-    def _shapely(self):
-        ""
-        if len(self)==0 or self.nD==2:
-            x=[shapely.geometry.Polygon(pg1.coordinates) 
-               for pg in self
-               for pg1 in pg.polygons]
-            return shapely.geometry.MultiPolygon(x)
+    def _pairs(self,operation,polygons,max_workers,chunksize):
+        """Yields the (i,j,result) records of an operation on the candidate pairs.
+        """
+        pairs=[(i,j) for i,pg in enumerate(self)
+               for j in polygons.tree.query_intersecting(pg)]
+        if len(pairs)==0:
+            return
+        
+        # sort 3D coplanar pairs into their plane groups, with non-coplanar pairs last
+        if self.nD==3:
+            groups={i:n for n,indices in enumerate(self._plane_groups.values())
+                    for i in indices}
+            def group(pair):
+                i,j=pair
+                return (not _plane_keys_match(self[i].plane_key,polygons[j].plane_key),
+                        groups[i])
+            keys=[group(pair) for pair in pairs]
+            order=sorted(range(len(pairs)),key=lambda k: keys[k])
+            pairs=[(*pairs[k],not keys[k][0]) for k in order]
         else:
-            raise Exception  # only 2d for shapely polygons
-
-
-    def _difference_polygon_3D(self,polygon):
-        ""
-        result=[]
-        for pg in self:
-            result.extend(pg.difference(polygon))
-        return GeometryObjects(*result)
+            pairs=[(i,j,False) for i,j in pairs]
+        
+        # the polygons are sent to worker processes as coordinate arrays, rather
+        # than as objects with their cached properties
+        in_process=max_workers==1 or len(pairs)<=chunksize
+        def polygon_data(pg):
+            if in_process:
+                return pg
+            return (pg._items.array,[hole._items.array for hole in pg.holes])
+        
+        tasks=[]
+        for start in range(0,len(pairs),chunksize):
+            chunk=pairs[start:start+chunksize]
+            tasks.append((operation,
+                          chunk,
+                          {i:polygon_data(self[i]) for i,_,_ in chunk},
+                          {j:polygon_data(polygons[j]) for _,j,_ in chunk}))
+        
+        if in_process:
+            results=map(_polygon_pairs_task,tasks)
+            for records in results:
+                yield from records
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers) as executor:
+                for records in executor.map(_polygon_pairs_task,tasks):
+                    yield from records
 
 
 
@@ -3273,7 +5491,7 @@ class Polygons(FiniteGeometricObject):
 
     def render(self,
            scene=None,
-           color=vpython.color.blue,
+           color=None,
            **kwargs
            ):
         ""
@@ -3281,91 +5499,764 @@ class Polygons(FiniteGeometricObject):
         if scene is None:
             scene=get_render_scene()
         
-        for pg in self:
-            pg.render(scene=scene,
-                      color=color,
-                      **kwargs)
+        if color is None:
+            color=vpython.color.blue
+        
+        for pg in self:
+            pg.render(scene=scene,
+                      color=color,
+                      **kwargs)
+        
+        return scene
+    
+    
+    def plot(self, ax=None, set_lims=False, **kwargs):
+        """Plots the polygons on the supplied axes.
+        
+        :param ax: An 2D or 3D Axes instance.
+        :type ax:  matplotlib.axes._subplots.AxesSubplot, matplotlib.axes._subplots.Axes3DSubplot
+        :param kwargs: keyword arguments to be passed to the Axes.plot call.
+                   
+        :returns: The matplotlib axes.
+        :rtype: matplotlib.axes._subplots.AxesSubplot or 
+        matplotlib.axes._subplots.Axes3DSubplot
+    
+        """
+        for pg in self:
+            ax=pg.plot(ax,**kwargs)
+            
+        if set_lims:
+            ax=self._matplotlib_set_lims(ax)
+            
+        return ax
+            
+        #return Polygon.plot(self,ax,**kwargs)
+            
+    
+    @property
+    @_cached
+    def points(self):
+        """All polygon exterior points
+        """
+        if len(self)==0:
+            return Points()
+        return Points._from_point_array(
+            PointArray(np.concatenate([pg._items.array for pg in self]))
+            )
+    
+    
+    @property
+    def polyline(self):
+        ""
+        result=[]
+        for pg in self:
+            result.append(pg.polyline)
+        return Polylines(*result)   
+    
+    
+    @property
+    def polylines(self):
+        ""
+        result=[]
+        for pg in self:
+            result.extend(pg.polylines)
+        return Polylines(*result)   
+    
+    
+    @property
+    @_cached
+    def polygons(self):
+        ""
+        result=[]
+        for pg in self:
+            result.extend(pg.polygons)
+        return Polygons(*result)   
+
+
+    # def split(self,obj):
+    #     ""
+    #     result=[]
+    #     for pg in self:
+    #         result.extend(pg.split(obj))
+    #     return Polygons(*result) 
+    
+
+    @property
+    @_cached
+    def triangles(self):
+        ""
+        result=[]
+        for pg in self:
+            result.extend(pg.triangles)
+        return Polygons(*result)   
+         
+
+class STRtree():
+    """A packed R-tree of the bounding boxes of a sequence of 2D or 3D geometric objects.
+    
+    The tree is bulk loaded using the Sort-Tile-Recursive (STR) algorithm. 
+    The leaves are sorted into tiles along each axis in turn and packed
+    into nodes of `node_capacity` entries, and the nodes are then packed in 
+    the same order to form each higher level of the tree. The bounding boxes
+    of each level are held in a numpy array, and the children of node k are
+    the entries k*node_capacity to (k+1)*node_capacity-1 of the level below,
+    so queries are carried out as a few array operations per level.
+    
+    Bounding boxes are compared inclusively and are expanded by ABS_TOL, 
+    so objects which touch are returned by the queries.
+    
+    :param geometries: A sequence of geometric objects which have 
+        a `bounds` property.
+    :param node_capacity: The maximum number of entries in a tree node.
+    :type node_capacity: int
+    
+    .. rubric:: Code Example
+    
+    .. code-block:: python
+       
+       >>> from crossproduct import Point, Polygon, Polygons
+       >>> pgs = Polygons(Polygon(Point(0,0),Point(1,0),Point(1,1)),
+                          Polygon(Point(5,5),Point(6,5),Point(6,6)))
+       >>> print(pgs.tree.query((0.5,0.5,2,2)))
+       [0]
+    
+    """
+    
+    def __init__(self,geometries,node_capacity=10):
+        ""
+        self._geometries=geometries
+        self._node_capacity=node_capacity
+        if len(geometries)==0:
+            self._nD=0
+            self._order=np.zeros(0,dtype=np.int64)
+            self._levels=[np.zeros((0,0))]
+            return
+        
+        bboxes=self._bounds_array(geometries)
+        self._nD=bboxes.shape[1]//2
+        
+        # sort-tile-recursive order of the leaves
+        centres=(bboxes[:,:self._nD]+bboxes[:,self._nD:])/2
+        self._order=self._str_order(centres,np.arange(len(bboxes)),0)
+        
+        # pack the levels
+        levels=[bboxes[self._order]]
+        while len(levels[-1])>1:
+            levels.append(self._pack(levels[-1]))
+        self._levels=levels
+        
+        
+    def __len__(self):
+        ""
+        return len(self._order)
+    
+    
+    @staticmethod
+    def _bounds_array(geometries):
+        """Returns an (N,4) or (N,6) array of the bounding boxes of the geometries.
+        """
+        return np.array([g.bounds for g in geometries],dtype=float)
+    
+    
+    def _pack(self,bboxes):
+        """Returns the bounding boxes of the nodes which group consecutive entries.
+        """
+        n=len(bboxes)
+        cap=self._node_capacity
+        m=-(-n//cap)
+        nD=self._nD
+        padded_min=np.full((m*cap,nD),np.inf)
+        padded_max=np.full((m*cap,nD),-np.inf)
+        padded_min[:n]=bboxes[:,:nD]
+        padded_max[:n]=bboxes[:,nD:]
+        return np.hstack((padded_min.reshape(m,cap,nD).min(axis=1),
+                          padded_max.reshape(m,cap,nD).max(axis=1)))
+    
+    
+    def _str_order(self,centres,indices,dim):
+        """Returns the indices sorted into sort-tile-recursive order.
+        """
+        indices=indices[np.argsort(centres[indices,dim],kind='stable')]
+        if dim==self._nD-1:
+            return indices
+        n=len(indices)
+        cap=self._node_capacity
+        n_nodes=-(-n//cap)
+        n_slabs=math.ceil(n_nodes**(1/(self._nD-dim)))
+        slab_size=cap*(-(-n_nodes//n_slabs))
+        return np.concatenate([self._str_order(centres,
+                                               indices[i:i+slab_size],
+                                               dim+1)
+                               for i in range(0,n,slab_size)])
+    
+    
+    @property
+    def geometries(self):
+        """The geometric objects held in the tree.
+        """
+        return self._geometries
+    
+    
+    def nearest(self,point):
+        """Returns the index of the geometric object nearest to a point.
+        
+        Uses a best-first search of the tree. If the geometric objects have a
+        `_distance_to_point` method this is used for the distance to each 
+        object, otherwise the distance to the bounding box of the object is used. 
+        
+        :param point: A 2D or 3D point.
+        :type point: Point
+        
+        :raises ValueError: If the tree is empty.
+        
+        :returns: The index of the nearest object. If two objects are the
+            same distance from the point, the lower index is returned.
+        :rtype: int
+        
+        """
+        if len(self)==0:
+            raise ValueError('nearest is not available for an empty tree')
+        p=np.array(point.coordinates,dtype=float)
+        nD=self._nD
+        cap=self._node_capacity
+        
+        def bbox_distances(bboxes):
+            d=np.maximum(np.maximum(bboxes[:,:nD]-p,p-bboxes[:,nD:]),0)
+            return np.sqrt((d**2).sum(axis=1))
+        
+        top=len(self._levels)-1
+        heap=[(float(d),top,i) for i,d in enumerate(bbox_distances(self._levels[top]))]
+        heapq.heapify(heap)
+        while heap:
+            d,level,i=heapq.heappop(heap)
+            if level==-1:  # an object with its exact distance
+                return i
+            elif level==0:
+                j=int(self._order[i])
+                g=self._geometries[j]
+                if hasattr(g,'_distance_to_point'):
+                    d=g._distance_to_point(point)
+                heapq.heappush(heap,(d,-1,j))
+            else:
+                start=i*cap
+                children=self._levels[level-1][start:start+cap]
+                for k,dk in enumerate(bbox_distances(children).tolist()):
+                    heapq.heappush(heap,(dk,level-1,start+k))
+    
+    
+    def query(self,bbox):
+        """Returns the indices of the objects whose bounding boxes intersect a bounding box.
+        
+        :param bbox: The bounding box as (minx,miny,maxx,maxy) for 2D or 
+            (minx,miny,minz,maxx,maxy,maxz) for 3D.
+        :type bbox: tuple
+        
+        :returns: The indices of the objects in ascending order.
+        :rtype: list
+        
+        """
+        if len(self)==0:
+            return []
+        nD=self._nD
+        bbox=np.asarray(bbox,dtype=float)
+        if len(bbox)!=2*nD:
+            raise ValueError('bbox must have %s values' % (2*nD))
+        lo=bbox[:nD]-ABS_TOL
+        hi=bbox[nD:]+ABS_TOL
+        cap=self._node_capacity
+        nodes=np.arange(len(self._levels[-1]))
+        for level in range(len(self._levels)-1,-1,-1):
+            b=self._levels[level][nodes]
+            nodes=nodes[(b[:,:nD]<=hi).all(axis=1) & (b[:,nD:]>=lo).all(axis=1)]
+            if level>0:
+                nodes=(nodes[:,np.newaxis]*cap+np.arange(cap)).ravel()
+                nodes=nodes[nodes<len(self._levels[level-1])]
+        return sorted(self._order[nodes].tolist())
+    
+    
+    def query_intersecting(self,obj):
+        """Returns the indices of the objects whose bounding boxes intersect 
+        the bounding box of a geometric object.
+        
+        :param obj: A 2D or 3D geometric object with a `bounds` property.
+        
+        :returns: The indices of the objects in ascending order.
+        :rtype: list
+        
+        """
+        return self.query(obj.bounds)
+    
+    
+    
+class BVH(STRtree):
+    """A bounding volume hierarchy of the triangles of a sequence of 3D polygons, for ray casting.
+    
+    Each polygon is triangulated (see :attr:`Polygon.triangle_indices`) and
+    the triangles are held in an :class:`STRtree`, so the queries of STRtree
+    return the indices of triangles. Rays are cast through the tree level by 
+    level as array operations on all the pairs of rays and tree nodes whose 
+    bounding boxes the rays pass through, and the candidate ray and triangle 
+    pairs are then intersected together using the Möller–Trumbore algorithm.
+    
+    A ray is a halfline with a start point and a direction vector. Hits 
+    at distances of ABS_TOL or less from the start point are ignored, so rays 
+    cast from a point on a face do not hit that face.
+    
+    :param polygons: A sequence of 3D polygons.
+    :type polygons: Polygons
+    :param node_capacity: The maximum number of entries in a tree node.
+    :type node_capacity: int
+    :param chunksize: The number of rays which are cast together in each 
+        array operation.
+    :type chunksize: int
+    
+    .. rubric:: Code Example
+    
+    .. code-block:: python
+       
+       >>> from crossproduct import Point, Vector, Polygon, Polygons
+       >>> pgs = Polygons(Polygon(Point(0,0,1),Point(1,0,1),Point(1,1,1),Point(0,1,1)),
+                          Polygon(Point(0,0,2),Point(1,0,2),Point(1,1,2),Point(0,1,2)))
+       >>> print(pgs.bvh.first_hit(Point(0.5,0.5,0), Vector(0,0,1)))
+       (1.0, 0)
+    
+    """
+    
+    def __init__(self,polygons,node_capacity=4,chunksize=2000):
+        ""
+        triangles=[]
+        face_ids=[]
+        for i,pg in enumerate(polygons):
+            vertices,indices=pg.triangle_indices
+            triangles.append(vertices.array[indices])
+            face_ids.append(np.full(len(indices),i))
+        if triangles:
+            triangles=np.concatenate(triangles)
+            face_ids=np.concatenate(face_ids)
+        else:
+            triangles=np.zeros((0,3,3))
+            face_ids=np.zeros(0,dtype=np.int64)
+        if triangles.shape[2]!=3:
+            raise ValueError('BVH is only available for 3D polygons')
+        STRtree.__init__(self,triangles,node_capacity)
+        self._polygons=polygons
+        self._chunksize=chunksize
+        
+        # the bounding boxes of each level, expanded by ABS_TOL
+        self._lo=[level[:,:3]-ABS_TOL for level in self._levels]
+        self._hi=[level[:,3:]+ABS_TOL for level in self._levels]
+        
+        # the triangles and their polygon indices in the leaf order of the tree
+        self._face_ids=face_ids[self._order]
+        triangles=triangles[self._order]
+        self._v0=triangles[:,0]
+        self._e1=triangles[:,1]-triangles[:,0]
+        self._e2=triangles[:,2]-triangles[:,0]
+        
+        
+    @staticmethod
+    def _bounds_array(triangles):
+        """Returns an (N,6) array of the bounding boxes of an (N,3,3) array of triangles.
+        """
+        return np.hstack((triangles.min(axis=1),triangles.max(axis=1)))
+    
+    
+    @property
+    def polygons(self):
+        """The polygons held in the hierarchy.
+        """
+        return self._polygons
+    
+    
+    def any_hit(self,P0,vL,max_distance=None):
+        """Returns True if a ray hits any of the polygons.
+        
+        :param P0: The start point of the ray.
+        :type P0: Point
+        :param vL: The direction of the ray.
+        :type vL: Vector
+        :param max_distance: If given, only hits up to this distance from the
+            start point are counted, for example to test if the line of sight 
+            between two points is obstructed.
+        :type max_distance: float
+        
+        :rtype: bool
+        
+        """
+        return bool(self.cast([P0.coordinates],[vL.coordinates],
+                              max_distance,any_hit=True)[0])
+    
+    
+    def cast(self,origins,directions,max_distance=None,any_hit=False):
+        """Casts a batch of rays through the hierarchy.
+        
+        :param origins: An (N,3) array of the start points of the rays.
+        :type origins: numpy.ndarray
+        :param directions: An (N,3) array of the direction vectors of the rays.
+            These do not need to be unit vectors.
+        :type directions: numpy.ndarray
+        :param max_distance: If given, only hits up to this distance from the 
+            start point are counted. This can also be an array of N distances.
+        :type max_distance: float
+        :param any_hit: If True, only whether each ray hits any polygon is 
+            returned.
+        :type any_hit: bool
+        
+        :raises ValueError: If any of the direction vectors has a zero length.
+        
+        :returns: If any_hit is False, a tuple of (distances, face_ids) where 
+            `distances` is an (N,) array of the distances to the nearest hit
+            of each ray, or inf for no hit, and `face_ids` is an (N,) array of 
+            the index of the polygon that is hit, or -1 for no hit.
+            If any_hit is True, an (N,) boolean array.
+        :rtype: tuple or numpy.ndarray
+        
+        """
+        origins=np.asarray(origins,dtype=float).reshape(-1,3)
+        directions=np.asarray(directions,dtype=float).reshape(-1,3)
+        lengths=np.sqrt((directions**2).sum(axis=1))
+        if (lengths<=ABS_TOL).any():
+            raise ValueError('the direction vectors of the rays must have a non-zero length')
+        directions=directions/lengths[:,np.newaxis]
+        limits=np.broadcast_to(np.inf if max_distance is None else max_distance,
+                               len(origins)).astype(float)
+        distances=np.full(len(origins),np.inf)
+        leaves=np.full(len(origins),-1)
+        if len(self)>0:
+            for start in range(0,len(origins),self._chunksize):
+                stop=start+self._chunksize
+                distances[start:stop],leaves[start:stop]=\
+                    self._cast(origins[start:stop],
+                               directions[start:stop],
+                               limits[start:stop],
+                               any_hit)
+        if any_hit:
+            return leaves>=0
+        face_ids=np.full(len(origins),-1)
+        hit=leaves>=0
+        face_ids[hit]=self._face_ids[leaves[hit]]
+        return distances,face_ids
+    
+    
+    def _cast(self,origins,directions,limits,any_hit):
+        """Returns the distances and leaf indices of the nearest hits of the rays.
+        """
+        n=len(origins)
+        
+        # zero components are replaced so that the slab distances are never nan
+        inverse=1/np.where(directions==0,1e-300,directions)
+        
+        rays,leaves=self._traverse(origins,inverse,limits)
+        rays,leaves,t=self._hits(origins,directions,limits,rays,leaves)
+        
+        distances=np.full(n,np.inf)
+        result=np.full(n,-1)
+        if any_hit:
+            result[rays]=leaves
+        else:
+            # the nearest hit of each ray, and the lowest polygon index for ties
+            order=np.lexsort((self._face_ids[leaves],t,rays))
+            first=np.ones(len(order),dtype=bool)
+            first[1:]=rays[order][1:]!=rays[order][:-1]
+            order=order[first]
+            distances[rays[order]]=t[order]
+            result[rays[order]]=leaves[order]
+        return distances,result
+    
+    
+    def _hits(self,origins,directions,limits,rays,leaves):
+        """Returns the pairs of rays and leaf triangles which intersect, and 
+        the distances to the intersections.
+        
+        Uses the Möller–Trumbore algorithm.
+        """
+        d=directions[rays]
+        e1=self._e1[leaves]
+        e2=self._e2[leaves]
+        p=np.cross(d,e2)
+        det=(e1*p).sum(axis=1)
+        valid=np.abs(det)>ABS_TOL**2
+        det[~valid]=1
+        s=origins[rays]-self._v0[leaves]
+        u=(s*p).sum(axis=1)/det
+        q=np.cross(s,e1)
+        v=(d*q).sum(axis=1)/det
+        t=(e2*q).sum(axis=1)/det
+        eps=ABS_TOL
+        hit=(valid & (u>=-eps) & (v>=-eps) & (u+v<=1+eps) 
+             & (t>ABS_TOL) & (t<=limits[rays]))
+        return rays[hit],leaves[hit],t[hit]
+    
+    
+    def _traverse(self,origins,inverse,limits):
+        """Returns the pairs of rays and leaf triangles whose bounding boxes
+        intersect, found from the top level of the tree down.
+        """
+        cap=self._node_capacity
+        rays=np.arange(len(origins))
+        nodes=np.zeros(len(origins),dtype=np.int64)
+        with np.errstate(over='ignore'):
+            for level in range(len(self._levels)-1,-1,-1):
+                o=origins[rays]
+                inv=inverse[rays]
+                t1=(self._lo[level][nodes]-o)*inv
+                t2=(self._hi[level][nodes]-o)*inv
+                near=np.minimum(t1,t2)
+                far=np.maximum(t1,t2)
+                enter=np.maximum(np.maximum(near[:,0],near[:,1]),near[:,2])
+                leave=np.minimum(np.minimum(far[:,0],far[:,1]),far[:,2])
+                mask=(enter<=leave) & (leave>=0) & (enter<=limits[rays])
+                rays=rays[mask]
+                nodes=nodes[mask]
+                if level>0:
+                    rays=np.repeat(rays,cap)
+                    nodes=(nodes[:,np.newaxis]*cap+np.arange(cap)).ravel()
+                    mask=nodes<len(self._levels[level-1])
+                    rays=rays[mask]
+                    nodes=nodes[mask]
+        return rays,nodes
+    
+    
+    def first_hit(self,P0,vL,max_distance=None):
+        """Returns the nearest hit of a ray on the polygons.
+        
+        :param P0: The start point of the ray.
+        :type P0: Point
+        :param vL: The direction of the ray.
+        :type vL: Vector
+        :param max_distance: If given, only hits up to this distance from the
+            start point are returned.
+        :type max_distance: float
+        
+        :returns: A tuple of (distance, face_id) of the distance from the 
+            start point to the hit and the index of the polygon which is hit, 
+            or None if the ray does not hit any polygon.
+        :rtype: tuple
+        
+        """
+        distances,face_ids=self.cast([P0.coordinates],[vL.coordinates],
+                                     max_distance)
+        if face_ids[0]<0:
+            return None
+        return float(distances[0]),int(face_ids[0])
+    
+    
+    
+class HalfEdgeMesh():
+    """An indexed half-edge mesh of a set of 3D polygon faces.
+    
+    The face vertices which are equal, using the tolerance of `Point.equals`,
+    are merged into a single shared vertex using a spatial hash, so the mesh
+    is built in O(n) time. Each face is held as a tuple of vertex indices and
+    each directed edge of a face is a half-edge. The half-edges in the opposite
+    direction on adjacent faces are linked as twins, and the faces of each 
+    edge and each vertex are indexed so adjacency queries take constant time.
+    
+    :param polygons: The faces. Any holes in the polygons are ignored.
+    :type polygons: Polygons
+    
+    .. rubric:: Code Example
+    
+    .. code-block:: python
+       
+       >>> from crossproduct import Point, Polygon, Polyhedron
+       >>> ph = Polyhedron(Polygon(Point(0,1,0),Point(1,1,0),Point(0,0,0)),
+                           Polygon(Point(0,0,0),Point(1,1,0),Point(0,1,1)),
+                           Polygon(Point(0,1,1),Point(0,1,0),Point(0,0,0)),
+                           Polygon(Point(1,1,0),Point(0,1,0),Point(0,1,1)))
+       >>> print(ph.mesh.faces)
+       ((0, 1, 2), (2, 1, 3), (3, 0, 2), (1, 0, 3))
+       >>> print(ph.mesh.face_neighbours(0))
+       (3, 1, 2)
+    
+    """
+    
+    def __init__(self,polygons):
+        ""
+        face_arrays=[pg._items.array for pg in polygons]
+        if len(face_arrays)>0:
+            points=Points._from_point_array(PointArray(np.concatenate(face_arrays)))
+            unique_indices,inverse=points._unique_inverse()
+            self._vertices=PointArray(points._items.array[unique_indices])
+        else:
+            inverse=[]
+            self._vertices=PointArray()
+        
+        faces=[]
+        start=0
+        for a in face_arrays:
+            faces.append(tuple(inverse[start:start+len(a)]))
+            start+=len(a)
+        self._faces=tuple(faces)
+        
+        # half-edges, the half-edges of face f are numbered consecutively
+        origins=[]
+        half_edge_faces=[]
+        next_half_edges=[]
+        for f,face in enumerate(faces):
+            h=len(origins)
+            n=len(face)
+            origins.extend(face)
+            half_edge_faces.extend([f]*n)
+            next_half_edges.extend(h+(k+1)%n for k in range(n))
+        origins=np.array(origins,dtype=np.int64)
+        next_half_edges=np.array(next_half_edges,dtype=np.int64)
+        self._half_edges=np.column_stack((origins,origins[next_half_edges])).reshape(-1,2)
+        self._half_edge_faces=np.array(half_edge_faces,dtype=np.int64)
+        self._next_half_edges=next_half_edges
+        
+        # edges keyed by their sorted vertex indices, in the order first found
+        self._edge_half_edges={}
+        directed={}
+        for h,(a,b) in enumerate(self._half_edges.tolist()):
+            self._edge_half_edges.setdefault((min(a,b),max(a,b)),[]).append(h)
+            directed.setdefault((a,b),h)
+        self._twins=np.array([directed.get((b,a),-1) 
+                              for a,b in self._half_edges.tolist()],
+                             dtype=np.int64)
+        
+        vertex_faces=[[] for _ in range(len(self._vertices))]
+        for f,face in enumerate(faces):
+            for v in dict.fromkeys(face):
+                vertex_faces[v].append(f)
+        self._vertex_faces=tuple(tuple(x) for x in vertex_faces)
+        
+        
+    def edge_faces(self,a,b):
+        """Returns the faces which have an edge between two vertices.
+        
+        :param a: The index of the first vertex.
+        :type a: int
+        :param b: The index of the second vertex.
+        :type b: int
+        
+        :returns: The face indices, in either edge direction.
+        :rtype: tuple
+        
+        """
+        return tuple(dict.fromkeys(int(self._half_edge_faces[h]) 
+                                   for h in self._edge_half_edges.get((min(a,b),max(a,b)),())))
+    
+    
+    @property
+    def edges(self):
+        """The unique edges as (a,b) vertex index pairs.
+        
+        Edges are in the order first found in the faces, and are in the 
+        direction of the first face which has the edge.
+        
+        :rtype: list
+        
+        """
+        return [tuple(self._half_edges[x[0]].tolist()) for x in self._edge_half_edges.values()]
+    
+    
+    def face_neighbours(self,f):
+        """Returns the faces which share an edge with a face.
+        
+        :param f: The index of the face.
+        :type f: int
+        
+        :returns: The face indices, in the order of the edges of face f.
+        :rtype: tuple
         
-        return scene
+        """
+        result={}
+        n=len(self._faces[f])
+        start=int(np.searchsorted(self._half_edge_faces,f))
+        for a,b in self._half_edges[start:start+n].tolist():
+            for g in self.edge_faces(a,b):
+                if g!=f:
+                    result[g]=None
+        return tuple(result)
     
     
-    def plot(self, ax=None, set_lims=False, **kwargs):
-        """Plots the polygons on the supplied axes.
+    @property
+    def faces(self):
+        """The faces as tuples of vertex indices.
         
-        :param ax: An 2D or 3D Axes instance.
-        :type ax:  matplotlib.axes._subplots.AxesSubplot, matplotlib.axes._subplots.Axes3DSubplot
-        :param kwargs: keyword arguments to be passed to the Axes.plot call.
-                   
-        :returns: The matplotlib axes.
-        :rtype: matplotlib.axes._subplots.AxesSubplot or 
-        matplotlib.axes._subplots.Axes3DSubplot
+        :rtype: tuple
+        
+        """
+        return self._faces
+    
     
+    @property
+    def half_edge_faces(self):
+        """The face of each half-edge, as an (H,) array.
+        
+        :rtype: numpy.ndarray
+        
         """
-        for pg in self:
-            ax=pg.plot(ax,**kwargs)
-            
-        if set_lims:
-            ax=self._matplotlib_set_lims(ax)
-            
-        return ax
-            
-        #return Polygon.plot(self,ax,**kwargs)
-            
+        return self._half_edge_faces
+    
     
     @property
-    def points(self):
-        """All polygon exterior points
+    def half_edges(self):
+        """The half-edges as an (H,2) array of origin and target vertex indices.
+        
+        :rtype: numpy.ndarray
+        
         """
-        result=[]
-        for pg in self:
-            result.extend(pg.points)
-        return Points(*result)   
+        return self._half_edges
     
     
     @property
-    def polyline(self):
-        ""
-        result=[]
-        for pg in self:
-            result.append(pg.polyline)
-        return Polylines(*result)   
+    def is_closed(self):
+        """True if every half-edge has a twin.
+        
+        :rtype: bool
+        
+        """
+        return bool((self._twins>=0).all())
     
     
     @property
-    def polylines(self):
-        ""
-        result=[]
-        for pg in self:
-            result.extend(pg.polylines)
-        return Polylines(*result)   
+    def next_half_edges(self):
+        """The next half-edge around the face of each half-edge, as an (H,) array.
+        
+        :rtype: numpy.ndarray
+        
+        """
+        return self._next_half_edges
     
     
     @property
-    def polygons(self):
-        ""
-        result=[]
-        for pg in self:
-            result.extend(pg.polygons)
-        return Polygons(*result)   
-
-
-    # def split(self,obj):
-    #     ""
-    #     result=[]
-    #     for pg in self:
-    #         result.extend(pg.split(obj))
-    #     return Polygons(*result) 
+    def twins(self):
+        """The twin of each half-edge, as an (H,) array.
+        
+        The twin is the half-edge in the opposite direction on an adjacent face,
+        or -1 if there is no such half-edge.
+        
+        :rtype: numpy.ndarray
+        
+        """
+        return self._twins
+    
+    
+    def vertex_faces(self,v):
+        """Returns the faces which have a vertex.
+        
+        :param v: The index of the vertex.
+        :type v: int
+        
+        :rtype: tuple
+        
+        """
+        return self._vertex_faces[v]
+    
     
-
     @property
-    def triangles(self):
-        ""
-        result=[]
-        for pg in self:
-            result.extend(pg.triangles)
-        return Polygons(*result)   
-         
-
+    def vertices(self):
+        """The shared vertices of the faces.
+        
+        :rtype: PointArray
+        
+        """
+        return self._vertices
+    
+    
+    
 class Polyhedron(FiniteGeometricObject):
     """A volume of 3D space, as described by a set of exterior 3D polygons. 
     
@@ -3382,17 +6273,33 @@ class Polyhedron(FiniteGeometricObject):
     def __init__(self,*polygons,tetrahedrons=None):
         ""
         self._items=Polygons(*polygons)
-        
-        
-        if not tetrahedrons is None:
-            self._tetrahedrons=tetrahedrons
-        elif len(polygons)==4:
-            self._tetrahedrons=Polyhedrons(self)
-        else:
-            self._tetrahedrons=None
+        self._tetrahedrons=tetrahedrons
             
             
     @property
+    @_cached
+    def centroid(self):
+        """The centroid of the volume of the polyhedron.
+        
+        Calculated from the faces using the divergence theorem, see :attr:`volume`.
+        
+        :rtype: Point
+        
+        """
+        return Point(*_mass_properties([self])[2][0])
+    
+    
+
+    def clear_cache(self):
+        """Clears any cached derived properties of the polyhedron and its faces.
+        
+        """
+        FiniteGeometricObject.clear_cache(self)
+        self.polygons.clear_cache()
+        
+        
+    @property
+    @_cached
     def base_polygon_and_extrud_vector(self):
         """Creates a floor polygon and extrud vector by decomposing a polyhedron.
         
@@ -3411,27 +6318,24 @@ class Polyhedron(FiniteGeometricObject):
         
         """
     
+        mesh=self.mesh
+        
         # loop through polygons
-        for pg in self:
+        for f,pg in enumerate(self):
             #print(pg)
             
             # find a parallel polygon (i.e. the opposite face) - if nto then continue
-            for pg1 in self:
-                if pg==pg1:
+            for g,pg1 in enumerate(self):
+                if f==g:
                     continue  # continue on this loop
                 elif pg.plane.N.is_collinear(pg1.plane.N):
-                    opposite_pg=pg1
                     break  # continue on main loop
             else:
                 continue  # continue with main loop if no opposite polygon is found
-            #print(opposite_pg)
             
             # find single polylines not on the two facing polygons
-            pls=[pl for pl in self.polylines 
-                      if not any(pl.equals(pl1) 
-                                 for pl1 in pg.polyline.polylines)
-                      and not any(pl.equals(pl1) 
-                                  for pl1 in opposite_pg.polyline.polylines)]
+            pls=[pl for pl,(a,b) in zip(self.polylines,mesh.edges)
+                 if not {f,g}.intersection(mesh.edge_faces(a,b))]
             
             # are all the polylines collinear and of the same length? - if not the continue
             v0=pls[0][1]-pls[0][0]
@@ -3455,58 +6359,775 @@ class Polyhedron(FiniteGeometricObject):
             
             
             
-    @property
-    def points(self):
-        "Unique points"
-        result=[]
-        for pg in self:
-            for pt in pg:
-                if not any(x.equals(pt) for x in result):
-                    result.append(pt)
-        return Points(*result)
+    @property
+    @_cached
+    def mesh(self):
+        """An indexed half-edge mesh of the faces, with shared vertices.
+        
+        :rtype: HalfEdgeMesh
+        
+        """
+        return HalfEdgeMesh(self.polygons)
+    
+    
+    @property
+    @_cached
+    def points(self):
+        "Unique points"
+        return Points._from_point_array(self.mesh.vertices)
+    
+    
+    @property
+    @_cached
+    def polylines(self):
+        "Unique polylines (length=1)"
+        array=self.mesh.vertices.array
+        return Polylines(*(Polyline._from_point_array(PointArray(array[[a,b]]))
+                           for a,b in self.mesh.edges))
+            
+            
+    @property
+    def polygons(self):
+        ""
+        return self._items
+    
+    
+    def slice(self,planes):
+        """Returns the cross-sections of the polyhedron on a sequence of planes.
+        
+        The planes are grouped by the direction of their normals and each 
+        group is sliced with :meth:`slice_parallel`.
+        
+        :param planes: A sequence of 3D planes.
+        
+        :returns: A list of the cross-sections on each plane, as for 
+            :meth:`slice_parallel`.
+        :rtype: list
+        
+        """
+        groups={}
+        for i,plane in enumerate(planes):
+            n=np.array(plane.N.coordinates,dtype=float)
+            n=n/np.sqrt(n@n)
+            key=tuple(np.round(n/ABS_TOL).astype(np.int64).tolist())
+            groups.setdefault(key,(n,[],[]))
+            groups[key][1].append(i)
+            groups[key][2].append(float(n@plane.P0.coordinates))
+        result=[None]*len(planes)
+        for n,indices,offsets in groups.values():
+            for i,x in zip(indices,self.slice_parallel(Vector(*n),offsets)):
+                result[i]=x
+        return result
+    
+    
+    def slice_parallel(self,N,offsets):
+        """Returns the cross-sections of the polyhedron on a stack of parallel planes.
+        
+        The planes are {P : P.n = offset} for each offset, where n is the unit
+        vector of N. The edges of the faces are sorted by their extents along n,
+        and the edges which cross each plane are found by searching the 
+        sorted offsets, so the time taken grows with the size of the 
+        cross-sections rather than with the number of faces times the number 
+        of planes. The crossing points of each face are paired in order along
+        the plane, and the pairs are chained into closed rings through the 
+        shared edges of the faces (see :attr:`mesh`). The rings are then 
+        nested into polygons with holes.
+        
+        Vertices which lie on a plane are taken to be just below it, so a plane
+        through a face which is perpendicular to N gives the cross-section just
+        above the face. Holes in the faces are ignored, and rings which are 
+        not closed, as for a polyhedron with missing faces, are not returned.
+        
+        :param N: The normal vector of the planes.
+        :type N: Vector
+        :param offsets: The distances of the planes from the origin along n.
+        
+        :raises ValueError: If N has a zero length.
+        
+        :returns: A list of a Polygons sequence of the cross-section polygons 
+            for each offset, in the order of the offsets. The exteriors 
+            are anticlockwise and the holes are clockwise when viewed from 
+            the direction of N.
+        :rtype: list
+        
+        .. rubric:: Code Example
+    
+        .. code-block:: python
+           
+           >>> from crossproduct import Point, Vector, Polygon
+           >>> from crossproduct import polyhedron_from_base_polygon_and_extrud_vector
+           >>> ph = polyhedron_from_base_polygon_and_extrud_vector(
+                   Polygon(Point(0,0,0),Point(2,0,0),Point(2,2,0),Point(0,2,0)),
+                   Vector(0,0,3))
+           >>> print(ph.slice_parallel(Vector(0,0,1), [1.5, 4]))
+           [Polygons(Polygon(Point(0.0, 0.0, 1.5),Point(2.0, 0.0, 1.5),Point(2.0, 2.0, 1.5),Point(0.0, 2.0, 1.5))), Polygons()]
+        
+        """
+        n=np.array(N.coordinates,dtype=float)
+        length=np.sqrt(n@n)
+        if length<=ABS_TOL:
+            raise ValueError('N must have a non-zero length')
+        n=n/length
+        offsets=np.asarray(offsets,dtype=float).ravel()
+        result=[Polygons() for _ in offsets]
+        mesh=self.mesh
+        half_edges=mesh.half_edges
+        if len(half_edges)==0 or len(offsets)==0:
+            return result
+        vertices=mesh.vertices.array
+        heights=vertices@n
+        
+        # the half-edges with their vertices in index order, so that the twin
+        # half-edges give the same crossing points
+        a=half_edges.min(axis=1)
+        b=half_edges.max(axis=1)
+        edges=np.unique(a*len(vertices)+b,return_inverse=True)[1]
+        n_edges=edges.max()+1
+        
+        # the half-edges which cross each plane, with vertices on the plane below it
+        order=np.argsort(offsets,kind='stable')
+        c=offsets[order]
+        start=np.searchsorted(c,np.minimum(heights[a],heights[b])-ABS_TOL)
+        stop=np.searchsorted(c,np.maximum(heights[a],heights[b])-ABS_TOL)
+        counts=np.maximum(stop-start,0)
+        h=np.repeat(np.arange(len(half_edges)),counts)
+        k=np.repeat(start,counts)+np.arange(len(h))-np.repeat(np.cumsum(counts)-counts,counts)
+        if len(h)==0:
+            return result
+        ha=heights[a[h]]
+        hb=heights[b[h]]
+        t=(c[k]-ha)/(hb-ha)
+        t[np.abs(ha-c[k])<=ABS_TOL]=0
+        t[np.abs(hb-c[k])<=ABS_TOL]=1
+        points=vertices[a[h]]+t[:,np.newaxis]*(vertices[b[h]]-vertices[a[h]])
+        
+        # the crossing points of each face on each plane, in order along the 
+        # plane and taken in pairs
+        faces=mesh.half_edge_faces[h]
+        face_offsets=np.cumsum([0]+[len(x) for x in mesh.faces[:-1]])
+        normals=_plane_keys(vertices[np.concatenate(mesh.faces)],face_offsets)[0]
+        s=(points*np.cross(n,normals[faces])).sum(axis=1)
+        i=np.lexsort((s,faces,k))
+        nodes,inverse=np.unique(k*n_edges+edges[h],return_inverse=True)
+        pairs=inverse[i].reshape(-1,2)
+        node_points=np.empty((len(nodes),3))
+        node_points[inverse]=points
+        node_k=nodes//n_edges
+        
+        # the rings through the nodes which have two neighbours
+        ends=pairs.ravel()
+        i=np.argsort(ends,kind='stable')
+        others=pairs[:,::-1].ravel()[i]
+        degree=np.bincount(ends,minlength=len(nodes))
+        closed=degree==2
+        starts=np.cumsum(degree)-degree
+        neighbours=np.full((len(nodes),2),-1)
+        neighbours[closed]=np.column_stack((others[starts[closed]],
+                                            others[starts[closed]+1]))
+        neighbours=neighbours.tolist()
+        visited=(~closed).tolist()
+        rings={}
+        for first in range(len(nodes)):
+            if visited[first]:
+                continue
+            ring=[first]
+            previous,current=first,neighbours[first][0]
+            while current!=first and not visited[current]:
+                visited[current]=True
+                ring.append(current)
+                x,y=neighbours[current]
+                previous,current=current,(y if x==previous else x)
+            visited[first]=True
+            if current==first:
+                rings.setdefault(int(node_k[first]),[]).append(node_points[ring])
+        
+        for j,x in rings.items():
+            result[order[j]]=_section_polygons(x,n)
+        return result
+    
+    
+    @property
+    @_cached
+    def surface_area(self):
+        """The total area of the faces of the polyhedron.
+        
+        :rtype: float
+        
+        """
+        return float(_mass_properties([self])[1][0])
+    
+    
+    @property
+    @_cached
+    def tetrahedrons(self):
+        """Equivalent tetrahedrons with the same combined shape as the polyhedron.
+        
+        These are the tetrahedrons supplied when the polyhedron was created.
+        Otherwise a polyhedron with four faces is its own tetrahedron, and the 
+        tetrahedrons of a prism are found from the triangles of its base polygon. 
+        
+        :returns: The tetrahedrons, or None if the polyhedron cannot be
+            decomposed.
+        :rtype: Polyhedrons
+        
+        """
+        if not self._tetrahedrons is None:
+            return self._tetrahedrons
+        elif len(self.polygons)==4:
+            return Polyhedrons(self)
+        try:
+            base_polygon,extrud_vector=self.base_polygon_and_extrud_vector
+        except ValueError:
+            return None
+        result=[]
+        for triangle in base_polygon.triangles:
+            result.extend(tetrahedrons_from_extruded_triangle(triangle, extrud_vector))
+        return Polyhedrons(*result)
+    
+    
+    @property
+    def _volume_tetrahedron(self):
+        ""
+        P0,P1,P2,P3=self.points
+        v0,v1,v2=P1-P0,P2-P0,P3-P0
+        return abs((v0.dot(v1.cross_product(v2)))/6.0)
+    
+    
+    @property
+    @_cached
+    def volume(self):
+        """The volume of the polyhedron.
+        
+        The volume is found from the outward facing faces using the divergence 
+        theorem. Each face is divided into a fan of triangles and the signed
+        volumes of the tetrahedrons formed by each triangle and the origin 
+        are summed. This works for any closed polyhedron with planar faces.
+        
+        :rtype: float
+        
+        """
+        return float(_mass_properties([self])[0][0])
+    
+    
+    
+class Polyhedrons(FiniteGeometricObject):
+    """A collection of 3D polyhedra.
+    
+    The volumes, surface areas and centroids of all the polyhedra are 
+    calculated together as numpy array operations.
+    """
+    
+    @property
+    @_cached
+    def centroids(self):
+        """The centroids of the volumes of the polyhedra.
+        
+        :rtype: Points
+        
+        """
+        return Points._from_point_array(PointArray(_mass_properties(self)[2]))
+    
+    
+    def find_adjacent_faces(self,max_workers=None,chunksize=1000):
+        """Finds the faces of different polyhedra which overlap, such as the 
+        shared surfaces of adjacent zones in a building.
+        
+        The faces are grouped by their plane key (see 
+        :attr:`Polygon.plane_key`), which is calculated for all faces in a single
+        array operation, so that faces with opposite normals on the same plane 
+        are in the same group. Candidate pairs of faces are then found by 
+        a sweep of the bounding boxes of the faces, projected to 2D on the 
+        plane of each group. The candidate pairs are intersected in 2D in 
+        tasks of `chunksize` pairs which are run in a
+        `concurrent.futures.ProcessPoolExecutor`.
+        
+        :param max_workers: The number of worker processes. If None, the 
+            number of processors on the machine is used. If 1, the work is 
+            done in the current process.
+        :type max_workers: int
+        :param chunksize: The number of face pairs sent to a worker 
+            process in each task.
+        :type chunksize: int
+        
+        :returns: A generator of (i,f,j,g,patches,area) records for i<j, where
+            face f of polyhedron i overlaps face g of polyhedron j. `patches` 
+            is a GeometryObjects of the 3D polygons of the overlap and `area` 
+            is their total area. Records are returned in order of i, f, j and g.
+        :rtype: generator
+        
+        .. rubric:: Code Example
+    
+        .. code-block:: python
+           
+           >>> from crossproduct import Point, Vector, Polygon, Polyhedrons
+           >>> from crossproduct import polyhedron_from_base_polygon_and_extrud_vector
+           >>> zones = Polyhedrons(*(polyhedron_from_base_polygon_and_extrud_vector(
+                   Polygon(Point(x,0,0),Point(x+2,0,0),Point(x+2,2,0),Point(x,2,0)), 
+                   Vector(0,0,3)) for x in (0,2)))
+           >>> for i,f,j,g,patches,area in zones.find_adjacent_faces(max_workers=1):
+                   print(i,f,j,g,area)
+           0 3 1 5 6.0
+        
+        """
+        faces=[pg for ph in self for pg in ph.polygons]
+        if len(faces)<2:
+            return
+        n_faces=[len(ph.polygons) for ph in self]
+        face_polyhedra=np.repeat(np.arange(len(self)),n_faces)
+        face_indices=np.arange(len(faces))-np.repeat(np.cumsum(n_faces)-n_faces,n_faces)
+        arrays=[pg._items.array for pg in faces]
+        vertices=np.concatenate(arrays)
+        lengths=np.array([len(x) for x in arrays],dtype=np.int64)
+        offsets=np.cumsum(lengths)-lengths
+        N,keys=_plane_keys(vertices,offsets)
+        valid=np.flatnonzero(np.linalg.norm(N,axis=1)>ABS_TOL)
+        
+        # the plane group of each face and the index of the coordinate which 
+        # is ignored to project the faces of the group to 2D
+        unique_keys,inverse=np.unique(keys[valid],axis=0,return_inverse=True)
+        unique_groups=np.array(_group_plane_keys(list(map(tuple,unique_keys.tolist()))),
+                               dtype=np.int64)
+        groups=unique_groups[inverse.reshape(-1)]
+        n_groups=int(groups.max())+1
+        first=np.full(n_groups,len(valid))
+        np.minimum.at(first,groups,np.arange(len(valid)))
+        group_k=np.argmax(np.abs(N[valid][first]),axis=1)
+        k=group_k[groups]
+        
+        # the 2D bounding boxes of the faces, with the groups moved apart 
+        # along the x axis so that the sweep only pairs faces in the same group
+        columns=np.column_stack(((k+1)%3,(k+2)%3))
+        lo=np.minimum.reduceat(vertices,offsets)[valid]
+        hi=np.maximum.reduceat(vertices,offsets)[valid]
+        lo=np.take_along_axis(lo,columns,axis=1)
+        hi=np.take_along_axis(hi,columns,axis=1)
+        start=np.full(n_groups,np.inf)
+        np.minimum.at(start,groups,lo[:,0])
+        end=np.full(n_groups,-np.inf)
+        np.maximum.at(end,groups,hi[:,0])
+        shift=np.cumsum(end-start+1)-(end-start+1)-start
+        lo[:,0]+=shift[groups]
+        hi[:,0]+=shift[groups]
+        a,b=_sweep_pairs(np.column_stack((lo,groups)),np.column_stack((hi,groups)))
+        a,b=valid[a],valid[b]
+        other=face_polyhedra[a]!=face_polyhedra[b]
+        a,b=a[other],b[other]
+        order=np.lexsort((b,a))
+        pairs=list(zip(a[order].tolist(),b[order].tolist()))
+        if len(pairs)==0:
+            return
+        
+        face_k=np.zeros(len(faces),dtype=np.int64)
+        face_k[valid]=k
+        def face_data(x):
+            cols=[(face_k[x]+1)%3,(face_k[x]+2)%3]
+            return (int(face_polyhedra[x]),
+                    int(face_indices[x]),
+                    [arrays[x][:,cols]]+[h._items.array[:,cols] for h in faces[x].holes],
+                    tuple(arrays[x][0].tolist()),
+                    tuple(N[x].tolist()),
+                    int(face_k[x]))
+        
+        tasks=[]
+        for start in range(0,len(pairs),chunksize):
+            chunk=pairs[start:start+chunksize]
+            tasks.append((chunk,
+                          {x:face_data(x) for pair in chunk for x in pair}))
+        
+        if max_workers==1 or len(tasks)==1:
+            for records in map(_adjacent_faces_task,tasks):
+                yield from records
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers) as executor:
+                for records in executor.map(_adjacent_faces_task,tasks):
+                    yield from records
+    
+    
+    @property
+    @_cached
+    def surface_areas(self):
+        """The surface areas of the polyhedra, as an (N,) array.
+        
+        :rtype: numpy.ndarray
+        
+        """
+        return _mass_properties(self)[1]
+    
+    
+    @property
+    @_cached
+    def volumes(self):
+        """The volumes of the polyhedra, as an (N,) array.
+        
+        :rtype: numpy.ndarray
+        
+        """
+        return _mass_properties(self)[0]
+    
+    
+    
+class ConvexRegion(SequenceObject):
+    """A convex region of 3D space, as described by the intersection of a set of half-spaces.
+    
+    Each half-space is the volume on or below a plane, N . (P - P0) <= 0, 
+    so the plane normals point out of the region, as for a room described by
+    its outward facing walls or a view frustum. The planes are held as an 
+    (M,3) array of unit normals and an (M,) array of offsets, and objects are
+    clipped against all the planes as array operations on all the 
+    objects together.
+    
+    Points within ABS_TOL of a plane are taken to be inside the half-space.
+    
+    In *crossproduct* a ConvexRegion object is a immutable sequence. 
+    Iterating over a ConvexRegion will provide its Plane instances.
+    
+    :param planes: Argument list of the Plane instances of the half-spaces.
+    
+    :raises ValueError: If the normal of a plane has a zero length.
+    
+    .. rubric:: Code Example
+    
+    .. code-block:: python
+       
+       >>> from crossproduct import Point, Vector, Plane, ConvexRegion
+       >>> region = ConvexRegion(Plane(Point(0,0,0), Vector(0,0,-1)),
+                                 Plane(Point(0,0,1), Vector(0,0,1)))
+       >>> print(region.contains_points([(0,0,0.5),(0,0,2)]))
+       [ True False]
+    
+    """
+    
+    def __init__(self,*planes):
+        ""
+        self._items=tuple(planes)
+        normals=np.array([pn.N.coordinates for pn in planes],dtype=float).reshape(-1,3)
+        lengths=np.sqrt((normals**2).sum(axis=1))
+        if (lengths<=ABS_TOL).any():
+            raise ValueError('The normals of the planes must not have a zero length.')
+        self._normals=normals/lengths[:,np.newaxis]
+        P0s=np.array([pn.P0.coordinates for pn in planes],dtype=float).reshape(-1,3)
+        self._offsets=(self._normals*P0s).sum(axis=1)
+        
+        
+    def _clip_rings_all_planes(self,vertices,ring_ids):
+        """Clips a batch of closed rings against all the planes using the 
+        Sutherland–Hodgman algorithm.
+        
+        Each plane is applied to all the rings in a single array operation
+        (see :func:`_clip_rings`).
+        
+        :param vertices: A (K,3) array of the vertices of the rings, in order.
+        :param ring_ids: A (K,) non-decreasing array of the ring of each vertex.
+        
+        :returns: A tuple of the clipped vertices and ring ids. Rings with
+            fewer than 3 vertices or a zero area are removed.
+        
+        """
+        for n,offset in zip(self._normals,self._offsets):
+            if len(vertices)==0:
+                break
+            d=vertices@n-offset
+            if (d<=ABS_TOL).all():
+                continue
+            vertices,ring_ids=_clip_rings(vertices,ring_ids,d)
+        return _remove_degenerate_rings(vertices,ring_ids)
+        
+        
+    def _window(self,polygon):
+        """Returns the part of the plane of a polygon which covers the 
+        polygon and is inside the region, as a 2D convex polygon.
+        
+        :returns: A tuple of the window, or None if it is empty, and the 
+            coordinate index of the projection.
+        
+        """
+        plane=polygon.plane
+        i=plane.N.index_largest_absolute_coordinate
+        minx,miny,maxx,maxy=polygon._items.project_2D(i).bounds
+        pad=max(maxx-minx,maxy-miny)
+        rectangle=PointArray([(minx-pad,miny-pad),(maxx+pad,miny-pad),
+                              (maxx+pad,maxy+pad),(minx-pad,maxy+pad)])
+        vertices,_=self._clip_rings_all_planes(rectangle.project_3D(plane,i).array,
+                                    np.zeros(4,dtype=np.int64))
+        if len(vertices)==0:
+            return None,i
+        return PointArray(vertices).project_2D(i),i
+    
+    
+    def classify_bounds(self,bounds):
+        """Classifies a batch of bounding boxes against the region.
+        
+        For each plane, the signs of the distances to the corners of a box
+        are found from the distances to the two corners which are furthest 
+        in each direction along the plane normal. A box is outside the 
+        region if all its corners are outside one of the planes, and it is 
+        inside the region if all its corners are inside all of the planes.
+        
+        :param bounds: An (N,6) array of the bounding boxes, as for 
+            :attr:`Polygon.bounds`.
+            
+        :returns: An (N,) int8 array which is 1 for the boxes which are inside 
+            the region, -1 for the boxes which are outside the region and 0 
+            for the boxes which may cross its boundary.
+        :rtype: numpy.ndarray
+        
+        """
+        bounds=np.asarray(bounds,dtype=float).reshape(-1,6)
+        centres=(bounds[:,:3]+bounds[:,3:])/2
+        half_sizes=(bounds[:,3:]-bounds[:,:3])/2
+        d=centres@self._normals.T-self._offsets
+        r=half_sizes@np.abs(self._normals).T
+        result=np.zeros(len(bounds),dtype=np.int8)
+        result[(d+r<=ABS_TOL).all(axis=1)]=1
+        result[(d-r>ABS_TOL).any(axis=1)]=-1
+        return result
     
     
-    @property
-    def polylines(self):
-        "Unique polylines (length=1)"
-        result=[]
-        for pg in self:
-            for pl in pg.polyline.polylines:
-                if not any(x.equals(pl) for x in result):
-                    result.append(pl)
-        return Polylines(*result)
+    def clip(self,obj):
+        """Returns the part of a 3D geometric object which is inside the region.
+        
+        :param obj: A 3D geometric object.
+        :type obj: Polyline, Polylines, Polygon, Polygons or Polyhedron
+        
+        :raises TypeError: If the object is not one of the types above.
+        
+        :returns: The Polylines of the pieces of a Polyline or Polylines, 
+            the Polygons of the pieces of a Polygon or Polygons, or the 
+            clipped Polyhedron.
             
+        """
+        if isinstance(obj,Polyline):
+            return self.clip_polylines(Polylines(obj))[0]
+        elif isinstance(obj,Polylines):
+            return self.clip_polylines(obj)[0]
+        elif isinstance(obj,Polygon):
+            return self.clip_polygons(Polygons(obj))[0]
+        elif isinstance(obj,Polygons):
+            return self.clip_polygons(obj)[0]
+        elif isinstance(obj,Polyhedron):
+            return self.clip_polyhedron(obj)
+        else:
+            raise TypeError('%s' % obj.__class__)
             
-    @property
-    def polygons(self):
-        ""
-        return self._items
     
+    def clip_polygons(self,polygons):
+        """Clips a sequence of 3D polygons against the region.
+        
+        The polygons are first classified using their bounding boxes (see 
+        :meth:`classify_bounds`), so the polygons which are inside the region
+        are returned unchanged and the polygons which are outside are 
+        skipped. The convex polygons without holes which cross the boundary
+        of the region are clipped together against all the planes in one 
+        pass of the Sutherland–Hodgman algorithm. The other polygons which 
+        cross the boundary may be split into several pieces, and these are 
+        intersected with the part of their plane which is inside the region
+        using shapely.
+        
+        :param polygons: A sequence of 3D polygons.
+        :type polygons: Polygons
+        
+        :returns: A tuple of the Polygons of the clipped pieces, and an (K,) 
+            array of the index of the polygon of each piece. The pieces are 
+            in the order of the polygons and have the same orientation.
+        :rtype: tuple
+        
+        .. rubric:: Code Example
     
-    @property
-    def tetrahedrons(self):
-        ""
-        return self._tetrahedrons
+        .. code-block:: python
+           
+           >>> from crossproduct import Point, Vector, Plane, Polygon, Polygons, ConvexRegion
+           >>> region = ConvexRegion(Plane(Point(0,0,0), Vector(1,0,0)))
+           >>> pgs = Polygons(Polygon(Point(-1,0,0), Point(1,0,0), Point(1,1,0), Point(-1,1,0)))
+           >>> print(region.clip_polygons(pgs))
+           (Polygons(Polygon(Point(-1.0, 0.0, 0.0),Point(0.0, 0.0, 0.0),Point(0.0, 1.0, 0.0),Point(-1.0, 1.0, 0.0))), array([0]))
+        
+        """
+        if len(polygons)==0:
+            return Polygons(),np.zeros(0,dtype=np.int64)
+        state=self.classify_bounds([pg.bounds for pg in polygons])
+        pieces=[[pg] if x==1 else [] for pg,x in zip(polygons,state)]
+        crossing=np.flatnonzero(state==0).tolist()
+        
+        convex=[i for i in crossing if polygons[i]._convex]
+        if convex:
+            arrays=[polygons[i]._items.array for i in convex]
+            vertices,ring_ids=self._clip_rings_all_planes(
+                np.concatenate(arrays),
+                np.repeat(np.arange(len(arrays)),[len(x) for x in arrays]))
+            if len(vertices)>0:
+                starts=np.flatnonzero(np.diff(ring_ids,prepend=-1))
+                for r,x in zip(ring_ids[starts].tolist(),
+                               np.split(vertices,starts[1:])):
+                    pieces[convex[r]].append(Polygon._from_point_array(PointArray(x)))
+        
+        for i in crossing:
+            pg=polygons[i]
+            if pg._convex:
+                continue
+            window,k=self._window(pg)
+            if window is None:
+                continue
+            plane=pg.plane
+            a=shapely.geometry.Polygon(pg._items.project_2D(k).array,
+                                       [hole._items.project_2D(k).array 
+                                        for hole in pg.holes])
+            x=a.intersection(shapely.geometry.Polygon(window.array))
+            sign=1.0 if plane.N.coordinates[k]>0 else -1.0
+            for y in getattr(x,'geoms',[x]):
+                if isinstance(y,shapely.geometry.Polygon) and y.area>ABS_TOL:
+                    y=shapely.geometry.polygon.orient(y,sign)
+                    pieces[i].append(pg._shapely_polygon_to_polygon(y).project_3D(plane,k))
+            
+        index=np.repeat(np.arange(len(pieces)),[len(x) for x in pieces])
+        return Polygons(*(x for xs in pieces for x in xs)),index
+    
+    
+    def clip_polyhedron(self,polyhedron):
+        """Clips a polyhedron against the region.
+        
+        The faces are clipped with :meth:`clip_polygons`, and the faces on 
+        the planes of the region are the cross-sections of the polyhedron 
+        on the planes (see :meth:`Polyhedron.slice`), clipped against the 
+        region. The new faces face outwards, and may have holes.
+        
+        :param polyhedron: A polyhedron.
+        :type polyhedron: Polyhedron
+        
+        :returns: The part of the polyhedron which is inside the region. 
+            This has no faces if the polyhedron is outside the region.
+        :rtype: Polyhedron
+        
+        """
+        state=self.classify_bounds(polyhedron.bounds)[0]
+        if state==1:
+            return polyhedron
+        elif state==-1:
+            return Polyhedron()
+        faces=list(self.clip_polygons(polyhedron.polygons)[0])
+        sections=[pg for pgs in polyhedron.slice(self) for pg in pgs]
+        faces.extend(self.clip_polygons(Polygons(*sections))[0])
+        return Polyhedron(*faces)
+    
+    
+    def clip_polylines(self,polylines):
+        """Clips a sequence of 3D polylines against the region.
+        
+        The segments of all the polylines are clipped together with 
+        :meth:`clip_segments`, and the consecutive clipped segments of each
+        polyline which are joined are chained into pieces.
+        
+        :param polylines: A sequence of 3D polylines.
+        :type polylines: Polylines
+        
+        :returns: A tuple of the Polylines of the clipped pieces, and an (K,) 
+            array of the index of the polyline of each piece.
+        :rtype: tuple
+        
+        """
+        counts=np.array([max(len(pl)-1,0) for pl in polylines],dtype=np.int64)
+        a,b=Polylines(*polylines)._segment_arrays
+        if len(a)==0:
+            return Polylines(),np.zeros(0,dtype=np.int64)
+        a,b,index=self.clip_segments(a,b)
+        if len(index)==0:
+            return Polylines(),np.zeros(0,dtype=np.int64)
+        polyline_ids=np.repeat(np.arange(len(counts)),counts)[index]
+        joined=((index[1:]==index[:-1]+1)
+                &(polyline_ids[1:]==polyline_ids[:-1])
+                &(b[:-1]==a[1:]).all(axis=1))
+        starts=np.flatnonzero(np.append(True,~joined))
+        ends=np.append(starts[1:],len(index))
+        result=[Polyline._from_point_array(PointArray(np.concatenate((a[i:j],b[j-1:j]))))
+                for i,j in zip(starts.tolist(),ends.tolist())]
+        return Polylines(*result),polyline_ids[starts]
+    
+    
+    def clip_segments(self,a,b):
+        """Clips a batch of 3D segments against the region.
+        
+        The parameters where each segment enters and leaves each half-space 
+        are found as array operations on all the segments and planes, as in 
+        the Cyrus–Beck algorithm.
+        
+        :param a: An (N,3) array of the start points of the segments.
+        :param b: An (N,3) array of the end points of the segments.
+        
+        :returns: A tuple of a (K,3) array of the start points and a (K,3) 
+            array of the end points of the clipped segments, and a (K,) array 
+            of the index of the segment of each clipped segment. Segments 
+            which only touch the region are not returned, and the points of 
+            the segments which are not clipped are unchanged.
+        :rtype: tuple
+        
+        """
+        a=np.asarray(a,dtype=float).reshape(-1,3)
+        b=np.asarray(b,dtype=float).reshape(-1,3)
+        da=a@self._normals.T-self._offsets
+        db=b@self._normals.T-self._offsets
+        with np.errstate(divide='ignore',invalid='ignore'):
+            t=da/(da-db)
+        enter=(da>ABS_TOL)&(db<=ABS_TOL)
+        leave=(da<=ABS_TOL)&(db>ABS_TOL)
+        t0=np.where(enter,t,0).max(axis=1,initial=0)
+        t1=np.where(leave,t,1).min(axis=1,initial=1)
+        lengths=np.sqrt(((b-a)**2).sum(axis=1))
+        valid=(~((da>ABS_TOL)&(db>ABS_TOL)).any(axis=1)
+               &((t1-t0)*lengths>ABS_TOL))
+        index=np.flatnonzero(valid)
+        a,b,t0,t1=a[index],b[index],t0[index],t1[index]
+        v=b-a
+        starts=np.where((t0>0)[:,np.newaxis],a+t0[:,np.newaxis]*v,a)
+        ends=np.where((t1<1)[:,np.newaxis],a+t1[:,np.newaxis]*v,b)
+        return starts,ends,index
     
     
-    @property
-    def _volume_tetrahedron(self):
-        ""
-        P0,P1,P2,P3=self.points
-        v0,v1,v2=P1-P0,P2-P0,P3-P0
-        return abs((v0.dot(v1.cross_product(v2)))/6.0)
+    def contains_points(self,points):
+        """Tests if a batch of points are inside the region.
+        
+        :param points: An (N,3) array of points.
+        
+        :returns: An (N,) boolean array.
+        :rtype: numpy.ndarray
+        
+        """
+        return (self.signed_distances(points)<=ABS_TOL).all(axis=1)
     
     
-    @property
-    def volume(self):
-        ""
-        return sum(th._volume_tetrahedron for th in self.tetrahedrons)
+    @classmethod
+    def from_polyhedron(cls,polyhedron):
+        """Creates the region from the planes of the faces of a convex polyhedron.
+        
+        :param polyhedron: A convex polyhedron with outward facing faces.
+        :type polyhedron: Polyhedron
+        
+        :rtype: ConvexRegion
+        
+        """
+        return cls(*(pg.plane for pg in polyhedron.polygons))
     
     
+    @property
+    def planes(self):
+        """The planes of the half-spaces.
+        
+        :rtype: tuple
+        
+        """
+        return self._items
+    
     
-class Polyhedrons(FiniteGeometricObject):
-    """A collection of 3D polyhedra.
-    """
+    def signed_distances(self,points):
+        """Returns the signed distances from the planes to a batch of points.
+        
+        :param points: An (N,3) array of points.
+        
+        :returns: An (N,M) array of the distances from each of the M planes, 
+            which are positive outside the half-spaces.
+        :rtype: numpy.ndarray
+        
+        """
+        points=np.asarray(points,dtype=float).reshape(-1,3)
+        return points@self._normals.T-self._offsets
     
     
     
@@ -3525,8 +7146,7 @@ def tetrahedron_from_points(P0,P1,P2,P3):
     # makes sure all polygon plane normals are outward facing
     result=[]
     for pg in pgs:
-        plane=pg.plane
-        if plane.signed_distance_to_point(centroid)>0:
+        if orient3d(*pg,centroid)>0:
             result.append(pg.reverse)
         else:
             result.append(pg)
@@ -3568,17 +7188,1207 @@ def polyhedron_from_base_polygon_and_extrud_vector(base_polygon,
                    base_polygon.points[base_polygon.next_index(i)],
                    base_polygon.points[i])
         side_polygons.append(pg)
-    polygons=Polygons(base_polygon, top_polygon, *side_polygons)
     
-    # tetrahedrons
+    # the tetrahedrons are found from the base polygon when first needed
+    return Polyhedron(base_polygon, top_polygon, *side_polygons)
+        
+    
+    
+    
+def _triangulate_2D(rings):
+    """Triangulates a 2D polygon with holes in a single pass.
+    
+    :param rings: A list of (N,2) arrays of the exterior followed by the holes.
+    
+    :returns: A tuple of the (N,2) vertex array and the (M,3) triangle
+        vertex indices.
+    
+    """
+    vertices=np.concatenate(rings)
+    if not tr.is_available():
+        return vertices,triangulate_polygon(rings[0],rings[1:])
+    
+    # triangle fails on repeated vertices, such as where a hole touches the exterior,
+    # so each distinct vertex is passed once and the segments are merged
+    _,first,inverse=np.unique(vertices,axis=0,return_index=True,return_inverse=True)
+    inverse=inverse.reshape(-1)
+    order=np.argsort(first)
+    keep=first[order]
+    rank=np.empty(len(first),dtype=np.int64)
+    rank[order]=np.arange(len(first))
+    compact=rank[inverse]
+    segments=set()
+    n=0
+    for ring in rings:
+        m=len(ring)
+        for k in range(m):
+            a,b=compact[n+k],compact[n+(k+1)%m]
+            if a!=b:
+                segments.add((min(a,b),max(a,b)))
+        n+=m
+    A=dict(vertices=vertices[keep],
+           segments=sorted(segments))
+    if len(rings)>1:
+        # a seed point inside each hole, the centroid of one of its triangles
+        A['holes']=[ring[triangulate_polygon(ring)[0]].mean(axis=0) 
+                    for ring in rings[1:]]
+    B=tr.triangulate(A,'p')
+    
+    # indices of the original vertices, with any added vertices after these
+    mapping=np.concatenate((keep,len(vertices)+np.arange(len(B['vertices'])-len(keep))))
+    vertices=np.concatenate((vertices,B['vertices'][len(keep):]))
+    if 'triangles' in B:
+        return vertices,mapping[B['triangles']].astype(np.int64)
+    else:
+        return vertices,np.zeros((0,3),dtype=np.int64)
+    
+
+def _direction_signs(u):
+    """Returns the signs which make each of an array of unit vectors point in
+    the positive direction of its first coordinate which is larger than 
+    ABS_TOL.
+    
+    The sign only changes where a coordinate crosses ABS_TOL, rather than 
+    where two coordinates have nearly equal sizes, as for walls at 45 degrees.
+    
+    :param u: An (N,nD) array of unit vectors.
+    
+    :returns: An (N,1) array of 1.0 and -1.0.
+    
+    """
+    first=np.argmax(np.abs(u)>ABS_TOL,axis=1)
+    signs=np.where(u[np.arange(len(u)),first]<0,-1.0,1.0)
+    return signs[:,np.newaxis]
+
+
+def _keys_within_one(key,key1):
+    ""
+    return all(abs(a-b)<=1 for a,b in zip(key,key1))
+
+
+def _negated_key(key,signed=None):
+    """Returns a key with the first `signed` values negated, or all values if 
+    `signed` is None.
+    """
+    if signed is None:
+        signed=len(key)
+    return tuple(-x for x in key[:signed])+tuple(key[signed:])
+
+
+def _plane_keys_match(key,key1):
+    """Returns True if two plane keys differ by no more than one in each value,
+    or if one of the keys does when it is negated.
+    """
+    return _keys_within_one(key,key1) or _keys_within_one(_negated_key(key),key1)
+
+
+def _group_plane_keys(keys,signed=None):
+    """Returns the plane group number of each of a sequence of plane keys.
+    
+    A key joins the group of an earlier key if they differ by no more than 
+    one in each value, or if they do when the first `signed` values of the key
+    are negated. Groups are numbered in order of their first key.
+    
+    The keys are stored in a grid of cells of size 64, so that the keys 
+    within one of a key are found in the same cell, or in the next cell 
+    for the values at the edge of a cell. Keys with no values at the edge of
+    their cell, and which are alone in their cell and in the cell of their 
+    negated key, are found first as array operations and start new groups 
+    without a search.
+    
+    :param keys: A sequence of key tuples of integers.
+    :param signed: The number of values at the start of each key which change
+        sign when the direction of the key is reversed. If None, all the values 
+        change sign, as for plane keys.
+    
+    :returns: A list of the group numbers.
+    
+    """
+    if len(keys)==0:
+        return []
+    array=np.array(keys,dtype=np.int64).reshape(len(keys),-1)
+    negated=array.copy()
+    negated[:,:signed]*=-1
+    both=np.concatenate((array,negated))
+    edges=((both%64==0)|(both%64==63)).any(axis=1).reshape(2,-1).any(axis=0)
+    _,inverse,counts=np.unique(both//64,axis=0,return_inverse=True,return_counts=True)
+    alone=~edges&(counts[inverse.reshape(-1)]==1).reshape(2,-1).all(axis=0)
+    
+    groups={}
+    cells={}
+    result=[]
+    count=0
+    for key,isolated in zip(keys,alone.tolist()):
+        if isolated:
+            result.append(count)
+            count+=1
+            continue
+        n=groups.get(key)
+        if n is None:
+            for k in (key,_negated_key(key,signed)):
+                ranges=[(x//64,x//64-1) if x%64==0 else 
+                        (x//64,x//64+1) if x%64==63 else (x//64,) for x in k]
+                n=next((n1 for cell in itertools.product(*ranges)
+                        for key1,n1 in cells.get(cell,())
+                        if _keys_within_one(k,key1)),None)
+                if n is not None:
+                    break
+            if n is None:
+                n=count
+                count+=1
+            groups[key]=n
+            cells.setdefault(tuple(x//64 for x in key),[]).append((key,n))
+        result.append(n)
+    return result
+
+
+def _plane_keys(vertices,offsets):
+    """Returns the Newell normals and plane keys of a set of 3D polygons.
+    
+    The keys are calculated as for :attr:`Polygon.plane_key`.
+    
+    :param vertices: An (N,3) array of the vertices of all the polygons.
+    :param offsets: An (M,) array of the index of the first vertex of 
+        each polygon.
+    
+    :returns: A tuple of the (M,3) normals, with lengths of twice the 
+        polygon areas, and the (M,4) int64 keys, which are zero for 
+        polygons with no area.
+    
+    """
+    m=len(offsets)
+    lengths=np.diff(np.append(offsets,len(vertices)))
+    polygon=np.repeat(np.arange(m),lengths)
+    a=vertices-vertices[offsets][polygon]
+    
+    # the cross products of consecutive vertices relative to the first vertex,
+    # where the pair from the last vertex back to the first vertex is zero
+    k=np.ones(len(vertices),dtype=bool)
+    k[offsets+lengths-1]=False
+    k=np.flatnonzero(k)
+    terms=np.cross(a[k],a[k+1])
+    N=np.column_stack([np.bincount(polygon[k],weights=terms[:,i],minlength=m)
+                       for i in range(3)])
+    
+    length=np.linalg.norm(N,axis=1)
+    valid=length>ABS_TOL
+    unit=np.zeros((m,3))
+    unit[valid]=N[valid]/length[valid,np.newaxis]
+    unit*=_direction_signs(unit)
+    d=(unit*vertices[offsets]).sum(axis=1)
+    keys=np.round(np.column_stack((unit,d))/ABS_TOL).astype(np.int64)
+    keys[~valid]=0
+    return N,keys
+
+
+def _sweep_pairs(lo,hi,chunksize=1000000):
+    """Returns the pairs of bounding boxes which overlap.
+    
+    The boxes are sorted by their minimum x coordinate and each box is paired
+    with the following boxes which start before it ends in x. These candidates
+    are then tested for overlap in all coordinates.
+    
+    :param lo: An (N,nD) array of the minimum coordinates of the boxes.
+    :param hi: An (N,nD) array of the maximum coordinates of the boxes.
+    :param chunksize: The maximum number of candidate pairs tested at once.
+    
+    :returns: Two arrays of the indices i<j of each overlapping pair.
+    
+    """
+    order=np.argsort(lo[:,0],kind='stable')
+    starts=lo[order,0]
+    ends=np.searchsorted(starts,hi[order,0]+ABS_TOL,side='right')
+    counts=np.maximum(ends-np.arange(len(order))-1,0)
+    result_i=[]
+    result_j=[]
+    k=0
+    while k<len(order):
+        # a chunk of boxes with up to chunksize candidate pairs
+        total=np.cumsum(counts[k:])
+        m=max(1,int(np.searchsorted(total,chunksize,side='right')))
+        c=counts[k:k+m]
+        i=np.repeat(np.arange(k,k+m),c)
+        first=np.cumsum(c)-c
+        j=i+1+np.arange(c.sum())-np.repeat(first,c)
+        i,j=order[i],order[j]
+        overlap=((lo[i]<=hi[j]+ABS_TOL) & (lo[j]<=hi[i]+ABS_TOL)).all(axis=1)
+        result_i.append(np.minimum(i,j)[overlap])
+        result_j.append(np.maximum(i,j)[overlap])
+        k+=m
+    if len(result_i)==0:
+        return np.zeros(0,dtype=np.int64),np.zeros(0,dtype=np.int64)
+    return np.concatenate(result_i),np.concatenate(result_j)
+
+
+def _segment_intersections(a,b):
+    """Returns the intersections between 2D or 3D segments.
+    
+    :param a: An (N,nD) array of the segment start points.
+    :param b: An (N,nD) array of the segment end points.
+    
+    :returns: A list of (i,j,obj) records for i<j in order of i and j, where
+        obj is a Point, or a Polyline of two points for overlapping segments.
+    
+    """
+    if len(a)<2:
+        return []
+    i,j=_sweep_pairs(np.minimum(a,b),np.maximum(a,b))
+    order=np.lexsort((j,i))
+    i,j=i[order],j[order]
+    
+    # the closest points of the lines of each pair
+    p,r=a[i],b[i]-a[i]
+    q,s=a[j],b[j]-a[j]
+    w=p-q
+    rr=(r*r).sum(axis=1)
+    rs=(r*s).sum(axis=1)
+    ss=(s*s).sum(axis=1)
+    rw=(r*w).sum(axis=1)
+    sw=(s*w).sum(axis=1)
+    D=rr*ss-rs**2
+    with np.errstate(divide='ignore',invalid='ignore'):
+        parallel=D<=1e-12*rr*ss
+        t=np.clip(np.where(parallel,0,(rs*sw-ss*rw)/D),0,1)
+        u=np.clip(np.where(parallel,0,(rr*sw-rs*rw)/D),0,1)
+        # the closest point on each segment to the other segment's closest point
+        u=np.clip(((p+t[:,np.newaxis]*r-q)*s).sum(axis=1)/ss,0,1)
+        t=np.clip(((q+u[:,np.newaxis]*s-p)*r).sum(axis=1)/rr,0,1)
+    points=p+t[:,np.newaxis]*r
+    crossing=~parallel & (np.linalg.norm(points-(q+u[:,np.newaxis]*s),axis=1)<=ABS_TOL)
+    
+    # the overlap of parallel segments which lie on the same line
+    with np.errstate(divide='ignore',invalid='ignore'):
+        offset=w-(rw/rr)[:,np.newaxis]*r
+        collinear=parallel & (np.linalg.norm(offset,axis=1)<=ABS_TOL)
+        t0=-rw/rr
+        t1=((q+s-p)*r).sum(axis=1)/rr
+    start=np.maximum(0,np.minimum(t0,t1))
+    end=np.minimum(1,np.maximum(t0,t1))
+    length=(end-start)*np.sqrt(rr)
+    
     result=[]
-    for triangle in base_polygon.triangles:
-        result.extend(tetrahedrons_from_extruded_triangle(triangle, extrud_vector))
-    tetrahedrons=Polyhedrons(*result)
+    for k in np.flatnonzero(crossing | (collinear & (length>=-ABS_TOL))).tolist():
+        if crossing[k]:
+            x=Point(*points[k].tolist())
+        elif length[k]<=ABS_TOL:
+            x=Point(*(p[k]+start[k]*r[k]).tolist())
+        else:
+            x=Polyline._from_point_array(PointArray(np.array([p[k]+start[k]*r[k],
+                                                              p[k]+end[k]*r[k]])))
+        result.append((int(i[k]),int(j[k]),x))
+    return result
+
+
+def _classify_points(points,a,b,chunksize=4000000):
+    """Classifies 2D points against the edges of a polygon.
+    
+    :param points: An (N,2) array of points.
+    :param a: An (E,2) array of the edge start points.
+    :param b: An (E,2) array of the edge end points.
+    :param chunksize: The maximum size of the point-edge arrays.
+    
+    :returns: An (N,) int8 array with 1 for inside, 0 for on an edge and 
+        -1 for outside.
+    
+    """
+    result=np.empty(len(points),dtype=np.int8)
+    if len(a)==0:
+        result[:]=-1
+        return result
+    ax,ay,bx,by=a[:,0],a[:,1],b[:,0],b[:,1]
+    dx,dy=bx-ax,by-ay
+    lengths2=dx**2+dy**2
+    step=max(1,chunksize//len(a))
+    for start in range(0,len(points),step):
+        px=points[start:start+step,0,np.newaxis]
+        py=points[start:start+step,1,np.newaxis]
+        
+        # the crossings of a ray in the +x direction, with edges including 
+        # their lower end point only
+        crosses=(ay<=py)!=(by<=py)
+        with np.errstate(divide='ignore',invalid='ignore'):
+            x=ax+(py-ay)*dx/dy
+        inside=(crosses & (px<x)).sum(axis=1)%2==1
+        
+        # the distance to the nearest edge
+        with np.errstate(divide='ignore',invalid='ignore'):
+            t=np.clip(((px-ax)*dx+(py-ay)*dy)/lengths2,0,1)
+        t[:,lengths2==0]=0
+        d2=(ax+t*dx-px)**2+(ay+t*dy-py)**2
+        on_edge=(d2<=ABS_TOL**2).any(axis=1)
+        
+        result[start:start+step]=np.where(on_edge,0,np.where(inside,1,-1))
+    return result
+
+
+# the relative error bounds of the floating point determinants, as derived by
+# Jonathan Shewchuk in 'Adaptive Precision Floating-Point Arithmetic and Fast
+# Robust Geometric Predicates'
+_EPSILON=2.0**-53
+_ORIENT2D_BOUND=(3+16*_EPSILON)*_EPSILON
+_ORIENT3D_BOUND=(7+56*_EPSILON)*_EPSILON
+_INCIRCLE_BOUND=(10+96*_EPSILON)*_EPSILON
+
+
+def orient2d(a,b,c):
+    """The orientation of three 2D points.
+    
+    The sign of the determinant is first found in floating point and is 
+    only recalculated in exact integer arithmetic where it is smaller than 
+    its error bound, so that degenerate cases are decided correctly.
+    
+    :param a: A 2D point or an (...,2) array of points.
+    :param b: A 2D point or an (...,2) array of points.
+    :param c: A 2D point or an (...,2) array of points.
+    
+    :returns: 1 if c lies on the left of the line from a to b 
+        (i.e. a,b,c are anticlockwise), -1 if c lies on the right and 0 if the
+        points are collinear. An int8 array is returned for arrays of points.
+    :rtype: int, numpy.ndarray
     
-    return Polyhedron(*polygons,tetrahedrons=tetrahedrons)
+    .. rubric:: Code Example
+    
+    .. code-block:: python
+       
+       >>> from crossproduct import orient2d
+       >>> print(orient2d((0,0), (1,0), (0.5,1)))
+       1
+       >>> print(orient2d((0.5,0.5), (12,12), (24,24)))
+       0
+    
+    """
+    a,b,c=np.asarray(a,dtype=float),np.asarray(b,dtype=float),np.asarray(c,dtype=float)
+    ac=a-c
+    bc=b-c
+    detleft=ac[...,0]*bc[...,1]
+    detright=ac[...,1]*bc[...,0]
+    det=detleft-detright
+    bound=_ORIENT2D_BOUND*(np.abs(detleft)+np.abs(detright))
+    return _filtered_sign(det,bound,_orient2d_exact,(a,b,c))
+
+
+def orient3d(a,b,c,d):
+    """The orientation of four 3D points.
+    
+    The sign of the determinant is first found in floating point and is 
+    only recalculated in exact integer arithmetic where it is smaller than 
+    its error bound, so that degenerate cases are decided correctly.
+    
+    :param a: A 3D point or an (...,3) array of points.
+    :param b: A 3D point or an (...,3) array of points.
+    :param c: A 3D point or an (...,3) array of points.
+    :param d: A 3D point or an (...,3) array of points.
+    
+    :returns: 1 if d lies above the plane through a,b,c (i.e. on the side 
+        which the normal (b-a)x(c-a) points to), -1 if d lies below the plane
+        and 0 if the points are coplanar. An int8 array is returned for 
+        arrays of points.
+    :rtype: int, numpy.ndarray
+    
+    .. rubric:: Code Example
+    
+    .. code-block:: python
+       
+       >>> from crossproduct import orient3d
+       >>> print(orient3d((0,0,0), (1,0,0), (0,1,0), (0,0,1)))
+       1
+    
+    """
+    a,b,c,d=(np.asarray(x,dtype=float) for x in (a,b,c,d))
+    adx,ady,adz=(a[...,i]-d[...,i] for i in range(3))
+    bdx,bdy,bdz=(b[...,i]-d[...,i] for i in range(3))
+    cdx,cdy,cdz=(c[...,i]-d[...,i] for i in range(3))
+    bdxcdy=bdx*cdy
+    cdxbdy=cdx*bdy
+    cdxady=cdx*ady
+    adxcdy=adx*cdy
+    adxbdy=adx*bdy
+    bdxady=bdx*ady
+    det=(adz*(bdxcdy-cdxbdy)
+         +bdz*(cdxady-adxcdy)
+         +cdz*(adxbdy-bdxady))
+    permanent=((np.abs(bdxcdy)+np.abs(cdxbdy))*np.abs(adz)
+               +(np.abs(cdxady)+np.abs(adxcdy))*np.abs(bdz)
+               +(np.abs(adxbdy)+np.abs(bdxady))*np.abs(cdz))
+    # the determinant is positive where d lies below the plane
+    return -_filtered_sign(det,_ORIENT3D_BOUND*permanent,_orient3d_exact,(a,b,c,d))
+
+
+def incircle(a,b,c,d):
+    """The position of a 2D point relative to the circle through three 2D points.
+    
+    The sign of the determinant is first found in floating point and is 
+    only recalculated in exact integer arithmetic where it is smaller than 
+    its error bound, so that degenerate cases are decided correctly.
+    
+    :param a: A 2D point or an (...,2) array of points.
+    :param b: A 2D point or an (...,2) array of points.
+    :param c: A 2D point or an (...,2) array of points.
+    :param d: A 2D point or an (...,2) array of points.
+    
+    :returns: For anticlockwise a,b,c, 1 if d lies inside the circle 
+        through a,b,c, -1 if d lies outside the circle and 0 if the four 
+        points are cocircular. The sign is reversed for clockwise a,b,c.
+        An int8 array is returned for arrays of points.
+    :rtype: int, numpy.ndarray
+    
+    .. rubric:: Code Example
+    
+    .. code-block:: python
+       
+       >>> from crossproduct import incircle
+       >>> print(incircle((0,0), (1,0), (0,1), (1,1)))
+       0
+    
+    """
+    a,b,c,d=(np.asarray(x,dtype=float) for x in (a,b,c,d))
+    adx,ady=a[...,0]-d[...,0],a[...,1]-d[...,1]
+    bdx,bdy=b[...,0]-d[...,0],b[...,1]-d[...,1]
+    cdx,cdy=c[...,0]-d[...,0],c[...,1]-d[...,1]
+    bdxcdy=bdx*cdy
+    cdxbdy=cdx*bdy
+    cdxady=cdx*ady
+    adxcdy=adx*cdy
+    adxbdy=adx*bdy
+    bdxady=bdx*ady
+    alift=adx*adx+ady*ady
+    blift=bdx*bdx+bdy*bdy
+    clift=cdx*cdx+cdy*cdy
+    det=(alift*(bdxcdy-cdxbdy)
+         +blift*(cdxady-adxcdy)
+         +clift*(adxbdy-bdxady))
+    permanent=((np.abs(bdxcdy)+np.abs(cdxbdy))*alift
+               +(np.abs(cdxady)+np.abs(adxcdy))*blift
+               +(np.abs(adxbdy)+np.abs(bdxady))*clift)
+    return _filtered_sign(det,_INCIRCLE_BOUND*permanent,_incircle_exact,(a,b,c,d))
+
+
+def _filtered_sign(det,bound,exact,points):
+    """Returns the sign of a floating point determinant, using the exact 
+    function for the determinants which are within their error bound.
+    
+    :param det: The floating point determinants.
+    :param bound: The error bounds of the determinants.
+    :param exact: A function which returns the exact sign for one set of points.
+    :param points: The arrays of points, which broadcast to the shape of det.
+    
+    :returns: An int, or an int8 array for arrays of points.
+    
+    """
+    uncertain=np.abs(det)<=bound
+    if det.ndim==0:
+        # a zero bound means that every product is zero, so the determinant is exact
+        if uncertain and bound>0:
+            return exact(*(p.tolist() for p in points))
+        return int(det>0)-int(det<0)
+    result=np.sign(det).astype(np.int8)
+    if not uncertain.any():
+        return result
+    index=np.nonzero(uncertain & (bound>0))
+    if len(index[0]):
+        points=[np.broadcast_to(p,det.shape+p.shape[-1:])[index] for p in points]
+        result[index]=[exact(*x) for x in zip(*(p.tolist() for p in points))]
+    return result
+
+
+def _orient2d_exact(a,b,c):
+    """Returns the exact sign of the orient2d determinant for lists of coordinates.
+    """
+    ax,ay,bx,by,cx,cy=_exact_integers(a+b+c)
+    det=(ax-cx)*(by-cy)-(ay-cy)*(bx-cx)
+    return (det>0)-(det<0)
+
+
+def _orient3d_exact(a,b,c,d):
+    """Returns the exact sign of the orient3d determinant for lists of coordinates.
+    """
+    ax,ay,az,bx,by,bz,cx,cy,cz,dx,dy,dz=_exact_integers(a+b+c+d)
+    adx,ady,adz=ax-dx,ay-dy,az-dz
+    bdx,bdy,bdz=bx-dx,by-dy,bz-dz
+    cdx,cdy,cdz=cx-dx,cy-dy,cz-dz
+    det=(adz*(bdx*cdy-cdx*bdy)
+         +bdz*(cdx*ady-adx*cdy)
+         +cdz*(adx*bdy-bdx*ady))
+    return (det>0)-(det<0)
+
+
+def _incircle_exact(a,b,c,d):
+    """Returns the exact sign of the incircle determinant for lists of coordinates.
+    """
+    ax,ay,bx,by,cx,cy,dx,dy=_exact_integers(a+b+c+d)
+    adx,ady=ax-dx,ay-dy
+    bdx,bdy=bx-dx,by-dy
+    cdx,cdy=cx-dx,cy-dy
+    det=((adx*adx+ady*ady)*(bdx*cdy-cdx*bdy)
+         +(bdx*bdx+bdy*bdy)*(cdx*ady-adx*cdy)
+         +(cdx*cdx+cdy*cdy)*(adx*bdy-bdx*ady))
+    return (det>0)-(det<0)
+
+
+def _exact_integers(values):
+    """Returns floats as integers, exactly scaled by a common power of two.
+    
+    Each determinant is a homogeneous polynomial of the coordinates, so the 
+    sign of the determinant of the integers is its exact sign.
+    
+    """
+    ratios=[x.as_integer_ratio() for x in values]
+    d=max(q for p,q in ratios) # the denominators are all powers of two
+    return [p*(d//q) for p,q in ratios]
+
+
+def triangulate_polygon(exterior,holes=()):
+    """Triangulates a 2D polygon with holes by ear clipping.
+    
+    The holes are first joined to the exterior by bridge edges, using the 
+    method described by David Eberly in 'Triangulation by Ear Clipping', to 
+    give a single ring of vertices. Ears are then clipped from a doubly linked
+    list of the ring vertices. Only the reflex vertices of the ring can lie 
+    inside an ear, so these are held in an index and are the only vertices 
+    tested against each candidate ear.
+    
+    :param exterior: The coordinates of the exterior vertices, as an (N,2) 
+        array-like.
+    :param holes: A sequence of the coordinates of the vertices of each hole.
+    
+    :raises ValueError: If the polygon cannot be triangulated, for example
+        if it is self-intersecting.
+    
+    :returns: An (M,3) integer array of the vertex indices of the triangles,
+        in anticlockwise order. The indices refer to the vertices of the 
+        exterior followed by the vertices of each hole in turn.
+    :rtype: numpy.ndarray
+    
+    .. rubric:: Code Example
+    
+    .. code-block:: python
+       
+       >>> from crossproduct import triangulate_polygon
+       >>> print(triangulate_polygon([(0,0),(1,0),(1,1),(0,1)]))
+       [[3 0 1]
+        [3 1 2]]
+    
+    """
+    rings=[np.asarray(exterior,dtype=float).reshape(-1,2)]
+    rings.extend(np.asarray(hole,dtype=float).reshape(-1,2) for hole in holes)
+    vertices=np.concatenate(rings)
+    offsets=np.cumsum([0]+[len(r) for r in rings])
+    
+    def signed_area(indices):
+        x,y=vertices[indices].T
+        return (np.dot(x,np.roll(y,-1))-np.dot(np.roll(x,-1),y))/2
+    
+    # the exterior anticlockwise and the holes clockwise
+    ring=list(range(offsets[0],offsets[1]))
+    if signed_area(ring)<0:
+        ring.reverse()
+    hole_rings=[]
+    for k in range(1,len(rings)):
+        hole=list(range(offsets[k],offsets[k+1]))
+        if signed_area(hole)>0:
+            hole.reverse()
+        hole_rings.append(hole)
+    
+    # join the holes to the ring, starting with the hole furthest in +x
+    hole_rings.sort(key=lambda hole: -vertices[hole,0].max())
+    for hole in hole_rings:
+        ring=_bridge_hole(vertices,ring,hole)
+        
+    return _ear_clip(vertices,ring)
+
+
+def _bridge_hole(vertices,ring,hole):
+    """Returns a ring with a hole joined to it by a bridge edge.
+    
+    The bridge runs from the hole vertex M with the largest x coordinate to 
+    a ring vertex which is visible from M.
+    
+    """
+    m=max(range(len(hole)),key=lambda k: (vertices[hole[k],0],-vertices[hole[k],1]))
+    mx,my=vertices[hole[m]]
+    
+    # the nearest intersection of the ray from M in the +x direction with a ring edge
+    a=vertices[ring]
+    b=np.roll(a,-1,axis=0)
+    with np.errstate(divide='ignore',invalid='ignore'):
+        crosses=((a[:,1]<=my) & (b[:,1]>=my)) | ((a[:,1]>=my) & (b[:,1]<=my))
+        t=np.where(a[:,1]!=b[:,1],(my-a[:,1])/(b[:,1]-a[:,1]),0)
+        x=np.where(a[:,1]!=b[:,1],a[:,0]+t*(b[:,0]-a[:,0]),np.minimum(a[:,0],b[:,0]))
+    x[~crosses | (x<mx)]=np.inf
+    e=int(np.argmin(x))
+    if not np.isfinite(x[e]):
+        raise ValueError('hole is not inside the polygon exterior')
+    ix=x[e]
+    
+    # the edge endpoint with the larger x coordinate
+    p=e if a[e,0]>b[e,0] else (e+1)%len(ring)
+    if not (ix==a[p,0] and my==a[p,1]):
+        # a reflex ring vertex inside the triangle M,I,P would hide P from M
+        tri=np.array([[mx,my],[ix,my],vertices[ring[p]]])
+        inside=_points_in_triangle(a,*tri)
+        prev=np.roll(a,1,axis=0)
+        inside&=orient2d(prev,a,b)<=0
+        inside[p]=False
+        if inside.any():
+            candidates=np.flatnonzero(inside)
+            d=a[candidates]-(mx,my)
+            angle=np.abs(np.arctan2(d[:,1],d[:,0]))
+            p=int(candidates[np.lexsort((np.hypot(d[:,0],d[:,1]),angle))[0]])
+    
+    # where the ring visits P more than once, such as a vertex with other bridges,
+    # the bridge is made from the visit whose interior angle contains M
+    visits=np.flatnonzero((a[:,0]==a[p,0]) & (a[:,1]==a[p,1]))
+    if len(visits)>1:
+        M=np.array([mx,my])
+        for q in visits:
+            u,P,w=a[q-1],a[q],a[(q+1)%len(ring)]
+            left1=orient2d(u,P,M)>=0
+            left2=orient2d(P,w,M)>=0
+            if (left1 and left2) if orient2d(u,P,w)>0 else (left1 or left2):
+                p=int(q)
+                break
+    
+    return ring[:p+1]+hole[m:]+hole[:m+1]+ring[p:]
+
+
+def _cross(a,b,c):
+    """The z component of the cross product (b-a) x (c-b) for arrays of 2D points.
+    """
+    return (b[...,0]-a[...,0])*(c[...,1]-b[...,1])-(b[...,1]-a[...,1])*(c[...,0]-b[...,0])
+
+
+def _points_in_triangle(points,a,b,c):
+    """Returns a boolean array which is True for points inside or on an 
+    anticlockwise or clockwise triangle.
+    """
+    d1=_cross(a,b,points)
+    d2=_cross(b,c,points)
+    d3=_cross(c,a,points)
+    return ~(((d1<0) | (d2<0) | (d3<0)) & ((d1>0) | (d2>0) | (d3>0)))
+
+
+def _ear_clip(vertices,ring):
+    """Returns the triangles of a simple anticlockwise ring of vertex indices.
+    
+    The ring may contain repeated vertices where holes are bridged to the 
+    exterior.
+    
+    """
+    n=len(ring)
+    if n<3:
+        return np.zeros((0,3),dtype=np.int64)
+    coords=vertices[ring]
+    scale=max(float(np.abs(coords).max()),1.0)
+    eps=(ABS_TOL*scale)**2
+    nxt=list(range(1,n))+[0]
+    prv=[n-1]+list(range(n-1))
+    
+    def turn(k):
+        return float(_cross(coords[prv[k]],coords[k],coords[nxt[k]]))
+    
+    turns=[turn(k) for k in range(n)]
+    reflex={k for k in range(n) if turns[k]<=eps}
+    
+    def is_ear(k):
+        if turns[k]<=eps:
+            return False
+        if not reflex:
+            return True
+        a,b,c=coords[prv[k]],coords[k],coords[nxt[k]]
+        others=np.fromiter(reflex,dtype=np.int64,count=len(reflex))
+        pts=coords[others]
+        inside=_points_in_triangle(pts,a,b,c)
+        # vertices which coincide with the ear vertices, such as the repeated
+        # vertices of a bridge, do not block the ear
+        for v in (a,b,c):
+            inside&=~((pts[:,0]==v[0]) & (pts[:,1]==v[1]))
+        return not inside.any()
+    
+    def remove(k):
+        nonlocal n
+        a,c=prv[k],nxt[k]
+        nxt[a]=c
+        prv[c]=a
+        reflex.discard(k)
+        n-=1
+        for j in (a,c):
+            turns[j]=turn(j)
+            if turns[j]<=eps:
+                reflex.add(j)
+            else:
+                reflex.discard(j)
+    
+    triangles=[]
+    k=0
+    stop=k  # a full pass around the ring without clipping an ear ends at stop
+    while n>3:
+        if is_ear(k):
+            triangles.append((ring[prv[k]],ring[k],ring[nxt[k]]))
+            next_k=nxt[k]
+            remove(k)
+            k=stop=next_k
+        else:
+            k=nxt[k]
+            if k==stop:
+                # no ear found, so remove a collinear vertex or zero-width spike
+                # without a triangle, or else the polygon is not simple
+                k=min(_ring_positions(nxt,k),key=lambda j: abs(turns[j]))
+                if abs(turns[k])>eps:
+                    raise ValueError('polygon cannot be triangulated')
+                next_k=nxt[k]
+                remove(k)
+                k=stop=next_k
+    if turns[k]>eps:
+        triangles.append((ring[prv[k]],ring[k],ring[nxt[k]]))
+    return np.array(triangles,dtype=np.int64).reshape(-1,3)
+
+
+def _ring_positions(nxt,start):
+    """Yields the positions of a linked ring starting at `start`.
+    """
+    k=start
+    while True:
+        yield k
+        k=nxt[k]
+        if k==start:
+            return
+    
+    
+def _polygon_pairs_task(task):
+    """Carries out an operation on a chunk of polygon pairs.
+    
+    Used by Polygons.intersection_pairs and Polygons.difference_each, and
+    defined at module level so it can be run in a worker process.
+    
+    :param task: A tuple of (operation, pairs, polygons, polygons1) where 
+        `pairs` is a list of (i,j,coplanar) and `polygons` and `polygons1`
+        are dicts of the polygons referred to by i and j, either as Polygon 
+        instances or, for tasks sent to worker processes, as tuples of the 
+        exterior vertex array and a list of the hole vertex arrays.
+    
+    :returns: A list of (i,j,result) records.
+    
+    """
+    operation,pairs,polygons,polygons1=task
+    def polygon(data):
+        if isinstance(data,Polygon):
+            return data
+        exterior,holes=data
+        return Polygon._from_point_array(PointArray(exterior),
+                                         holes=[Polygon._from_point_array(PointArray(x)) 
+                                                for x in holes])
+    polygons={i:polygon(x) for i,x in polygons.items()}
+    polygons1={j:polygon(x) for j,x in polygons1.items()}
+    records=[]
+    projections={} # each polygon is projected once for a plane group
+    for i,j,coplanar in pairs:
+        pg=polygons[i]
+        pg1=polygons1[j]
+        if coplanar:
+            plane=pg.plane
+            k=plane.N.index_largest_absolute_coordinate
+            if not (0,i,k) in projections:
+                projections[(0,i,k)]=pg.project_2D(k)
+            if not (1,j,k) in projections:
+                projections[(1,j,k)]=pg1.project_2D(k)
+            x=getattr(projections[(0,i,k)],operation)(projections[(1,j,k)])
+            result=GeometryObjects(*(y.project_3D(plane,k) for y in x))
+        else:
+            result=GeometryObjects(*getattr(pg,operation)(pg1))
+        records.append((i,j,result))
+    return records
+    
+    
+def _adjacent_faces_task(task):
+    """Intersects a chunk of coplanar face pairs.
+    
+    Used by Polyhedrons.find_adjacent_faces, and defined at module level so 
+    it can be run in a worker process.
+    
+    :param task: A tuple of (pairs, faces) where `pairs` is a list of (a,b) 
+        face numbers and `faces` is a dict of the face numbers to a tuple of
+        (polyhedron index, face index, 2D rings, first vertex, Newell normal,
+        index of the coordinate ignored in the 2D projection).
+    
+    :returns: A list of (i,f,j,g,patches,area) records.
+    
+    """
+    pairs,faces=task
+    shapes={}
+    records=[]
+    for a,b in pairs:
+        for x in (a,b):
+            if not x in shapes:
+                rings=faces[x][2]
+                shapes[x]=shapely.geometry.Polygon(rings[0],rings[1:])
+        result=shapes[a].intersection(shapes[b])
+        polygons=[x for x in getattr(result,'geoms',[result]) 
+                  if isinstance(x,shapely.geometry.Polygon) and not x.is_empty]
+        i,f,_,P0,N,k=faces[a]
+        j,g=faces[b][:2]
+        # the 2D areas are scaled by the ratio of the normal to its projected component
+        area=sum(x.area for x in polygons)*math.sqrt(sum(c**2 for c in N))/abs(N[k])
+        if area<=ABS_TOL:
+            continue
+        plane=Plane(Point(*P0),Vector(*N))
+        patches=[]
+        for x in polygons:
+            holes=[Polygon._from_point_array(PointArray(y.coords[:-1])) 
+                   for y in x.interiors]
+            pg=Polygon._from_point_array(PointArray(x.exterior.coords[:-1]),holes=holes)
+            patches.append(pg.project_3D(plane,k))
+        records.append((i,f,j,g,GeometryObjects(*patches),area))
+    return records
+    
+    
+def _section_polygons(rings,n):
+    """Returns the polygons of a cross-section from its closed rings.
+    
+    Vertices which are collinear with their neighbours are removed. The 
+    rings are sorted by area and each ring is placed in the smallest larger
+    ring which contains it, with rings at an even depth of nesting taken as
+    exteriors and rings at an odd depth as the holes of their parent ring.
+    
+    :param rings: A list of (M,3) arrays of the vertices of the rings.
+    :param n: The unit normal vector of the plane of the cross-section.
+    
+    :rtype: Polygons
+    
+    """
+    i=int(np.argmax(np.abs(n)))
+    columns=[(i+1)%3,(i+2)%3]
+    cleaned=[]
+    for ring in rings:
+        v=np.roll(ring,-1,axis=0)-np.roll(ring,1,axis=0)
+        w=ring-np.roll(ring,1,axis=0)
+        lengths=np.sqrt((v**2).sum(axis=1))
+        with np.errstate(divide='ignore',invalid='ignore'):
+            distances=np.sqrt((np.cross(v,w)**2).sum(axis=1))/lengths
+        ring=ring[(distances>ABS_TOL) & (lengths>ABS_TOL)]
+        if len(ring)<3:
+            continue
+        a=ring-ring[0]
+        area=np.cross(a[1:-1],a[2:]).sum(axis=0)@n/2
+        if abs(area)>ABS_TOL:
+            cleaned.append((abs(area),ring if area>0 else ring[::-1]))
+    cleaned.sort(key=lambda x: -x[0])
+    rings=[ring for _,ring in cleaned]
+    
+    parents=[]
+    depths=[]
+    for j,ring in enumerate(rings):
+        parent=-1
+        points=ring[:,columns]
+        for i1 in range(j-1,-1,-1):
+            x=rings[i1][:,columns]
+            if ((points.min(axis=0)<x.min(axis=0)-ABS_TOL).any() 
+                or (points.max(axis=0)>x.max(axis=0)+ABS_TOL).any()):
+                continue
+            classes=_classify_points(points,x,np.roll(x,-1,axis=0))
+            if (classes==1).any() and not (classes==-1).any():
+                parent=i1
+                break
+        parents.append(parent)
+        depths.append(0 if parent<0 else depths[parent]+1)
+    
+    holes={j:[] for j,depth in enumerate(depths) if depth%2==0}
+    for j,depth in enumerate(depths):
+        if depth%2==1:
+            holes[parents[j]].append(Polygon._from_point_array(PointArray(rings[j][::-1])))
+    return Polygons(*(Polygon._from_point_array(PointArray(rings[j]),holes=holes[j]) 
+                      for j in holes))
+    
+    
+def _clip_rings(vertices,ring_ids,d):
+    """Clips a batch of closed rings against a half-space or half-plane for 
+    each ring, as one pass of the Sutherland–Hodgman algorithm.
+    
+    The vertices of each ring are kept if they are inside the half-space
+    and the crossing point is inserted after each vertex whose edge to the
+    next vertex crosses the boundary, so the rings keep their orientation. 
+    Vertices within ABS_TOL of the boundary are taken to be inside.
+    
+    :param vertices: A (K,nD) array of the vertices of the rings, in order.
+    :param ring_ids: A (K,) non-decreasing array of the ring of each vertex.
+    :param d: A (K,) array of the signed distances of the vertices from the 
+        boundary of the half-space of their ring, which are positive outside.
+    
+    :returns: A tuple of the clipped vertices and ring ids. Rings with no 
+        vertices inside are removed, and degenerate rings may remain (see 
+        :func:`_remove_degenerate_rings`).
+    
+    """
+    first=np.ones(len(d),dtype=bool)
+    first[1:]=ring_ids[1:]!=ring_ids[:-1]
+    nxt=np.arange(1,len(d)+1)
+    nxt[np.roll(first,-1)]=np.flatnonzero(first)
+    d1=d[nxt]
+    keep=d<=ABS_TOL
+    cross=((d<-ABS_TOL)&(d1>ABS_TOL))|((d>ABS_TOL)&(d1<-ABS_TOL))
+    t=d/np.where(cross,d-d1,1)
+    points=vertices+t[:,np.newaxis]*(vertices[nxt]-vertices)
+    out=np.column_stack((keep,cross)).ravel()
+    vertices=np.stack((vertices,points),axis=1).reshape(-1,vertices.shape[1])[out]
+    return vertices,np.repeat(ring_ids,2)[out]
+
+
+def _ring_areas(vertices,ring_ids):
+    """Returns the areas of a batch of closed rings.
+    
+    The area of 2D rings is found using the shoelace formula and the area
+    of 3D rings from the length of their Newell normal.
+    
+    :param vertices: A (K,nD) array of the vertices of the rings, in order.
+    :param ring_ids: A (K,) non-decreasing array of the ring of each vertex.
+    
+    :returns: A tuple of the (R,) arrays of the index of the first vertex, 
+        the number of vertices and the area of each ring.
+    
+    """
+    first=np.ones(len(vertices),dtype=bool)
+    first[1:]=ring_ids[1:]!=ring_ids[:-1]
+    starts=np.flatnonzero(first)
+    counts=np.diff(np.append(starts,len(vertices)))
+    a=vertices-np.repeat(vertices[starts],counts,axis=0)
+    b=np.roll(a,-1,axis=0)
+    b[np.roll(first,-1)]=0
+    if vertices.shape[1]==2:
+        areas=np.abs(np.add.reduceat(a[:,0]*b[:,1]-a[:,1]*b[:,0],starts))/2
+    else:
+        areas=np.sqrt((np.add.reduceat(np.cross(a,b),starts)**2).sum(axis=1))/2
+    return starts,counts,areas
+
+
+def _remove_degenerate_rings(vertices,ring_ids):
+    """Removes the rings with fewer than 3 vertices or a zero area.
+    
+    :param vertices: A (K,nD) array of the vertices of the rings, in order.
+    :param ring_ids: A (K,) non-decreasing array of the ring of each vertex.
+    
+    :returns: A tuple of the vertices and ring ids of the remaining rings.
+    
+    """
+    if len(vertices)==0:
+        return vertices,ring_ids
+    _,counts,areas=_ring_areas(vertices,ring_ids)
+    valid=np.repeat((counts>=3)&(areas>ABS_TOL),counts)
+    return vertices[valid],ring_ids[valid]
+
+
+def _convex_intersection_2D(P,Q):
+    """Returns the intersection of two 2D convex polygons, using the 
+    algorithm of O'Rourke et al. in O(n+m) time.
+    
+    The boundaries of the polygons are advanced in turn, so that each edge
+    chases the edge of the other polygon which it is aiming at, and the 
+    crossing points and the vertices which are inside the other polygon
+    are output in order.
+    
+    :param P: A sequence of the (x,y) vertices of the first polygon, anticlockwise.
+    :param Q: A sequence of the (x,y) vertices of the second polygon, anticlockwise.
+    
+    :returns: A list of the (x,y) vertices of the intersection, anticlockwise. 
+        The list is empty if the intersection has a zero area.
+    
+    .. seealso:: O'Rourke, J. (1998) Computational Geometry in C, 2nd ed., 
+        section 7.6, Cambridge University Press.
+    
+    """
+    n,m=len(P),len(Q)
+    
+    def sign(a,b,c):
+        x=(b[0]-a[0])*(c[1]-a[1])-(b[1]-a[1])*(c[0]-a[0])
+        return 1 if x>ABS_TOL else (-1 if x<-ABS_TOL else 0)
+    
+    def crossing(a,b,c,d):
+        "The crossing point of segments ab and cd, or None."
+        ex,ey=b[0]-a[0],b[1]-a[1]
+        fx,fy=d[0]-c[0],d[1]-c[1]
+        denom=ex*fy-ey*fx
+        if abs(denom)<=ABS_TOL*ABS_TOL:
+            return None
+        gx,gy=c[0]-a[0],c[1]-a[1]
+        s=(gx*fy-gy*fx)/denom
+        t=(gx*ey-gy*ex)/denom
+        ls=ABS_TOL/max(abs(ex),abs(ey))
+        lt=ABS_TOL/max(abs(fx),abs(fy))
+        if s<-ls or s>1+ls or t<-lt or t>1+lt:
+            return None
+        return (a[0]+s*ex,a[1]+s*ey)
+    
+    result=[]
+    inside=None  # 'P' or 'Q' when the boundary of that polygon is inside the other
+    a=b=aa=ba=0
+    first=True
+    while True:
+        a1,b1=(a-1)%n,(b-1)%m
+        A=(P[a][0]-P[a1][0],P[a][1]-P[a1][1])
+        B=(Q[b][0]-Q[b1][0],Q[b][1]-Q[b1][1])
+        cross=sign((0,0),A,B)
+        aHB=sign(Q[b1],Q[b],P[a])
+        bHA=sign(P[a1],P[a],Q[b])
+        
+        p=crossing(P[a1],P[a],Q[b1],Q[b])
+        if p is not None:
+            if inside is None and first:
+                aa=ba=0
+                first=False
+            result.append(p)
+            if aHB>0:
+                inside='P'
+            elif bHA>0:
+                inside='Q'
+        
+        if cross==0 and aHB<0 and bHA<0:
+            return []  # the polygons are separated by parallel edges
+        elif cross==0 and aHB==0 and bHA==0:
+            # collinear edges
+            if inside=='P':
+                advance_a=False
+            else:
+                advance_a=True
+        elif cross>=0:
+            advance_a=bHA>0
+        else:
+            advance_a=not aHB>0
         
+        if advance_a:
+            if inside=='P':
+                result.append(P[a])
+            aa+=1
+            a=(a+1)%n
+        else:
+            if inside=='Q':
+                result.append(Q[b])
+            ba+=1
+            b=(b+1)%m
+            
+        if not ((aa<n or ba<m) and aa<2*n and ba<2*m):
+            break
+    
+    if inside is None:
+        # the boundaries do not cross, so one polygon may contain the other
+        if all(sign(Q[j-1],Q[j],p)>=0 for p in P for j in range(m)):
+            result=list(P)
+        elif all(sign(P[i-1],P[i],q)>=0 for q in Q for i in range(n)):
+            result=list(Q)
+        else:
+            return []
+    
+    # removes the repeated points
+    points=[]
+    for p in result:
+        if not points or abs(p[0]-points[-1][0])>ABS_TOL or abs(p[1]-points[-1][1])>ABS_TOL:
+            points.append(p)
+    while len(points)>1 and (abs(points[0][0]-points[-1][0])<=ABS_TOL 
+                             and abs(points[0][1]-points[-1][1])<=ABS_TOL):
+        points.pop()
+    area=sum(points[i-1][0]*points[i][1]-points[i][0]*points[i-1][1] 
+             for i in range(len(points)))
+    if len(points)<3 or area<=2*ABS_TOL:
+        return []
+    return points
+
+
+def _convex_difference_2D(P,Q):
+    """Returns the difference of two 2D convex polygons as convex pieces.
+    
+    The part of P which is outside each edge of Q in turn is split off, so 
+    the result has no more than m pieces and the pieces do not overlap.
+    
+    :param P: A sequence of the (x,y) vertices of the first polygon, anticlockwise.
+    :param Q: A sequence of the (x,y) vertices of the second polygon, anticlockwise.
     
+    :returns: A list of the lists of the (x,y) vertices of the pieces, 
+        anticlockwise, or None if the intersection of the polygons has a 
+        zero area.
+    
+    """
+    if len(_convex_intersection_2D(P,Q))==0:
+        return None
+    
+    def clip(vertices,d):
+        "The part of a polygon where d<=0, as for :func:`_clip_rings`."
+        result=[]
+        for k,(p,x) in enumerate(zip(vertices,d)):
+            q,y=vertices[k-len(d)+1],d[k-len(d)+1]
+            if x<=ABS_TOL:
+                result.append(p)
+            if (x<-ABS_TOL and y>ABS_TOL) or (x>ABS_TOL and y<-ABS_TOL):
+                t=x/(x-y)
+                result.append((p[0]+t*(q[0]-p[0]),p[1]+t*(q[1]-p[1])))
+        area=sum(result[k-1][0]*result[k][1]-result[k][0]*result[k-1][1] 
+                 for k in range(len(result)))
+        return result if len(result)>=3 and area>2*ABS_TOL else []
+    
+    result=[]
+    remaining=[tuple(p) for p in P]
+    for k in range(len(Q)):
+        (x0,y0),(x1,y1)=Q[k-1],Q[k]
+        ex,ey=x1-x0,y1-y0
+        length=(ex*ex+ey*ey)**0.5
+        if length<=ABS_TOL:
+            continue
+        d=[((x-x0)*ey-(y-y0)*ex)/length for x,y in remaining]
+        outside=clip(remaining,[-x for x in d])
+        if outside:
+            result.append(outside)
+        remaining=clip(remaining,d)
+        if not remaining:
+            break
+    return result
+
+
+def _mass_properties(polyhedra):
+    """Returns the volumes, surface areas and centroids of a sequence of polyhedra.
+    
+    The faces of all the polyhedra are divided into fans of triangles, held in
+    a single array, and the sums for each polyhedron are made with np.bincount.
+    
+    :returns: A tuple of the (N,) volumes, (N,) surface areas and (N,3) 
+        centroids.
+    
+    """
+    faces=[pg._items.array for ph in polyhedra for pg in ph.polygons]
+    n_faces=np.array([len(ph.polygons) for ph in polyhedra],dtype=np.int64)
+    n=len(n_faces)
+    if len(faces)==0:
+        return np.zeros(n),np.zeros(n),np.full((n,3),np.nan)
+    vertices=np.concatenate(faces)
+    lengths=np.array([len(f) for f in faces],dtype=np.int64)
+    offsets=np.cumsum(lengths)-lengths
+    face_polyhedra=np.repeat(np.arange(n),n_faces)
+    
+    # the fan triangles (o,o+k,o+k+1) of each face
+    n_triangles=np.maximum(lengths-2,0)
+    triangle_faces=np.repeat(np.arange(len(faces)),n_triangles)
+    first=np.cumsum(n_triangles)-n_triangles
+    k=np.arange(n_triangles.sum())-first[triangle_faces]+1
+    a=vertices[offsets[triangle_faces]]
+    b=vertices[offsets[triangle_faces]+k]
+    c=vertices[offsets[triangle_faces]+k+1]
+    N=np.cross(b-a,c-a)
+    triangle_polyhedra=face_polyhedra[triangle_faces]
+    
+    volumes=np.bincount(triangle_polyhedra,
+                        weights=(a*N).sum(axis=1),
+                        minlength=n)/6
+    
+    area_vectors=np.zeros((len(faces),3))
+    np.add.at(area_vectors,triangle_faces,N)
+    surface_areas=np.bincount(face_polyhedra,
+                              weights=np.linalg.norm(area_vectors,axis=1),
+                              minlength=n)/2
+    
+    moments=N*((a+b)**2+(b+c)**2+(c+a)**2)/48
+    centroids=np.column_stack([np.bincount(triangle_polyhedra,
+                                           weights=moments[:,i],
+                                           minlength=n)
+                               for i in range(3)])
+    with np.errstate(divide='ignore',invalid='ignore'):
+        centroids=centroids/volumes[:,np.newaxis]
+    
+    return np.abs(volumes),surface_areas,centroids
     
     
 def get_render_scene():
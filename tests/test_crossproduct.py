@@ -1,25 +1,75 @@
 # -*- coding: utf-8 -*-
 
+import gc
+import subprocess
+import sys
 import unittest
+import weakref
 
+import numpy as np
 import shapely.geometry
+import shapely.ops
 
-from crossproduct import Point, Points
-from crossproduct import Vector
+import crossproduct.crossproduct
+
+from crossproduct import Point, Points, PointArray
+from crossproduct import Vector, Vectors
 from crossproduct import Line
 from crossproduct import Polyline, Polylines
 from crossproduct import Plane
 from crossproduct import Polygon, Polygons
-from crossproduct import Polyhedron, Polyhedrons
+from crossproduct import STRtree
+from crossproduct import BVH
+from crossproduct import Polyhedron, Polyhedrons, HalfEdgeMesh
+from crossproduct import ConvexRegion
 from crossproduct import tetrahedron_from_points
 from crossproduct import tetrahedrons_from_extruded_triangle
 from crossproduct import polyhedron_from_base_polygon_and_extrud_vector
+from crossproduct import triangulate_polygon
+from crossproduct import orient2d, orient3d, incircle
 from crossproduct import GeometryObjects
 
 
+class Test_import(unittest.TestCase):
+    ""
+    
+    def test_lazy_imports(self):
+        "The plotting, rendering and external geometry packages are not imported with crossproduct"
+        code=('import sys, crossproduct; '
+              'print([m for m in ("matplotlib","shapely","triangle","vpython") '
+              'if m in sys.modules])')
+        result=subprocess.run([sys.executable,'-c',code],
+                              capture_output=True,
+                              text=True,
+                              check=True)
+        self.assertEqual(result.stdout.strip(),'[]')
+        
+
 class Test_Point(unittest.TestCase):
     ""
     
+    def test___add__(self):
+        ""
+        pt=Point(0,0,1)
+        self.assertEqual(pt+Vector(1,2,3),
+                         Point(1,2,4))
+        self.assertEqual(Point(0,1)+(1,1),
+                         Point(1,2))
+        self.assertFalse(hasattr(pt,'__dict__'))
+        with self.assertRaises(ValueError):
+            pt+Vector(1,0)
+        
+        
+    def test___sub__(self):
+        ""
+        self.assertEqual(Point(1,2,3)-Point(1,1,1),
+                         Vector(0,1,2))
+        self.assertEqual(Point(1,2,3)-Vector(1,1,1),
+                         Point(0,1,2))
+        with self.assertRaises(ValueError):
+            Point(1,2,3)-Point(1,2)
+        
+        
     def test_difference(self):
         ""
         pt=Point(0.5,0.5)
@@ -48,8 +98,120 @@ class Test_Point(unittest.TestCase):
         pt.plot()
     
 
+class Test_PointArray(unittest.TestCase):
+    ""
+    
+    def test___init__(self):
+        ""
+        pa=PointArray(((0,0),(1,0),(1,1)))
+        self.assertEqual(len(pa),3)
+        self.assertEqual(pa.nD,2)
+        self.assertEqual(pa.array.shape,(3,2))
+        
+        pa=PointArray()
+        self.assertEqual(len(pa),0)
+        
+        with self.assertRaises(ValueError):
+            PointArray(((0,0),(1,0,0)))
+        
+        
+    def test___getitem__(self):
+        ""
+        pa=PointArray(((0,0,0),(1,0,0),(1,1,0)))
+        self.assertEqual(pa[1],Point(1,0,0))
+        self.assertEqual(pa[1:],PointArray(((1,0,0),(1,1,0))))
+        self.assertEqual(list(pa),[Point(0,0,0),Point(1,0,0),Point(1,1,0)])
+        
+        
+    def test_bounds(self):
+        ""
+        pa=PointArray(((0,0,0),(1,0,2),(1,1,0)))
+        self.assertEqual(pa.bounds,
+                         (0.0,0.0,0.0,1.0,1.0,2.0))
+        
+        
+    def test_project_2D(self):
+        ""
+        pa=PointArray(((0,1,2),(3,4,5)))
+        self.assertEqual(pa.project_2D(0),PointArray(((1,2),(4,5))))
+        self.assertEqual(pa.project_2D(1),PointArray(((2,0),(5,3))))
+        self.assertEqual(pa.project_2D(2),PointArray(((0,1),(3,4))))
+        
+        
+    def test_project_3D(self):
+        ""
+        pn=Plane(Point(0,0,0), Vector(1,1,1))
+        pa=PointArray(((1,1),))
+        for i in range(3):
+            self.assertEqual(pa.project_3D(pn,i)[0],
+                             pa[0].project_3D(pn,i))
+            
+        pn=Plane(Point(0,0,0), Vector(0,0,1))
+        with self.assertRaises(ValueError):
+            pa.project_3D(pn,0)
+        
+        
 class Test_Points(unittest.TestCase):
     ""
+    
+    def test___init__(self):
+        ""
+        pts=Points(Point(0,0),Point(1,0))
+        self.assertIsInstance(pts._items,PointArray)
+        self.assertEqual(pts[0],Point(0,0))
+        self.assertEqual(pts[1:],Points(Point(1,0)))
+        self.assertEqual(pts.coordinates,((0,0),(1,0)))
+        
+        
+    def test_centroid(self):
+        ""
+        pts=Points(Point(0,0),Point(1,0),Point(1,1),Point(0,1))
+        self.assertEqual(pts.centroid,Point(0.5,0.5))
+        
+        pts=Points(Point(0,0,0),Point(1,0,0),Point(1,1,1),Point(0,1,1))
+        self.assertEqual(pts.centroid,Point(0.5,0.5,0.5))
+        
+        
+    def test_index_of(self):
+        ""
+        pts=Points(Point(0,0,0),Point(1,0,0),Point(1,1,0),Point(1,0,0))
+        self.assertEqual(pts.index_of(Point(1,0,0)),1)
+        self.assertEqual(pts.index_of(Point(1,1,1e-8)),2)
+        self.assertEqual(pts.index_of(Point(-1e-8,0,0)),0)
+        
+        with self.assertRaises(ValueError):
+            pts.index_of(Point(2,0,0))
+        with self.assertRaises(ValueError):
+            pts.index_of(Point(1,0))
+        
+        
+    def test_unique(self):
+        ""
+        pts=Points(Point(0,0),Point(1,0),Point(0,1e-8),Point(1,0),Point(2,0))
+        self.assertEqual(pts.unique(),
+                         Points(Point(0,0),Point(1,0),Point(2,0)))
+        
+        # points either side of a grid cell boundary
+        pts=Points(Point(1e-7,0),Point(1.5e-7,0),Point(3e-7,0))
+        self.assertEqual(pts.unique(),
+                         Points(Point(1e-7,0),Point(3e-7,0)))
+        
+        # relative tolerance for large coordinates, as in Point.equals
+        pt0,pt1=Point(1e5,0,0),Point(1e5+5e-5,0,0)
+        self.assertTrue(pt0.equals(pt1))
+        self.assertEqual(Points(pt0,pt1).unique(),
+                         Points(pt0))
+        
+        self.assertEqual(Points().unique(),Points())
+        
+        
+    def test_project_2D(self):
+        ""
+        pts=Points(Point(0,1,2),Point(3,4,5))
+        self.assertEqual(pts.project_2D(2),
+                         Points(Point(0,1),Point(3,4)))
+        
+        
     def test_plot(self):
         ""
         return
@@ -60,6 +222,18 @@ class Test_Points(unittest.TestCase):
 class Test_Polyline(unittest.TestCase):
     ""
     
+    def test_intersection(self):
+        ""
+        pl=Polyline(Point(0,0,0),Point(2,0,0),Point(2,2,0))
+        self.assertEqual(pl.intersection(Polyline(Point(1,0,0),Point(3,0,0))),
+                         (Polyline(Point(1,0,0),Point(2,0,0)),
+                          Point(2,0,0)))
+        self.assertEqual(pl.intersection(Polyline(Point(1,-1,0),Point(1,1,0))),
+                         (Point(1,0,0),))
+        self.assertEqual(pl.intersection(Polyline(Point(1,-1,1),Point(1,1,1))),
+                         ())
+        
+        
     def test_plot(self):
         ""
         return
@@ -70,6 +244,72 @@ class Test_Polyline(unittest.TestCase):
 class Test_Polylines(unittest.TestCase):
     ""
     
+    def test_add_all(self):
+        ""
+        pls=Polylines(Polyline(Point(0,0),Point(1,0),Point(1,1)),
+                      Polyline(Point(2,0),Point(1,0)),
+                      Polyline(Point(1,2),Point(1,1.5)),
+                      Polyline(Point(3,0),Point(4,0)))
+        self.assertEqual(pls.add_all(),
+                         Polylines(Polyline(Point(0,0),Point(2,0)),
+                                   Polyline(Point(1,0),Point(1,1)),
+                                   Polyline(Point(1,1.5),Point(1,2)),
+                                   Polyline(Point(3,0),Point(4,0))))
+        
+        # 3D overlapping segments
+        pls=Polylines(Polyline(Point(0,0,0),Point(1,1,1)),
+                      Polyline(Point(3,3,3),Point(2,2,2)),
+                      Polyline(Point(0.5,0.5,0.5),Point(2.5,2.5,2.5)))
+        self.assertEqual(pls.add_all(),
+                         Polylines(Polyline(Point(0,0,0),Point(3,3,3))))
+        
+        # diagonal touching segments, where the sizes of the coordinates of 
+        # the directions are equal
+        pls=Polylines(Polyline(Point(0.1,0.3),Point(0.4,0.0)),
+                      Polyline(Point(0.7,-0.3),Point(0.4,0.0)),
+                      Polyline(Point(0.1,0.3,1),Point(0.4,0.0,1)),
+                      Polyline(Point(0.7,-0.3,1),Point(0.4,0.0,1)),
+                      Polyline(Point(1.3,1.1,1),Point(1.7,1.5,1)),
+                      Polyline(Point(2.1,1.9,1),Point(1.7,1.5,1)))
+        self.assertEqual(Polylines(*pls[:2]).add_all(),
+                         Polylines(Polyline(Point(0.1,0.3),Point(0.7,-0.3))))
+        self.assertEqual(Polylines(*pls[2:]).add_all(),
+                         Polylines(Polyline(Point(0.1,0.3,1),Point(0.7,-0.3,1)),
+                                   Polyline(Point(1.3,1.1,1),Point(2.1,1.9,1))))
+        
+        self.assertEqual(Polylines().add_all(),
+                         Polylines())
+        
+        
+    def test_all_intersections(self):
+        ""
+        pls=Polylines(Polyline(Point(0,0),Point(2,0),Point(2,2),Point(1,-1)))
+        self.assertEqual(pls.all_intersections(),
+                         [(0,2,Point(4/3,0))])
+        
+        # closed polyline
+        pls=Polylines(Polyline(Point(0,0),Point(1,0),Point(1,1),Point(0,1),Point(0,0)))
+        self.assertEqual(pls.all_intersections(),
+                         [])
+        
+        # 3D crossing, overlapping and touching segments
+        pls=Polylines(Polyline(Point(0,0,0),Point(2,0,0)),
+                      Polyline(Point(1,-1,0),Point(1,1,0)),
+                      Polyline(Point(1,-1,1),Point(1,1,1)),
+                      Polyline(Point(1.5,0,0),Point(3,0,0)))
+        self.assertEqual(pls.all_intersections(),
+                         [(0,1,Point(1,0,0)),
+                          (0,3,Polyline(Point(1.5,0,0),Point(2,0,0)))])
+        
+        # against all pairs of segments
+        coordinates=np.random.default_rng(0).uniform(0,10,(50,2))
+        pls=Polylines(Polyline(*(Point(*x) for x in coordinates)))
+        lines=[shapely.geometry.LineString(coordinates[k:k+2]) for k in range(49)]
+        self.assertEqual([(i,j) for i,j,_ in pls.all_intersections()],
+                         [(i,j) for i in range(49) for j in range(i+2,49)
+                          if lines[i].intersects(lines[j])])
+        
+        
     def test_plot(self):
         ""
         return
@@ -79,6 +319,116 @@ class Test_Polylines(unittest.TestCase):
 
 
 
+class Test_Vector(unittest.TestCase):
+    ""
+    
+    def test_arithmetic(self):
+        ""
+        v=Vector(1,2,3)
+        self.assertFalse(hasattr(v,'__dict__'))
+        self.assertEqual(v+Vector(1,1,1),
+                         Vector(2,3,4))
+        self.assertEqual(v-Vector(1,1,1),
+                         Vector(0,1,2))
+        self.assertEqual(v*2,
+                         Vector(2,4,6))
+        self.assertEqual(v.dot(Vector(1,0,-1)),
+                         -2)
+        self.assertEqual(v.cross_product(Vector(0,0,1)),
+                         Vector(2,-1,0))
+        self.assertEqual(Vector(3,4).length,
+                         5)
+        self.assertEqual(Vector(1,0).perp_product(Vector(0,2)),
+                         2)
+        self.assertNotEqual(v,Point(1,2,3))
+        with self.assertRaises(ValueError):
+            v+Vector(1,0)
+        with self.assertRaises(ValueError):
+            v.dot(Vector(1,0))
+        
+        
+class Test_Vectors(unittest.TestCase):
+    ""
+    
+    def test___init__(self):
+        ""
+        vs=Vectors(Vector(1,0,0),Vector(0,1,0))
+        self.assertEqual(len(vs),2)
+        self.assertEqual(vs[1],Vector(0,1,0))
+        self.assertEqual(vs.array.shape,(2,3))
+        self.assertEqual(Vectors.from_array(vs.array),vs)
+        
+        
+    def test_cross_product(self):
+        ""
+        vs=Vectors(Vector(1,0,0),Vector(0,1,0),Vector(1,2,3))
+        v=Vector(0,0,1)
+        self.assertEqual(vs.cross_product(v),
+                         Vectors(*(x.cross_product(v) for x in vs)))
+        self.assertEqual(vs.cross_product(vs),
+                         Vectors(Vector(0,0,0),Vector(0,0,0),Vector(0,0,0)))
+        
+        with self.assertRaises(ValueError):
+            Vectors(Vector(1,0)).cross_product(Vector(1,0))
+        
+        
+    def test_dot_length_angle(self):
+        ""
+        vs=Vectors(Vector(1,0,0),Vector(0,1,0),Vector(1,2,3))
+        v=Vector(1,1,0)
+        self.assertEqual(list(vs.dot(v)),[x.dot(v) for x in vs])
+        self.assertEqual(list(vs.length),[x.length for x in vs])
+        for a,b in zip(vs.angle(v),[x.angle(v) for x in vs]):
+            self.assertAlmostEqual(a,b)
+        
+        
+    def test_is_collinear(self):
+        ""
+        vs=Vectors(Vector(1,0,0),Vector(-1,0,0),Vector(0,1,0),Vector(1,1e-8,0))
+        v=Vector(1,0,0)
+        self.assertEqual(list(vs.is_collinear(v)),
+                         [x.is_collinear(v) for x in vs])
+        self.assertEqual(list(vs.is_codirectional(v)),
+                         [x.is_codirectional(v) for x in vs])
+        self.assertEqual(list(vs.is_opposite(v)),
+                         [x.is_opposite(v) for x in vs])
+        self.assertEqual(list(vs.is_perpendicular(v)),
+                         [x.is_perpendicular(v) for x in vs])
+        
+        vs=Vectors(Vector(1,0),Vector(2,1e-8),Vector(0,1))
+        v=Vector(1,0)
+        self.assertEqual(list(vs.is_collinear(v)),
+                         [x.is_collinear(v) for x in vs])
+        
+        
+    def test_normalise(self):
+        ""
+        vs=Vectors(Vector(2,0,0),Vector(0,3,4))
+        self.assertEqual(vs.normalise,
+                         Vectors(Vector(1,0,0),Vector(0,0.6,0.8)))
+        
+        with self.assertRaises(ZeroDivisionError):
+            Vectors(Vector(0,0,0)).normalise
+        
+        
+    def test_perp_product(self):
+        ""
+        vs=Vectors(Vector(1,0),Vector(0,1),Vector(1,1))
+        v=Vector(1,2)
+        self.assertEqual(list(vs.perp_product(v)),
+                         [x.perp_product(v) for x in vs])
+        self.assertEqual(vs.perp_vector,
+                         Vectors(*(x.perp_vector for x in vs)))
+        
+        
+    def test_triple_product(self):
+        ""
+        vs=Vectors(Vector(1,0,0),Vector(1,2,3))
+        v1,v2=Vector(0,1,0),Vector(0,0,1)
+        self.assertEqual(list(vs.triple_product(v1,v2)),
+                         [x.triple_product(v1,v2) for x in vs])
+        
+        
 class Test_Plane(unittest.TestCase):
     ""
     
@@ -113,6 +463,44 @@ class Test_Plane(unittest.TestCase):
                                          Vector(1,0,0))),
                          GeometryObjects(Line(Point(1,0,0), Vector(0,1,0))))
         
+        
+    def test_intersection_line(self):
+        ""
+        pl=Plane(Point(0,0,1),Vector(0,0,2))
+        self.assertEqual(pl.intersection(Line(Point(0,0,0),Vector(1,1,1))),
+                         GeometryObjects(Point(1,1,1)))
+        self.assertEqual(pl.intersection(Line(Point(0,0,0),Vector(1,1,0))),
+                         GeometryObjects())
+        
+        
+    def test_intersection_lines(self):
+        ""
+        pl=Plane(Point(0,0,1),Vector(0,0,2))
+        t,points,kinds=pl.intersection_lines([(0,0,0),(0,0,0),(0,0,1),(1,2,3)],
+                                             [(1,0,2),(1,0,0),(0,1,0),(0,0,-4)])
+        self.assertEqual(kinds.tolist(),
+                         [1,-1,0,1])
+        self.assertTrue(np.allclose(t,[0.5,np.nan,np.nan,0.5],equal_nan=True))
+        self.assertTrue(np.allclose(points,
+                                    [(0.5,0,1),(np.nan,)*3,(np.nan,)*3,(1,2,1)],
+                                    equal_nan=True))
+        
+        
+    def test_intersection_segments(self):
+        ""
+        pl=Plane(Point(0,0,1),Vector(0,0,2))
+        a=[(0,0,0),(0,0,2),(0,0,1),(0,0,0),(0,0,1),(0,0,0)]
+        b=[(2,0,4),(1,0,3),(1,0,1),(1,0,1),(1,0,3),(1,0,0.5)]
+        t,points,kinds=pl.intersection_segments(a,b)
+        self.assertEqual(kinds.tolist(),
+                         [1,-1,0,1,1,-1])
+        self.assertTrue(np.allclose(t,[0.25,np.nan,np.nan,1,0,np.nan],equal_nan=True))
+        self.assertTrue(np.allclose(points[[0,3,4]],
+                                    [(0.5,0,1),(1,0,1),(0,0,1)]))
+        
+        self.assertTrue(np.allclose(pl.signed_distances(a),
+                                    [-1,1,0,-1,0,-1]))
+        
 
 
 class Test_Polygon(unittest.TestCase):
@@ -157,6 +545,112 @@ class Test_Polygon(unittest.TestCase):
                                                                      (0,1)))]))
         
         
+    def test_clear_cache(self):
+        ""
+        pg=Polygon(Point(0,0,0),Point(1,0,0),Point(1,1,0),Point(0,1,0))
+        plane=pg.plane
+        self.assertIs(pg.plane,plane)
+        self.assertIs(pg.project_2D(2),pg.project_2D(2))
+        self.assertIs(pg.triangles,pg.triangles)
+        self.assertEqual(pg.area,1)
+        
+        pg.clear_cache()
+        self.assertIsNot(pg.plane,plane)
+        self.assertEqual(pg.plane.N,plane.N)
+        
+        pgs=Polygons(pg)
+        triangles=pgs.triangles
+        self.assertIs(pgs.triangles,triangles)
+        pgs.clear_cache()
+        self.assertFalse('_cache' in pg.__dict__)
+        self.assertIsNot(pgs.triangles,triangles)
+        
+        crossproduct.crossproduct.USE_CACHE=False
+        try:
+            self.assertIsNot(pg.plane,pg.plane)
+        finally:
+            crossproduct.crossproduct.USE_CACHE=True
+            
+            
+    def test_shapely_cache(self):
+        ""
+        pg=Polygon(Point(0,0),Point(2,0),Point(2,2),Point(0,2))
+        a=pg._shapely
+        self.assertIs(pg._shapely,a)
+        pg.clear_cache()
+        self.assertIsNot(pg._shapely,a)
+        
+        # a prepared geometry is used from the second predicate query
+        pgs=[Polygon(Point(x,0),Point(x+1,0),Point(x+1,1),Point(x,1)) 
+             for x in (1,3,-1)]
+        self.assertTrue(pg.intersects(pgs[0]))
+        self.assertIsNone(crossproduct.crossproduct._SHAPELY_CACHE[id(pg)][2])
+        self.assertFalse(pg.intersects(pgs[1]))
+        self.assertIsNotNone(crossproduct.crossproduct._SHAPELY_CACHE[id(pg)][2])
+        self.assertEqual(pg.intersection(pgs[1]),
+                         GeometryObjects())
+        self.assertEqual(pg.intersection(pgs[2]),
+                         GeometryObjects(Polyline(Point(0,1),Point(0,0))))
+        
+        # the cache is bounded
+        size=crossproduct.crossproduct.SHAPELY_CACHE_SIZE
+        crossproduct.crossproduct.SHAPELY_CACHE_SIZE=2
+        try:
+            for x in range(3):
+                Polygon(Point(x,0),Point(x+1,0),Point(x+1,1))._shapely
+            self.assertEqual(len(crossproduct.crossproduct._SHAPELY_CACHE),
+                             2)
+            self.assertIsNot(pg._shapely,a)
+        finally:
+            crossproduct.crossproduct.SHAPELY_CACHE_SIZE=size
+        
+        # the cache does not keep deleted objects alive
+        pg=Polygon(Point(0,0),Point(2,0),Point(2,2),Point(0,2))
+        pg.triangles
+        pg._shapely
+        key=id(pg)
+        self.assertIn(key,crossproduct.crossproduct._SHAPELY_CACHE)
+        ref=weakref.ref(pg)
+        del pg
+        gc.collect()
+        self.assertIsNone(ref())
+        self.assertNotIn(key,crossproduct.crossproduct._SHAPELY_CACHE)
+        
+        
+    def test_contains_points(self):
+        ""
+        pg=Polygon(Point(0,0),Point(10,0),Point(10,10),Point(0,10),
+                   holes=[Polygon(Point(2,2),Point(4,2),Point(4,4),Point(2,4))])
+        points=[(1,1),(3,3),(4,3),(0,0),(10,5),(11,5),(5,10+1e-9)]
+        self.assertEqual(pg.contains_points(points).tolist(),
+                         [True,False,True,True,True,False,True])
+        self.assertEqual(pg.contains_points(points,tri_state=True).tolist(),
+                         [1,-1,0,0,0,-1,0])
+        self.assertEqual(pg.contains_points(points,tri_state=True,index=True).tolist(),
+                         [1,-1,0,0,0,-1,0])
+        self.assertEqual(pg.contains_points(Points(Point(1,1),Point(3,3))).tolist(),
+                         [True,False])
+        
+        # 3D
+        pg=Polygon(Point(0,0,0),Point(0,10,0),Point(0,10,10),Point(0,0,10))
+        self.assertEqual(pg.contains_points([(0,5,5),(1,5,5),(0,10,5),(0,11,5)],
+                                            tri_state=True).tolist(),
+                         [1,-1,0,-1])
+        pg=Polygon(Point(0,0,0),Point(4,0,0),Point(4,0,1),Point(0,0,1))
+        self.assertEqual(pg.contains_points([(3,0,0.5),(0.5,0,3)]).tolist(),
+                         [True,False])
+        
+        # slab index against shapely
+        angles=np.linspace(0,2*np.pi,200,endpoint=False)
+        radii=np.where(np.arange(200)%2==0,1,2)
+        exterior=np.column_stack((radii*np.cos(angles),radii*np.sin(angles)))
+        pg=Polygon(*(Point(*x) for x in exterior))
+        points=np.random.default_rng(0).uniform(-2,2,(1000,2))
+        shapely_polygon=shapely.geometry.Polygon(exterior)
+        self.assertEqual(pg.contains_points(points).tolist(),
+                         [shapely_polygon.contains(shapely.geometry.Point(x)) for x in points])
+        
+        
     def test_coordinates(self):
         ""
         pg=Polygon(Point(0,0),Point(1,0),Point(1,1),Point(0,1))
@@ -412,6 +906,45 @@ class Test_Polygon(unittest.TestCase):
                                    Point(1.0,2.0))))
         
         
+    def test_intersection_plane(self):
+        ""
+        # convex polygon
+        pg=Polygon(Point(0,0,0),Point(2,0,0),Point(2,0,2),Point(0,0,2))
+        self.assertEqual(pg.intersection(Plane(Point(0,0,1),Vector(0,0,1))),
+                         (Polyline(Point(0,0,1),Point(2,0,1)),))
+        self.assertEqual(pg.intersection(Plane(Point(0,0,2),Vector(0,0,1))),
+                         (Polyline(Point(0,0,2),Point(2,0,2)),))
+        self.assertEqual(pg.intersection(Plane(Point(0,0,3),Vector(0,0,1))),
+                         ())
+        self.assertEqual(pg.intersection(Plane(Point(0,0,0),Vector(0,1,0))),
+                         (pg,))
+        self.assertEqual(Polygon(Point(0,0,0),Point(2,0,0),Point(1,0,1)).intersection(
+                             Plane(Point(0,0,1),Vector(0,0,1))),
+                         (Point(1,0,1),))
+        self.assertEqual(Plane(Point(0,0,1),Vector(0,0,1)).intersection(pg),
+                         GeometryObjects(Polyline(Point(0,0,1),Point(2,0,1))))
+        
+        # concave polygon
+        pg=Polygon(Point(0,0,0),Point(3,0,0),Point(3,0,3),Point(2,0,3),
+                   Point(2,0,1),Point(1,0,1),Point(1,0,3),Point(0,0,3))
+        self.assertEqual(pg.intersection(Plane(Point(0,0,2),Vector(0,0,1))),
+                         (Polyline(Point(0,0,2),Point(1,0,2)),
+                          Polyline(Point(2,0,2),Point(3,0,2))))
+        self.assertEqual(pg.intersection(Plane(Point(0,0,1),Vector(0,0,1))),
+                         (Polyline(Point(0,0,1),Point(3,0,1)),))
+        self.assertEqual(pg.intersection(Plane(Point(1,0,0),Vector(1,0,0))),
+                         (Polyline(Point(1,0,3),Point(1,0,0)),))
+        
+        # polygon with a hole
+        pg=Polygon(Point(0,0,0),Point(4,0,0),Point(4,0,4),Point(0,0,4),
+                   holes=[Polygon(Point(1,0,1),Point(3,0,1),Point(3,0,3),Point(1,0,3))])
+        self.assertEqual(pg.intersection(Plane(Point(0,0,2),Vector(0,0,1))),
+                         (Polyline(Point(0,0,2),Point(1,0,2)),
+                          Polyline(Point(3,0,2),Point(4,0,2))))
+        self.assertEqual(pg.intersection(Plane(Point(0,0,3),Vector(0,0,1))),
+                         (Polyline(Point(0,0,3),Point(4,0,3)),))
+        
+        
     def test_intersection_polygon_3d(self):
         ""
         pg=Polygon(Point(0,0,0),Point(1,0,0),Point(1,1,0),Point(0,1,0))
@@ -460,6 +993,133 @@ class Test_Polygon(unittest.TestCase):
                          (Point(1,0.5,0),))       
         
         
+    def test_intersection_convex(self):
+        ""
+        pg=Polygon(Point(0,0),Point(2,0),Point(2,2),Point(0,2))
+        self.assertEqual(pg.intersection_convex(Polygon(Point(1,1),Point(3,1),
+                                                        Point(3,3),Point(1,3))),
+                         GeometryObjects(Polygon(Point(2,1),Point(2,2),
+                                                 Point(1,2),Point(1,1))))
+        # clockwise polygon
+        self.assertEqual(Polygon(*pg[::-1]).intersection_convex(Polygon(Point(1,1),Point(3,1),
+                                                                        Point(3,3))),
+                         GeometryObjects(Polygon(Point(1,1),Point(2,2),Point(2,1))))
+        # contained, identical, touching and separate polygons
+        pg1=Polygon(Point(0.5,0.5),Point(1,0.5),Point(1,1))
+        self.assertEqual(pg.intersection_convex(pg1),GeometryObjects(pg1))
+        self.assertEqual(pg1.intersection_convex(pg),GeometryObjects(pg1))
+        self.assertEqual(pg.intersection_convex(pg),GeometryObjects(pg))
+        self.assertEqual(pg.intersection_convex(Polygon(Point(2,0),Point(3,0),Point(3,2))),
+                         GeometryObjects())
+        self.assertEqual(pg.intersection_convex(Polygon(Point(5,5),Point(6,5),Point(6,6))),
+                         GeometryObjects())
+
+        # 3D
+        pg=Polygon(Point(0,0,1),Point(0,2,1),Point(2,2,1),Point(2,0,1))
+        self.assertEqual(pg.intersection_convex(Polygon(Point(1,1,1),Point(3,1,1),
+                                                        Point(3,3,1),Point(1,3,1))),
+                         GeometryObjects(Polygon(Point(1,1,1),Point(1,2,1),
+                                                 Point(2,2,1),Point(2,1,1))))
+        self.assertEqual(pg.intersection_convex(Polygon(Point(1,1,2),Point(3,1,2),
+                                                        Point(3,3,2))),
+                         GeometryObjects())
+
+        # 3D on diagonal vertical planes, compared with shapely
+        for s in (1,-1):
+            pg=Polygon(Point(0.1,0.7,0),Point(3.2,0.7+s*3.1,0),
+                       Point(3.2,0.7+s*3.1,2),Point(0.1,0.7,2))
+            pg1=Polygon(Point(1.8,0.7+s*1.7,3),Point(5.0,0.7+s*4.9,3),
+                        Point(5.0,0.7+s*4.9,0.5),Point(1.8,0.7+s*1.7,0.5))
+            x=pg.intersection_convex(pg1)
+            self.assertEqual(len(x),1)
+            self.assertAlmostEqual(x[0].area,pg.intersection(pg1)[0].area)
+            self.assertTrue(np.allclose(x[0].plane.N.normalise.coordinates,
+                                        pg.plane.N.normalise.coordinates))
+        
+        with self.assertRaises(ValueError):
+            pg.intersection_convex(Polygon(Point(0,0,1),Point(2,0,1),Point(1,1,1),
+                                           Point(2,2,1),Point(0,2,1)))
+
+        # compared with shapely
+        rng=np.random.default_rng(0)
+        for i in range(200):
+            a,b=(shapely.geometry.MultiPoint(rng.uniform(0,1,(5,2))).convex_hull
+                 for _ in range(2))
+            x=Polygon(*(Point(*p) for p in a.exterior.coords[:-1])).intersection_convex(
+                Polygon(*(Point(*p) for p in b.exterior.coords[:-1])))
+            area=sum(shapely.geometry.Polygon(pg.coordinates).area for pg in x)
+            self.assertAlmostEqual(area,a.intersection(b).area)
+
+
+    def test_difference_convex(self):
+        ""
+        pg=Polygon(Point(0,0),Point(2,0),Point(2,2),Point(0,2))
+        self.assertEqual(pg.difference_convex(Polygon(Point(1,-1),Point(3,-1),
+                                                      Point(3,1),Point(1,1))),
+                         GeometryObjects(Polygon(Point(0,0),Point(1,0),Point(1,2),Point(0,2)),
+                                         Polygon(Point(2,1),Point(2,2),Point(1,2),Point(1,1))))
+        # a hole is split into pieces
+        x=pg.difference_convex(Polygon(Point(0.5,0.5),Point(1.5,0.5),
+                                       Point(1.5,1.5),Point(0.5,1.5)))
+        self.assertEqual(len(x),4)
+        self.assertAlmostEqual(sum(pg.area for pg in x),3)
+        # covered, touching and separate polygons
+        self.assertEqual(pg.difference_convex(pg),GeometryObjects())
+        pg1=Polygon(Point(2,0),Point(3,0),Point(3,2))
+        self.assertIs(pg.difference_convex(pg1)[0],pg)
+        self.assertIs(pg.difference_convex(Polygon(Point(5,5),Point(6,5),Point(6,6)))[0],pg)
+
+        # 3D
+        pg=Polygon(Point(0,0,1),Point(0,2,1),Point(2,2,1),Point(2,0,1))
+        x=pg.difference_convex(Polygon(Point(1,1,1),Point(3,1,1),Point(3,3,1),Point(1,3,1)))
+        self.assertAlmostEqual(sum(pg.area for pg in x),3)
+        self.assertTrue(all(np.allclose(pg1.plane.N.normalise.coordinates,(0,0,-1))
+                            for pg1 in x))
+        
+        # 3D on diagonal vertical planes, compared with shapely
+        for s in (1,-1):
+            pg=Polygon(Point(0.1,0.7,0),Point(3.2,0.7+s*3.1,0),
+                       Point(3.2,0.7+s*3.1,2),Point(0.1,0.7,2))
+            pg1=Polygon(Point(1.8,0.7+s*1.7,3),Point(5.0,0.7+s*4.9,3),
+                        Point(5.0,0.7+s*4.9,0.5),Point(1.8,0.7+s*1.7,0.5))
+            x=pg.difference_convex(pg1)
+            self.assertAlmostEqual(sum(pg2.area for pg2 in x),
+                                   sum(pg2.area for pg2 in pg.difference(pg1)))
+            self.assertLess(sum(pg2.area for pg2 in x),pg.area-1)
+            self.assertTrue(all(np.allclose(pg2.plane.N.normalise.coordinates,
+                                            pg.plane.N.normalise.coordinates)
+                                for pg2 in x))
+
+
+    def test_area(self):
+        ""
+        pg=Polygon(Point(0,0),Point(1,0),Point(1,1),Point(0,1))
+        self.assertEqual(pg.area,
+                         1)
+        
+        # 3D, with a hole
+        hole=Polygon(Point(0.25,0,0.25),Point(0.25,0,0.75),Point(0.75,0,0.75),Point(0.75,0,0.25))
+        pg=Polygon(Point(0,0,0),Point(1,0,0),Point(1,0,1),Point(0,0,1),holes=[hole])
+        self.assertAlmostEqual(pg.area,
+                               0.75)
+        
+        
+    def test_plane(self):
+        ""
+        # the first three vertices are collinear
+        pg=Polygon(Point(0,0,0),Point(0.5,0,0),Point(1,0,0),Point(1,1,0),Point(0,1,0))
+        self.assertEqual((pg.plane.P0,pg.plane.N),
+                         (Point(0,0,0),Vector(0,0,2)))
+        
+        # the second vertex is a reflex vertex
+        pg=Polygon(Point(1,1,1),Point(0,1,1),Point(0,0,1),Point(2,0,1),Point(2,2,1),Point(1,2,1))
+        self.assertEqual((pg.plane.P0,pg.plane.N),
+                         (Point(1,1,1),Vector(0,0,6)))
+        
+        with self.assertRaises(ValueError):
+            Polygon(Point(0,0,0),Point(1,0,0),Point(2,0,0)).plane
+        
+        
     def test_plot(self):
         ""
         return
@@ -471,6 +1131,29 @@ class Test_Polygon(unittest.TestCase):
         
         
         
+    def test_plane_key(self):
+        ""
+        pg=Polygon(Point(0,0,1),Point(0,1,1),Point(1,1,1),Point(1,0,1))
+        self.assertEqual(pg.plane_key,
+                         (0,0,10000000,10000000))
+        self.assertEqual(pg.reverse.plane_key,
+                         pg.plane_key)
+        pg1=Polygon(Point(5,5,1),Point(5,6,1),Point(6,6,1))
+        self.assertEqual(pg1.plane_key,
+                         pg.plane_key)
+        
+        # coplanar walls at 45 and 135 degrees, listed in opposite directions
+        for s in (1,-1):
+            pg=Polygon(Point(0.1,0.7,0),Point(3.2,0.7+s*3.1,0),
+                       Point(3.2,0.7+s*3.1,2),Point(0.1,0.7,2))
+            pg1=Polygon(Point(1.8,0.7+s*1.7,3),Point(5.0,0.7+s*4.9,3),
+                        Point(5.0,0.7+s*4.9,0.5),Point(1.8,0.7+s*1.7,0.5))
+            self.assertEqual(pg1.plane_key,
+                             pg.plane_key)
+            self.assertAlmostEqual(sum(x.area for x in pg.difference(pg1)),
+                                   pg.area-1.5*1.4*2**0.5)
+        
+        
     def test_polygons(self):
         ""
         pg=Polygon(Point(0,0),Point(1,0),Point(1,1),Point(0,1))
@@ -658,6 +1341,49 @@ class Test_Polygon(unittest.TestCase):
         pg=Polygon(Point(221.7423, -84.20669, 6.0),Point(221.7423, -53.63377, 6.0),Point(221.7423, -53.63377, 14.0),Point(221.7423, -54.0921, 14.0),Point(221.7423, -54.0921, 9.02132),Point(221.7423, -60.6546, 9.02132),Point(221.7423, -60.6546, 14.0),Point(221.7423, -63.91502, 14.0),Point(221.7423, -63.91502, 9.02132),Point(221.7423, -70.83169, 9.02132),Point(221.7423, -70.83169, 14.0),Point(221.7423, -73.91502, 14.0),Point(221.7423, -73.91502, 9.02132),Point(221.7423, -80.83169, 9.02132),Point(221.7423, -80.83169, 14.0),Point(221.7423, -84.20669, 14.0), holes=Polygons(Polygon(Point(221.7423, -80.68064, 8.969236),Point(221.7423, -74.06606, 8.969236),Point(221.7423, -74.06606, 9.02132),Point(221.7423, -80.68064, 9.02132)), Polygon(Point(221.7423, -70.68064, 8.969236),Point(221.7423, -64.06606, 8.969236),Point(221.7423, -64.06606, 9.02132),Point(221.7423, -70.68064, 9.02132)), Polygon(Point(221.7423, -60.68064, 8.969236),Point(221.7423, -54.06606, 8.969236),Point(221.7423, -54.06606, 14.0),Point(221.7423, -54.0921, 14.0),Point(221.7423, -54.0921, 9.02132),Point(221.7423, -60.6546, 9.02132),Point(221.7423, -60.6546, 14.0),Point(221.7423, -60.68064, 14.0))))
         print(pg.triangles); return
         
+        
+    def test_triangle_indices(self):
+        ""
+        pg=Polygon(Point(0,0),Point(10,0),Point(10,10),Point(0,10),
+                   holes=[Polygon(Point(2,2),Point(4,2),Point(4,4),Point(2,4)),
+                          Polygon(Point(6,6),Point(8,6),Point(8,8),Point(6,8))])
+        vertices,indices=pg.triangle_indices
+        self.assertEqual(vertices,
+                         PointArray([(0,0),(10,0),(10,10),(0,10),
+                                     (2,2),(4,2),(4,4),(2,4),
+                                     (6,6),(8,6),(8,8),(6,8)]))
+        self.assertEqual(indices.shape,
+                         (14,3))
+        self.assertAlmostEqual(sum(tri.area for tri in pg.triangles),
+                               92)
+        
+        # 3D polygon uses the 3D vertices
+        pg=Polygon(Point(0,0,0),Point(0,10,0),Point(0,10,10),Point(0,0,10),
+                   holes=[Polygon(Point(0,2,2),Point(0,4,2),Point(0,4,4),Point(0,2,4))])
+        vertices,indices=pg.triangle_indices
+        self.assertEqual(vertices[4],
+                         Point(0,2,2))
+        self.assertEqual(indices.shape,
+                         (8,3))
+        self.assertAlmostEqual(sum(tri.area for tri in pg.triangles),
+                               96)
+        
+        
+    def test_triangles_without_triangle_package(self):
+        ""
+        tr=crossproduct.crossproduct.tr
+        crossproduct.crossproduct.tr=crossproduct.crossproduct._LazyModule('a_missing_module')
+        try:
+            pg=Polygon(Point(0,0),Point(2,0),Point(1,1),Point(2,2),Point(0,2))
+            self.assertEqual(pg.triangles,
+                             Polygons(Polygon(Point(0,0),Point(2,0),Point(1,1)),
+                                      Polygon(Point(1,1),Point(2,2),Point(0,2)),
+                                      Polygon(Point(1,1),Point(0,2),Point(0,0))))
+            self.assertFalse(crossproduct.crossproduct.tr.is_available())
+        finally:
+            crossproduct.crossproduct.tr=tr
+        
+        
 class Test_Polygons(unittest.TestCase):
     ""
     
@@ -717,6 +1443,283 @@ class Test_Polygons(unittest.TestCase):
         pgs.plot()
         
         
+    def test_difference_convex(self):
+        ""
+        pgs=Polygons(Polygon(Point(0,0),Point(2,0),Point(2,2),Point(0,2)),
+                     Polygon(Point(0,0),Point(1,0),Point(0,1)),
+                     Polygon(Point(0,0),Point(1,0),Point(0,1)))
+        pgs1=Polygons(Polygon(Point(1,-1),Point(3,-1),Point(3,1),Point(1,1)),
+                      Polygon(Point(5,5),Point(6,5),Point(6,6)),
+                      Polygon(Point(0,0),Point(2,0),Point(0,2)))
+        result,index=pgs.difference_convex(pgs1)
+        self.assertEqual(index.tolist(),[0,0,1])
+        self.assertIs(result[2],pgs[1])
+        self.assertAlmostEqual(result[0].area+result[1].area,3)
+
+        with self.assertRaises(ValueError):
+            pgs.difference_convex(pgs1[:2])
+
+
+    def test_difference_each(self):
+        ""
+        pg=Polygon(Point(0,0,0),Point(2,0,0),Point(2,2,0),Point(0,2,0))
+        pg1=Polygon(Point(1,1,0),Point(3,1,0),Point(3,3,0),Point(1,3,0))
+        pg2=Polygon(Point(1,1,-1),Point(1,1,1),Point(1,3,1))
+        pg3=Polygon(Point(10,1,0),Point(13,1,0),Point(13,3,0))
+        self.assertEqual(list(Polygons(pg).difference_each(Polygons(pg1,pg2,pg3),
+                                                           max_workers=1)),
+                         [(0,0,GeometryObjects(*pg.difference(pg1))),
+                          (0,1,GeometryObjects(pg))])
+        
+        
+    def test_group_by_plane(self):
+        ""
+        pgs=Polygons(Polygon(Point(0,0,0),Point(1,0,0),Point(1,1,0)),
+                     Polygon(Point(0,0,0),Point(1,0,0),Point(1,0,1)),
+                     Polygon(Point(2,2,0),Point(2,3,0),Point(3,3,0)), # reversed normal
+                     Polygon(Point(0,0,1),Point(1,0,1),Point(1,1,1)),
+                     Polygon(Point(0,0,1e-8),Point(1,0,1e-8),Point(1,1,1e-8)))
+        result=pgs.group_by_plane()
+        self.assertEqual(list(result.values()),
+                         [(0,2,4),(1,),(3,)])
+        self.assertEqual(list(result),
+                         [pgs[0].plane_key,pgs[1].plane_key,pgs[3].plane_key])
+        # the cached groups are not changed by changing the result
+        result.clear()
+        self.assertEqual(list(pgs.group_by_plane().values()),
+                         [(0,2,4),(1,),(3,)])
+        self.assertIs(pgs._plane_groups,pgs._plane_groups)
+        
+        # coplanar walls at 45 and 135 degrees, listed in opposite directions
+        pgs=Polygons(*(Polygon(Point(0.1,0.7,0),Point(3.2,0.7+s*3.1,0),
+                               Point(3.2,0.7+s*3.1,2),Point(0.1,0.7,2))
+                       for s in (1,-1)),
+                     *(Polygon(Point(1.8,0.7+s*1.7,3),Point(5.0,0.7+s*4.9,3),
+                               Point(5.0,0.7+s*4.9,0.5),Point(1.8,0.7+s*1.7,0.5))
+                       for s in (1,-1)))
+        self.assertEqual(list(pgs.group_by_plane().values()),
+                         [(0,2),(1,3)])
+        
+        
+    def test_intersection_convex(self):
+        ""
+        pgs=Polygons(Polygon(Point(0,0),Point(2,0),Point(2,2),Point(0,2)),
+                     Polygon(Point(0,0),Point(1,0),Point(0,1)),
+                     Polygon(Point(0,0),Point(0,1),Point(1,0)))
+        pgs1=Polygons(Polygon(Point(1,1),Point(3,1),Point(3,3),Point(1,3)),
+                      Polygon(Point(5,5),Point(6,5),Point(6,6)),
+                      Polygon(Point(0,0),Point(2,0),Point(2,0.5)))
+        result,index=pgs.intersection_convex(pgs1)
+        self.assertEqual(index.tolist(),[0,2])
+        self.assertEqual(result[0],
+                         Polygon(Point(2,1),Point(2,2),Point(1,2),Point(1,1)))
+        self.assertTrue(np.allclose(result[1].coordinates,
+                                    ((0,0),(0.8,0.2),(1,0))))
+        self.assertEqual(Polygons().intersection_convex(Polygons())[0],Polygons())
+
+        # 3D, compared with the single pair method
+        pgs=Polygons(Polygon(Point(0,0,0),Point(2,0,1),Point(2,2,1),Point(0,2,0)),
+                     Polygon(Point(0,0,0),Point(2,0,0),Point(2,2,0)))
+        pgs1=Polygons(Polygon(Point(1,1,0.5),Point(3,1,1.5),Point(3,3,1.5),Point(1,3,0.5)),
+                      Polygon(Point(0,0,1),Point(2,0,1),Point(2,2,1)))
+        result,index=pgs.intersection_convex(pgs1)
+        self.assertEqual(index.tolist(),[0])
+        self.assertTrue(np.allclose(result[0].coordinates,
+                                    pgs[0].intersection_convex(pgs1[0])[0].coordinates))
+
+        with self.assertRaises(ValueError):
+            Polygons(Polygon(Point(0,0),Point(2,0),Point(1,1),Point(2,2),Point(0,2))
+                     ).intersection_convex(pgs1[:1])
+
+
+    def test_intersection_pairs(self):
+        ""
+        pgs=Polygons(Polygon(Point(0,0),Point(2,0),Point(2,2),Point(0,2)),
+                     Polygon(Point(10,0),Point(12,0),Point(12,2)))
+        pgs1=Polygons(Polygon(Point(5,5),Point(6,5),Point(6,6)),
+                      Polygon(Point(1,1),Point(3,1),Point(3,3),Point(1,3)))
+        self.assertEqual(list(pgs.intersection_pairs(pgs1,max_workers=1)),
+                         [(0,1,GeometryObjects(Polygon(Point(2,2),Point(2,1),
+                                                       Point(1,1),Point(1,2))))])
+        
+        # 3D, coplanar and non-coplanar pairs in a process pool
+        pg=Polygon(Point(0,0,0),Point(2,0,0),Point(2,2,0),Point(0,2,0))
+        pg1=Polygon(Point(1,1,0),Point(3,1,0),Point(3,3,0),Point(1,3,0))
+        pg2=Polygon(Point(1,1,-1),Point(1,1,1),Point(1,3,1))
+        result=list(Polygons(pg).intersection_pairs(Polygons(pg1,pg2),
+                                                    max_workers=2,
+                                                    chunksize=1))
+        self.assertEqual(result,
+                         [(0,0,GeometryObjects(*pg.intersection(pg1))),
+                          (0,1,GeometryObjects(*pg.intersection(pg2)))])
+        
+        # a polygon with a hole is sent to the process pool as coordinate arrays
+        pg=Polygon(Point(0,0),Point(4,0),Point(4,4),Point(0,4),
+                   holes=[Polygon(Point(1,1),Point(3,1),Point(3,3),Point(1,3))])
+        pg1=Polygon(Point(2,2),Point(5,2),Point(5,5),Point(2,5))
+        result=list(Polygons(pg,pg).intersection_pairs(Polygons(pg1),
+                                                       max_workers=2,
+                                                       chunksize=1))
+        self.assertEqual(result,
+                         [(0,0,GeometryObjects(*pg.intersection(pg1))),
+                          (1,0,GeometryObjects(*pg.intersection(pg1)))])
+        
+        self.assertEqual(list(Polygons(pg).intersection_pairs(Polygons())),
+                         [])
+        
+        
+    def test_tree(self):
+        ""
+        pgs=Polygons(*[Polygon(Point(i,j),Point(i+1,j),Point(i+1,j+1))
+                       for i in range(0,20,2) for j in range(0,20,2)])
+        self.assertIsInstance(pgs.tree,STRtree)
+        self.assertIs(pgs.tree,pgs.tree)
+        self.assertEqual(len(pgs.tree),100)
+        
+        
+    def test_difference(self):
+        ""
+        pg=Polygon(Point(0,0,0),Point(2,0,0),Point(2,2,0),Point(0,2,0))
+        pg1=Polygon(Point(1,1,0),Point(3,1,0),Point(3,3,0),Point(1,3,0))
+        pg2=Polygon(Point(10,1,0),Point(13,1,0),Point(13,3,0))
+        self.assertEqual(Polygons(pg,pg2).difference(pg1),
+                         GeometryObjects(Polygon(Point(2,0,0),Point(0,0,0),Point(0,2,0),
+                                                 Point(1,2,0),Point(1,1,0),Point(2,1,0)),
+                                         pg2))
+        
+        
+class Test_STRtree(unittest.TestCase):
+    ""
+    
+    def test_query(self):
+        ""
+        pgs=Polygons(*[Polygon(Point(i,j),Point(i+1,j),Point(i+1,j+1))
+                       for i in range(0,20,2) for j in range(0,20,2)])
+        tree=STRtree(pgs,node_capacity=4)
+        self.assertEqual(tree.query((0.5,0.5,2.5,2.5)),
+                         [0,1,10,11])
+        self.assertEqual(tree.query((1.2,1.2,1.8,1.8)),
+                         [])
+        self.assertEqual(tree.query((-1,-1,100,100)),
+                         list(range(100)))
+        
+        # brute force check
+        for bbox in [(3,5,7.5,6),(0,0,0,0),(19,19,30,30),(4.5,-1,4.7,30)]:
+            self.assertEqual(tree.query(bbox),
+                             [i for i,pg in enumerate(pgs)
+                              if pg.bounds[0]<=bbox[2] and pg.bounds[2]>=bbox[0]
+                              and pg.bounds[1]<=bbox[3] and pg.bounds[3]>=bbox[1]])
+            
+        # 3D
+        pgs=Polygons(*[Polygon(Point(i,0,k),Point(i+1,0,k),Point(i+1,1,k))
+                       for i in range(10) for k in range(10)])
+        tree=STRtree(pgs,node_capacity=3)
+        self.assertEqual(tree.query((2.5,0.5,3.5,3.5,0.5,4.5)),
+                         [24,34])
+        
+        self.assertEqual(STRtree(Polygons()).query((0,0,1,1)),
+                         [])
+        
+        
+    def test_query_intersecting(self):
+        ""
+        pgs=Polygons(Polygon(Point(0,0),Point(1,0),Point(1,1)),
+                     Polygon(Point(5,5),Point(6,5),Point(6,6)))
+        self.assertEqual(pgs.tree.query_intersecting(Polygon(Point(1,1),Point(2,1),Point(2,2))),
+                         [0])
+        
+        
+    def test_nearest(self):
+        ""
+        pgs=Polygons(Polygon(Point(0,0),Point(1,0),Point(1,1)),
+                     Polygon(Point(5,5),Point(6,5),Point(6,6)))
+        self.assertEqual(pgs.tree.nearest(Point(0,1)),
+                         0)
+        self.assertEqual(pgs.tree.nearest(Point(5,6)),
+                         1)
+        
+        pgs=Polygons(*[Polygon(Point(i,0,k),Point(i+1,0,k),Point(i+1,1,k))
+                       for i in range(10) for k in range(10)])
+        self.assertEqual(pgs.tree.nearest(Point(3.9,0.1,4.2)),
+                         34)
+        self.assertEqual(pgs.tree.nearest(Point(3.1,0.9,4.2)),
+                         24)
+        
+        # polygons with normals along the y axis
+        pgs=Polygons(Polygon(Point(0,0,0),Point(4,0,0),Point(4,0,1),Point(0,0,1)),
+                     Polygon(Point(0,1.1,0),Point(4,1.1,0),Point(4,1.1,6),Point(0,1.1,6)))
+        self.assertEqual(pgs.tree.nearest(Point(3,0.5,0.5)),
+                         0)
+        
+        with self.assertRaises(ValueError):
+            STRtree(Polygons()).nearest(Point(0,0))
+            
+            
+class Test_BVH(unittest.TestCase):
+    ""
+    
+    def test_first_hit(self):
+        ""
+        pgs=Polygons(Polygon(Point(0,0,1),Point(1,0,1),Point(1,1,1),Point(0,1,1)),
+                     Polygon(Point(0,0,2),Point(1,0,2),Point(1,1,2),Point(0,1,2)),
+                     Polygon(Point(2,0,0),Point(2,1,0),Point(2,1,2),Point(2,0,2)))
+        bvh=BVH(pgs,node_capacity=2)
+        self.assertEqual(bvh.first_hit(Point(0.5,0.5,0),Vector(0,0,1)),
+                         (1,0))  # through the edge between two triangles
+        self.assertEqual(bvh.first_hit(Point(0.5,0.5,1.5),Vector(0,0,2)),
+                         (0.5,1))
+        self.assertEqual(bvh.first_hit(Point(0.5,0.5,1),Vector(0,0,1)),
+                         (1,1))  # start point on a face
+        self.assertEqual(bvh.first_hit(Point(0,0.5,1.5),Vector(1,0,0)),
+                         (2,2))
+        self.assertEqual(bvh.first_hit(Point(0.5,0.5,0),Vector(0,0,1),max_distance=0.5),
+                         None)
+        self.assertEqual(bvh.first_hit(Point(0.5,0.5,3),Vector(0,0,1)),
+                         None)
+        
+        with self.assertRaises(ValueError):
+            bvh.first_hit(Point(0,0,0),Vector(0,0,0))
+            
+            
+    def test_any_hit(self):
+        ""
+        pgs=Polygons(Polygon(Point(0,0,1),Point(1,0,1),Point(1,1,1),Point(0,1,1)))
+        self.assertTrue(pgs.bvh.any_hit(Point(0.5,0.5,0),Vector(0,0,1)))
+        self.assertFalse(pgs.bvh.any_hit(Point(0.5,0.5,0),Vector(0,0,-1)))
+        self.assertFalse(pgs.bvh.any_hit(Point(0.5,0.5,0),Vector(0,0,1),max_distance=0.9))
+        self.assertFalse(Polygons().bvh.any_hit(Point(0.5,0.5,0),Vector(0,0,1)))
+        
+        
+    def test_cast(self):
+        ""
+        pgs=Polygons(*[Polygon(Point(i,j,k),Point(i+1,j,k),Point(i+1,j+1,k),
+                               holes=[Polygon(Point(i+0.6,j+0.2,k),Point(i+0.9,j+0.2,k),
+                                              Point(i+0.9,j+0.5,k))])
+                       for i in range(3) for j in range(3) for k in range(3)])
+        bvh=pgs.bvh
+        rng=np.random.default_rng(0)
+        origins=rng.uniform(-1,4,(200,3))
+        directions=rng.normal(size=(200,3))
+        directions[:20,2]=0
+        distances,face_ids=bvh.cast(origins,directions)
+        hits=bvh.cast(origins,directions,max_distance=2,any_hit=True)
+        self.assertTrue(0<hits.sum()<(face_ids>=0).sum()<200)
+        
+        # brute force check
+        for o,d,distance,face_id,hit in zip(origins,directions,distances,face_ids,hits):
+            d=d/np.linalg.norm(d)
+            expected=(np.inf,-1)
+            if d[2]!=0:
+                for i,pg in enumerate(pgs):
+                    t=(pg[0].z-o[2])/d[2]
+                    x,y,_=o+t*d
+                    if t>0 and pg.project_2D(2).contains_points([(x,y)])[0]:
+                        expected=min(expected,(t,i))
+            self.assertEqual(face_id,expected[1])
+            self.assertAlmostEqual(distance,expected[0])
+            self.assertEqual(hit,expected[0]<=2)
+            
+            
 class Test_Polyhedron(unittest.TestCase):
     "" 
         
@@ -730,6 +1733,45 @@ class Test_Polyhedron(unittest.TestCase):
         self.assertIsInstance(ph,
                               Polyhedron)
         
+    def test_clear_cache(self):
+        ""
+        ph=polyhedron_from_base_polygon_and_extrud_vector(
+                Polygon(Point(0,0,0),
+                        Point(1,0,0),
+                        Point(1,1,0),
+                        Point(0,1,0)),
+                Vector(0,0,1))
+        points=ph.points
+        self.assertIs(ph.points,points)
+        ph.polygons[0].plane
+        ph.clear_cache()
+        self.assertIsNot(ph.points,points)
+        self.assertFalse('_cache' in ph.polygons[0].__dict__)
+        
+        
+    def test_centroid(self):
+        ""
+        ph=polyhedron_from_base_polygon_and_extrud_vector(
+                Polygon(Point(0,0,0),Point(2,0,0),Point(2,1,0),
+                        Point(1,1,0),Point(1,2,0),Point(0,2,0)),
+                Vector(0,0,1))
+        self.assertEqual(ph.centroid,
+                         Point(5/6,5/6,0.5))
+        
+        
+    def test_mesh(self):
+        ""
+        ph=Polyhedron(Polygon(Point(0,1,0),Point(1,1,0),Point(0,0,0)),
+                      Polygon(Point(0,0,0),Point(1,1,0),Point(0,1,1)),
+                      Polygon(Point(0,1,1),Point(0,1,0),Point(0,0,0)),
+                      Polygon(Point(1,1,0),Point(0,1,0),Point(0,1,1)))
+        self.assertIsInstance(ph.mesh,
+                              HalfEdgeMesh)
+        self.assertIs(ph.mesh,ph.mesh)
+        self.assertEqual(ph.mesh.faces,
+                         ((0,1,2),(2,1,3),(3,0,2),(1,0,3)))
+        
+        
     def test_points(self):
         ""
         ph=Polyhedron(Polygon(Point(0,1,0),Point(1,1,0),Point(0,0,0)),
@@ -764,6 +1806,116 @@ class Test_Polyhedron(unittest.TestCase):
         
         
         
+    def test_slice_parallel(self):
+        ""
+        # L-shaped extrusion, with concave top and bottom faces
+        ph=polyhedron_from_base_polygon_and_extrud_vector(
+                Polygon(Point(0,0,0),Point(3,0,0),Point(3,1,0),
+                        Point(1,1,0),Point(1,3,0),Point(0,3,0)),
+                Vector(0,0,2))
+        result=ph.slice_parallel(Vector(0,0,1),[1,-1,0,2])
+        self.assertEqual(result[0],
+                         Polygons(Polygon(Point(0,0,1),Point(3,0,1),Point(3,1,1),
+                                          Point(1,1,1),Point(1,3,1),Point(0,3,1))))
+        self.assertEqual(result[1],
+                         Polygons())
+        self.assertEqual([pg.area for pg in result[2]],
+                         [5])  # vertices on the plane are taken to be below it
+        self.assertEqual(result[3],
+                         Polygons())
+        self.assertEqual(ph.slice_parallel(Vector(1,0,0),[0.5])[0],
+                         Polygons(Polygon(Point(0.5,3,2),Point(0.5,0,2),
+                                          Point(0.5,0,0),Point(0.5,3,0))))
+        self.assertEqual(ph.slice_parallel(Vector(0,-2,0),[-2])[0],
+                         Polygons(Polygon(Point(0,2,0),Point(1,2,0),
+                                          Point(1,2,2),Point(0,2,2))))
+        
+        # a ring shaped polyhedron gives a polygon with a hole
+        outer=[(0,0),(4,0),(4,4),(0,4)]
+        inner=[(1,1),(3,1),(3,3),(1,3)]
+        faces=[]
+        for k in range(4):
+            (ax,ay),(bx,by)=outer[k],outer[(k+1)%4]
+            (cx,cy),(dx,dy)=inner[k],inner[(k+1)%4]
+            faces.extend([Polygon(Point(ax,ay,0),Point(bx,by,0),Point(bx,by,2),Point(ax,ay,2)),
+                          Polygon(Point(dx,dy,0),Point(cx,cy,0),Point(cx,cy,2),Point(dx,dy,2)),
+                          Polygon(Point(ax,ay,2),Point(bx,by,2),Point(dx,dy,2),Point(cx,cy,2)),
+                          Polygon(Point(ax,ay,0),Point(cx,cy,0),Point(dx,dy,0),Point(bx,by,0))])
+        ph=Polyhedron(*faces)
+        result=ph.slice_parallel(Vector(0,0,1),[1])[0]
+        self.assertEqual(len(result),
+                         1)
+        self.assertEqual(result[0].exterior,
+                         Polygon(Point(0,0,1),Point(4,0,1),Point(4,4,1),Point(0,4,1)))
+        self.assertEqual(result[0].holes,
+                         Polygons(Polygon(Point(3,1,1),Point(1,1,1),Point(1,3,1),Point(3,3,1))))
+        self.assertEqual(result[0].area,
+                         12)
+        self.assertEqual(len(ph.slice_parallel(Vector(1,0,0),[2])[0]),
+                         2)
+        
+        # the section areas of a tetrahedron
+        ph=tetrahedron_from_points(Point(0,0,0),Point(1,0,0),Point(0,1,0),Point(0,0,1))
+        offsets=np.linspace(0.05,0.95,10)
+        self.assertTrue(np.allclose([pgs[0].area for pgs in ph.slice_parallel(Vector(0,0,1),offsets)],
+                                    (1-offsets)**2/2))
+        
+        with self.assertRaises(ValueError):
+            ph.slice_parallel(Vector(0,0,0),[0])
+            
+            
+    def test_slice(self):
+        ""
+        ph=polyhedron_from_base_polygon_and_extrud_vector(
+                Polygon(Point(0,0,0),Point(2,0,0),Point(2,2,0),Point(0,2,0)),
+                Vector(0,0,3))
+        result=ph.slice([Plane(Point(1,0,0),Vector(1,0,0)),
+                         Plane(Point(0,0,1),Vector(0,0,2)),
+                         Plane(Point(0,0,5),Vector(0,0,1))])
+        self.assertEqual(result,
+                         [Polygons(Polygon(Point(1,2,3),Point(1,0,3),Point(1,0,0),Point(1,2,0))),
+                          Polygons(Polygon(Point(0,0,1),Point(2,0,1),Point(2,2,1),Point(0,2,1))),
+                          Polygons()])
+        
+        
+    def test_surface_area(self):
+        ""
+        ph=polyhedron_from_base_polygon_and_extrud_vector(
+                Polygon(Point(0,0,0),Point(2,0,0),Point(2,1,0),Point(0,1,0)),
+                Vector(0,0,3))
+        self.assertAlmostEqual(ph.surface_area,
+                               22)
+        
+        
+    def test_tetrahedrons(self):
+        ""
+        ph=tetrahedron_from_points(Point(0,0,0),Point(1,1,0),Point(0,1,0),Point(0,1,1))
+        self.assertEqual(ph.tetrahedrons,
+                         Polyhedrons(ph))
+        
+        ph=polyhedron_from_base_polygon_and_extrud_vector(
+                Polygon(Point(0,0,0),Point(2,0,0),Point(2,1,0),Point(0,1,0)),
+                Vector(0,0,3))
+        self.assertAlmostEqual(sum(th.volume for th in ph.tetrahedrons),
+                               6)
+        
+        
+    def test_volume(self):
+        ""
+        ph=tetrahedron_from_points(Point(0,0,0),Point(1,1,0),Point(0,1,0),Point(0,1,1))
+        self.assertAlmostEqual(ph.volume,
+                               1/6)
+        
+        # concave prism without tetrahedrons
+        ph=polyhedron_from_base_polygon_and_extrud_vector(
+                Polygon(Point(0,0,0),Point(2,0,0),Point(2,1,0),
+                        Point(1,1,0),Point(1,2,0),Point(0,2,0)),
+                Vector(0,0,1))
+        ph=Polyhedron(*ph.polygons)
+        self.assertAlmostEqual(ph.volume,
+                               3)
+        
+        
     def test_base_polygon_and_extrud_vector(self):
         ""
         ph=polyhedron_from_base_polygon_and_extrud_vector(
@@ -781,9 +1933,254 @@ class Test_Polyhedron(unittest.TestCase):
        
         
        
+class Test_HalfEdgeMesh(unittest.TestCase):
+    ""
+    
+    def cube(self):
+        ""
+        return polyhedron_from_base_polygon_and_extrud_vector(
+                Polygon(Point(0,0,0),
+                        Point(1,0,0),
+                        Point(1,1,0),
+                        Point(0,1,0)),
+                Vector(0,0,1)).mesh
+    
+    
+    def test___init__(self):
+        ""
+        mesh=self.cube()
+        self.assertEqual(len(mesh.vertices),
+                         8)
+        self.assertEqual(len(mesh.faces),
+                         6)
+        self.assertEqual(len(mesh.edges),
+                         12)
+        self.assertEqual(mesh.half_edges.shape,
+                         (24,2))
+        self.assertTrue(mesh.is_closed)
+        
+        # vertices within tolerance are shared
+        mesh=HalfEdgeMesh(Polygons(Polygon(Point(0,0,0),Point(1,0,0),Point(1,1,0)),
+                                   Polygon(Point(1,1e-9,0),Point(0,0,0),Point(0,0,1))))
+        self.assertEqual(mesh.faces,
+                         ((0,1,2),(1,0,3)))
+        self.assertFalse(mesh.is_closed)
+        
+        
+    def test_edge_faces(self):
+        ""
+        mesh=self.cube()
+        self.assertEqual(mesh.edge_faces(0,1),
+                         (0,2))
+        self.assertEqual(mesh.edge_faces(1,0),
+                         (0,2))
+        self.assertEqual(mesh.edge_faces(0,6),
+                         ())
+        
+        
+    def test_face_neighbours(self):
+        ""
+        mesh=self.cube()
+        self.assertEqual(mesh.face_neighbours(0),
+                         (2,3,4,5))
+        self.assertEqual(mesh.face_neighbours(1),
+                         (4,3,2,5))
+        
+        
+    def test_twins(self):
+        ""
+        mesh=self.cube()
+        twins=mesh.twins
+        self.assertTrue((twins[twins]==np.arange(24)).all())
+        self.assertTrue((mesh.half_edges[twins]==mesh.half_edges[:,::-1]).all())
+        
+        
+    def test_vertex_faces(self):
+        ""
+        mesh=self.cube()
+        self.assertEqual(mesh.vertex_faces(0),
+                         (0,2,5))
+        
+        
 class Test_Polyhedrons(unittest.TestCase):
     ""  
     
+    def test_volumes(self):
+        ""
+        phs=Polyhedrons(tetrahedron_from_points(Point(0,0,0),Point(1,1,0),
+                                                Point(0,1,0),Point(0,1,1)),
+                        polyhedron_from_base_polygon_and_extrud_vector(
+                            Polygon(Point(0,0,0),Point(2,0,0),Point(2,1,0),Point(0,1,0)),
+                            Vector(0,0,3)))
+        self.assertTrue(np.allclose(phs.volumes,
+                                    [1/6,6]))
+        self.assertTrue(np.allclose(phs.surface_areas,
+                                    [phs[0].surface_area,22]))
+        self.assertEqual(phs.centroids,
+                         Points(Point(0.25,0.75,0.25),Point(1,0.5,1.5)))
+        
+        
+    def test_find_adjacent_faces(self):
+        ""
+        phs=Polyhedrons(*(polyhedron_from_base_polygon_and_extrud_vector(
+            Polygon(Point(x,y,0),Point(x+2,y,0),Point(x+2,y+2,0),Point(x,y+2,0)),
+            Vector(0,0,3)) for x,y in ((0,0),(2,0),(1,2))))
+        records=list(phs.find_adjacent_faces(max_workers=1))
+        self.assertEqual([record[:4] for record in records],
+                         [(0,2,2,4),(0,3,1,5),(1,2,2,4)])
+        self.assertTrue(np.allclose([record[5] for record in records],
+                                    [3,6,3]))
+        self.assertEqual(records[1][4],
+                         GeometryObjects(Polygon(Point(2,2,3),Point(2,2,0),
+                                                 Point(2,0,0),Point(2,0,3))))
+        self.assertEqual([record[:4] for record in phs.find_adjacent_faces(max_workers=2,
+                                                                         chunksize=1)],
+                         [(0,2,2,4),(0,3,1,5),(1,2,2,4)])
+        
+        # the zones rotated by 45 and 135 degrees about a vertical axis
+        for x0,y0,angle in ((0.1,0.2,45),(0.3,0.2,45),(0.1,0.2,135)):
+            c,s=np.cos(np.radians(angle)),np.sin(np.radians(angle))
+            def point(x,y,z):
+                return Point(x0+c*x-s*y,y0+s*x+c*y,z)
+            phs=Polyhedrons(*(polyhedron_from_base_polygon_and_extrud_vector(
+                Polygon(point(x,y,0),point(x+2,y,0),point(x+2,y+2,0),point(x,y+2,0)),
+                Vector(0,0,3)) for x,y in ((0,0),(2,0),(1,2))))
+            records=list(phs.find_adjacent_faces(max_workers=1))
+            self.assertEqual([record[:4] for record in records],
+                             [(0,2,2,4),(0,3,1,5),(1,2,2,4)])
+            self.assertTrue(np.allclose([record[5] for record in records],
+                                        [3,6,3]))
+    
+    
+    
+class Test_ConvexRegion(unittest.TestCase):
+    ""
+    
+    def _box(self,x,y,z,size):
+        ""
+        return polyhedron_from_base_polygon_and_extrud_vector(
+            Polygon(Point(x,y,z),Point(x+size,y,z),
+                    Point(x+size,y+size,z),Point(x,y+size,z)),
+            Vector(0,0,size))
+    
+    
+    def test___init__(self):
+        ""
+        region=ConvexRegion(Plane(Point(0,0,0),Vector(0,0,-2)),
+                            Plane(Point(0,0,1),Vector(0,0,1)))
+        self.assertEqual(len(region),2)
+        self.assertTrue(np.allclose(region._normals,[[0,0,-1],[0,0,1]]))
+        self.assertTrue(np.allclose(region._offsets,[0,1]))
+        
+        with self.assertRaises(ValueError):
+            ConvexRegion(Plane(Point(0,0,0),Vector(0,0,0)))
+        with self.assertRaises(ValueError):
+            ConvexRegion(Plane(Point(0,0,0),Vector(0,0,1e-9)))
+            
+            
+    def test_classify_bounds(self):
+        ""
+        region=ConvexRegion.from_polyhedron(self._box(0,0,0,1))
+        self.assertEqual(region.classify_bounds([(0.1,0.1,0.1,0.9,0.9,0.9),
+                                                 (0,0,0,1,1,1),
+                                                 (2,2,2,3,3,3),
+                                                 (0.5,0.5,0.5,2,2,2),
+                                                 (1,0,0,2,1,1)]).tolist(),
+                         [1,1,-1,0,0])
+        
+        # the corners are outside different planes
+        region=ConvexRegion(Plane(Point(0,0,0),Vector(1,1,0)))
+        self.assertEqual(region.classify_bounds([(-1,-1,0,0.5,0.5,1),
+                                                 (0.1,0.1,0,1,1,1)]).tolist(),
+                         [0,-1])
+        
+        
+    def test_clip_polygons(self):
+        ""
+        region=ConvexRegion.from_polyhedron(self._box(0,0,0,1))
+        pgs=Polygons(Polygon(Point(0.2,0.2,0.5),Point(0.8,0.2,0.5),Point(0.8,0.8,0.5)),
+                     Polygon(Point(2,2,2),Point(3,2,2),Point(3,3,2)),
+                     Polygon(Point(-1,0.5,-1),Point(2,0.5,-1),Point(2,0.5,2),Point(-1,0.5,2)),
+                     Polygon(Point(-1,0,0.5),Point(2,0,0.5),Point(2,0.5,0.5),
+                             Point(0.5,0.5,0.5),Point(0.5,2,0.5),Point(-1,2,0.5),
+                             holes=[Polygon(Point(0.8,0.1,0.5),Point(0.8,0.3,0.5),
+                                            Point(1.5,0.3,0.5),Point(1.5,0.1,0.5))]))
+        result,index=region.clip_polygons(pgs)
+        self.assertEqual(index.tolist(),[0,2,3])
+        self.assertIs(result[0],pgs[0])
+        self.assertEqual(result[1],
+                         Polygon(Point(1,0.5,1),Point(0,0.5,1),Point(0,0.5,0),Point(1,0.5,0)))
+        self.assertAlmostEqual(result[2].area,0.71)
+        self.assertTrue(np.allclose(result[2].plane.N.normalise.coordinates,(0,0,1)))
+        self.assertEqual(result[2].bounds,(0,0,0.5,1,1,0.5))
+        
+        self.assertEqual(region.clip(pgs[2]),Polygons(result[1]))
+        self.assertEqual(region.clip_polygons(Polygons())[0],Polygons())
+        
+        # a polygon which only touches the region
+        self.assertEqual(len(region.clip(Polygon(Point(1,0,0),Point(2,0,0),Point(1,1,0)))),0)
+        
+        
+    def test_clip_polyhedron(self):
+        ""
+        region=ConvexRegion.from_polyhedron(self._box(0,0,0,1))
+        ph=self._box(0.5,0.5,0.5,1)
+        result=region.clip_polyhedron(ph)
+        self.assertEqual(len(result.polygons),6)
+        self.assertAlmostEqual(result.volume,0.125)
+        self.assertEqual(result.bounds,(0.5,0.5,0.5,1,1,1))
+        self.assertIs(region.clip(self._box(0.2,0.2,0.2,0.5)).__class__,Polyhedron)
+        self.assertEqual(len(region.clip(self._box(2,2,2,1)).polygons),0)
+        
+        # a concave polyhedron and an oblique region, checked by sampling
+        ph=polyhedron_from_base_polygon_and_extrud_vector(
+            Polygon(Point(0,0,0),Point(3,0,0),Point(3,1,0),
+                    Point(1,1,0),Point(1,3,0),Point(0,3,0)),
+            Vector(0,0,1))
+        region=ConvexRegion(Plane(Point(1.5,1.5,0.5),Vector(1,1,0.5)),
+                            Plane(Point(0.2,0,0),Vector(-1,0,0.2)))
+        result=region.clip(ph)
+        points=np.random.default_rng(0).uniform([0,0,0],[3,3,1],(200000,3))
+        inside=(~((points[:,0]>1)&(points[:,1]>1))
+                &region.contains_points(points))
+        self.assertAlmostEqual(result.volume,inside.mean()*9,places=1)
+        
+        
+    def test_clip_polylines(self):
+        ""
+        region=ConvexRegion.from_polyhedron(self._box(0,0,0,1))
+        pls=Polylines(Polyline(Point(-1,0.5,0.5),Point(0.5,0.5,0.5),
+                               Point(0.5,0.6,0.5),Point(2,0.6,0.5),
+                               Point(2,0.8,0.5),Point(0.5,0.8,0.5)),
+                      Polyline(Point(2,2,2),Point(3,3,3)))
+        result,index=region.clip_polylines(pls)
+        self.assertEqual(result,
+                         Polylines(Polyline(Point(0,0.5,0.5),Point(0.5,0.5,0.5),
+                                            Point(0.5,0.6,0.5),Point(1,0.6,0.5)),
+                                   Polyline(Point(1,0.8,0.5),Point(0.5,0.8,0.5))))
+        self.assertEqual(index.tolist(),[0,0])
+        self.assertEqual(region.clip(pls[1]),Polylines())
+        
+        
+    def test_clip_segments(self):
+        ""
+        region=ConvexRegion.from_polyhedron(self._box(0,0,0,1))
+        a,b,index=region.clip_segments([(-1,0.5,0.5),(2,2,2),(0.2,0.2,0.2),(1,1,0)],
+                                       [(2,0.5,0.5),(3,3,3),(0.8,0.8,0.8),(2,2,0)])
+        self.assertEqual(index.tolist(),[0,2])
+        self.assertTrue(np.allclose(a,[(0,0.5,0.5),(0.2,0.2,0.2)]))
+        self.assertTrue(np.allclose(b,[(1,0.5,0.5),(0.8,0.8,0.8)]))
+        
+        
+    def test_contains_points(self):
+        ""
+        region=ConvexRegion(Plane(Point(0,0,0),Vector(0,0,-1)),
+                            Plane(Point(0,0,1),Vector(0,0,1)))
+        self.assertEqual(region.contains_points([(0,0,0.5),(0,0,2),(5,5,1)]).tolist(),
+                         [True,False,True])
+        self.assertTrue(np.allclose(region.signed_distances([(0,0,0.5)]),
+                                    [[-0.5,-0.5]]))
+    
     
     
        
@@ -842,7 +2239,112 @@ class Test_polyhedron_functions(unittest.TestCase):
                          6)
         
         
-        
+class Test_predicates(unittest.TestCase):
+    ""
+    
+    def test_orient2d(self):
+        ""
+        self.assertEqual(orient2d((0,0),(1,0),(0.5,1)),
+                         1)
+        self.assertEqual(orient2d((0,0),(1,0),(0.5,-1)),
+                         -1)
+        self.assertEqual(orient2d((0,0),(1,0),(2,0)),
+                         0)
+        
+        # points near a line, where the floating point determinant has the wrong sign
+        points=np.array([(0.5+i*2**-53,0.5+j*2**-53) 
+                         for i in range(64) for j in range(64)])
+        result=orient2d(points,(12,12),(24,24))
+        self.assertEqual(result.dtype,
+                         np.int8)
+        self.assertEqual(result.tolist(),
+                         [int(np.sign(j-i)) for i in range(64) for j in range(64)])
+        
+        
+    def test_orient3d(self):
+        ""
+        self.assertEqual(orient3d((0,0,0),(1,0,0),(0,1,0),(0,0,1)),
+                         1)
+        self.assertEqual(orient3d((0,0,0),(0,1,0),(1,0,0),(0,0,1)),
+                         -1)
+        self.assertEqual(orient3d((0,0,0),(1,0,0),(0,1,0),(0.1,0.2,0)),
+                         0)
+        
+        # points near the vertical plane x=y, where the floating point 
+        # determinant has the wrong sign
+        points=np.array([(0.5+i*2**-53,0.5+j*2**-53,0.3) 
+                         for i in range(64) for j in range(64)])
+        result=orient3d((12,12,0),(24,24,0),(12,12,1),points)
+        self.assertEqual(result.tolist(),
+                         [int(np.sign(i-j)) for i in range(64) for j in range(64)])
+        
+        
+    def test_incircle(self):
+        ""
+        self.assertEqual(incircle((0,0),(1,0),(0,1),(0.5,0.5)),
+                         1)
+        self.assertEqual(incircle((0,0),(1,0),(0,1),(2,2)),
+                         -1)
+        self.assertEqual(incircle((0,0),(1,0),(0,1),(1,1)),
+                         0)
+        self.assertEqual(incircle((0,0),(0,1),(1,0),(0.5,0.5)),
+                         -1)
+        self.assertEqual(incircle((0,0),(1,0),(0,1),[(0.5,0.5),(2,2),(1,1)]).tolist(),
+                         [1,-1,0])
+        
+        
+class Test_triangulate_polygon(unittest.TestCase):
+    ""
+    
+    def triangles_area(self,vertices,triangles):
+        ""
+        a,b,c=(vertices[triangles[:,k]] for k in range(3))
+        areas=((b-a)[:,0]*(c-a)[:,1]-(b-a)[:,1]*(c-a)[:,0])/2
+        self.assertTrue((areas>0).all())
+        return areas.sum()
+    
+    
+    def test_triangulate_polygon(self):
+        ""
+        # convex polygon
+        self.assertEqual(triangulate_polygon([(0,0),(1,0),(1,1),(0,1)]).tolist(),
+                         [[3,0,1],[3,1,2]])
+        
+        # clockwise concave polygon
+        vertices=np.array([(0,2),(2,2),(1,1),(2,0),(0,0)],dtype=float)
+        triangles=triangulate_polygon(vertices)
+        self.assertEqual(len(triangles),
+                         3)
+        self.assertAlmostEqual(self.triangles_area(vertices,triangles),
+                               3)
+        
+        # comb polygon
+        exterior=[(0,0),(50,0)]+[(x,5 if k%2==0 else 1) 
+                                 for k,x in enumerate(np.arange(50,0,-0.5))]+[(0,5)]
+        triangles=triangulate_polygon(exterior)
+        self.assertEqual(len(triangles),
+                         len(exterior)-2)
+        self.assertAlmostEqual(self.triangles_area(np.array(exterior),triangles),
+                               150)
+        
+        # self-intersecting polygon with no ears
+        with self.assertRaises(ValueError):
+            triangulate_polygon([(5,0),(3,4),(5,3),(2,1),(2,2)])
+        
+        
+    def test_triangulate_polygon_holes(self):
+        ""
+        exterior=[(0,0),(20,0),(20,8),(0,8)]
+        holes=[[(x+1,y+1),(x+1,y+3),(x+3,y+3),(x+3,y+1)] 
+               for x in range(0,20,4) for y in range(0,8,4)]
+        vertices=np.concatenate([exterior]+holes).astype(float)
+        triangles=triangulate_polygon(exterior,holes)
+        self.assertAlmostEqual(self.triangles_area(vertices,triangles),
+                               160-4*len(holes))
+        union=shapely.ops.unary_union([shapely.geometry.Polygon(vertices[x]) 
+                                       for x in triangles])
+        self.assertAlmostEqual(union.symmetric_difference(shapely.geometry.Polygon(exterior,holes)).area,
+                               0)
         
         
 if __name__=='__main__':